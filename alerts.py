@@ -0,0 +1,77 @@
+import threading
+import logging
+from datetime import datetime
+
+import database as db
+import db_cache
+import properties
+
+logger = logging.getLogger(__name__)
+
+# Low-stock alerts are worked out by a background thread once per change to
+# the inventory table rather than on every page view. Writes made in this
+# process wake the checker through db_cache. Writes made by other processes
+# (CLI imports) are picked up once the cached read expires, so the periodic
+# recheck runs on the cache TTL. Every property is checked; state is kept
+# per database file.
+CHECK_INTERVAL = db_cache.DEFAULT_TTL
+
+_lock = threading.Lock()
+_states = {}
+_thread = None
+
+
+def check():
+    """Recompute the current property's low-stock list and return it"""
+    generation = db_cache.generation('inventory')
+    items = db.get_low_stock_items()
+    with _lock:
+        _states[db.current_path()] = {'generation': generation, 'items': items,
+                                      'checked_at': datetime.now()}
+    if not items.empty:
+        logger.info(f"{len(items)} item(s) below reorder level in {db.current_path()}")
+    return items.copy()
+
+
+def low_stock():
+    """Items below their reorder level, as of the latest inventory change"""
+    with _lock:
+        state = _states.get(db.current_path())
+        if state is not None and state['generation'] == db_cache.generation('inventory'):
+            return state['items'].copy()
+    # A write in this process that the checker has not picked up yet
+    return check()
+
+
+def alert_count():
+    return len(low_stock())
+
+
+def last_checked():
+    with _lock:
+        state = _states.get(db.current_path())
+        return state['checked_at'] if state else None
+
+
+def _run():
+    generation = None
+    while True:
+        try:
+            generation = db_cache.wait_for_change(('inventory',), generation,
+                                                  CHECK_INTERVAL)
+            for _, _, path in properties.list_properties():
+                with db.using_database(path):
+                    check()
+        except Exception as e:
+            logger.error(f"Low stock check failed: {str(e)}")
+
+
+def start():
+    """Start the background checker once per process"""
+    global _thread
+    with _lock:
+        if _thread is not None and _thread.is_alive():
+            return
+        _thread = threading.Thread(target=_run, name='low-stock-checker',
+                                   daemon=True)
+        _thread.start()
@@ -0,0 +1,286 @@
+"""Attendance held in compact arrays for analytics.
+
+Each database gets one store, loaded on first use and then refreshed
+incrementally: rows with an id above the last one seen are appended, and
+rows listed in attendance_changes since the last refresh (status changes,
+deletes, reused ids) are re-read by id. Refreshes only read; the log is
+trimmed by ``python manage.py prune-attendance-changes``, after which a
+store that missed pruned entries reloads once. A row costs 11 bytes
+(int32 row id, int32 employee id, uint16 day offset, uint8 status code)
+against roughly 60 for the same row in the DataFrame get_attendance returns.
+
+    store = get_store()
+    store.attendance_rate('2025-01-01', '2025-12-31')
+    store.absentee_streaks('2025-01-01', '2025-12-31', min_days=3)
+    store.employee_calendar(7, 2025)
+"""
+import logging
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+import database as db
+from repository import employees
+
+logger = logging.getLogger(__name__)
+
+# Day offsets count from EPOCH and fit a uint16, i.e. up to 2179
+EPOCH = date(2000, 1, 1)
+MAX_DAY = np.iinfo(np.uint16).max
+UNMARKED = 0
+STATUS_CODES = {status: code for code, status in enumerate(db.ATTENDANCE_STATUSES, 1)}
+STATUS_NAMES = np.array([''] + list(db.ATTENDANCE_STATUSES), dtype=object)
+
+_ROW_QUERY = f"""
+    SELECT id, employee_id,
+           CAST(julianday(date) - julianday('{EPOCH.isoformat()}') AS INTEGER),
+           CASE status {' '.join(f"WHEN '{s}' THEN {c}" for s, c in STATUS_CODES.items())}
+                ELSE {UNMARKED} END
+    FROM attendance
+    WHERE date IS NOT NULL AND julianday(date) IS NOT NULL
+      AND employee_id IS NOT NULL
+    """
+
+# Entries are deleted, except the latest one of each id that no
+# longer exists: trg_attendance_changes_reuse looks for it to log an insert
+# that takes over a deleted row's id
+_PRUNE_QUERY = """
+    DELETE FROM attendance_changes
+    WHERE seq <= ?
+      AND (attendance_id IN (SELECT id FROM attendance)
+           OR seq < (SELECT MAX(seq) FROM attendance_changes later
+                     WHERE later.attendance_id = attendance_changes.attendance_id))
+    """
+
+_registry_lock = threading.Lock()
+_stores = {}
+
+
+def _day(value):
+    return (date.fromisoformat(str(value)) - EPOCH).days
+
+
+def _empty():
+    return (np.empty(0, np.int32), np.empty(0, np.int32),
+            np.empty(0, np.uint16), np.empty(0, np.uint8))
+
+
+def _to_arrays(rows):
+    """(row ids, employee ids, days, codes) sorted by row id"""
+    if not rows:
+        return _empty()
+    table = np.array(rows, dtype=np.int64)
+    valid = (table[:, 2] >= 0) & (table[:, 2] <= MAX_DAY)
+    if not valid.all():
+        logger.warning(f"Skipping {int((~valid).sum())} attendance row(s) dated "
+                       f"outside the range of the analytics store")
+        table = table[valid]
+    # Sorted by id; an id read twice keeps its last copy
+    _, last = np.unique(table[::-1, 0], return_index=True)
+    table = table[::-1][last]
+    return (table[:, 0].astype(np.int32), table[:, 1].astype(np.int32),
+            table[:, 2].astype(np.uint16), table[:, 3].astype(np.uint8))
+
+
+class AttendanceStore:
+    """Attendance of one database as parallel arrays sorted by row id.
+
+    Refreshes build new arrays and swap them in, so readers always see one
+    consistent snapshot without holding the lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._arrays = None
+        self._last_id = 0
+        self._last_change = 0
+
+    def _load(self, conn):
+        last_change = conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM attendance_changes").fetchone()[0]
+        self._arrays = _to_arrays(conn.execute(_ROW_QUERY).fetchall())
+        self._last_id = int(self._arrays[0][-1]) if len(self._arrays[0]) else 0
+        self._last_change = last_change
+        logger.info(f"Loaded {len(self._arrays[0])} attendance rows "
+                    f"({self.nbytes} bytes) for {self.path}")
+
+    def _apply(self, conn):
+        last_change = conn.execute(
+            "SELECT COALESCE(MAX(seq), ?) FROM attendance_changes",
+            (self._last_change,)).fetchone()[0]
+        changed = [row[0] for row in conn.execute(
+            "SELECT DISTINCT attendance_id FROM attendance_changes "
+            "WHERE seq > ? AND seq <= ?", (self._last_change, last_change))]
+        new_rows = conn.execute(_ROW_QUERY + " AND id > ?", (self._last_id,)).fetchall()
+        reread = []
+        if changed:
+            placeholders = ", ".join("?" * len(changed))
+            reread = conn.execute(_ROW_QUERY + f" AND id IN ({placeholders})",
+                                  changed).fetchall()
+        if not changed and not new_rows:
+            return
+
+        ids, emps, days, codes = self._arrays
+        if changed:
+            # Drop every changed id, then add back the ones that still exist
+            keep = ~np.isin(ids, np.array(changed, dtype=np.int64))
+            ids, emps, days, codes = ids[keep], emps[keep], days[keep], codes[keep]
+        added = _to_arrays(reread + new_rows)
+        merged = [np.concatenate(pair) for pair in zip((ids, emps, days, codes), added)]
+        if changed:
+            order = np.argsort(merged[0], kind='stable')
+            merged = [column[order] for column in merged]
+        self._arrays = tuple(merged)
+        self._last_change = last_change
+        if len(merged[0]):
+            self._last_id = max(self._last_id, int(merged[0][-1]))
+
+    def _missed_changes(self, conn):
+        """True if entries after the last applied one are gone.
+
+        seq has no gaps of its own, so a gap means another process's store
+        pruned entries this one never saw.
+        """
+        first = conn.execute("SELECT MIN(seq) FROM attendance_changes WHERE seq > ?",
+                             (self._last_change,)).fetchone()[0]
+        if first is not None:
+            return first > self._last_change + 1
+        top = conn.execute("SELECT seq FROM sqlite_sequence "
+                           "WHERE name = 'attendance_changes'").fetchone()
+        return top is not None and top[0] > self._last_change
+
+    def refresh(self):
+        """Bring the arrays up to date with the database"""
+        with self._lock, db.using_database(self.path), db.get_connection() as conn:
+            if self._arrays is None:
+                self._load(conn)
+            elif self._missed_changes(conn):
+                logger.info(f"Attendance changes for {self.path} were pruned "
+                            f"elsewhere; reloading")
+                self._load(conn)
+            else:
+                self._apply(conn)
+        return self
+
+    def snapshot(self):
+        """(row ids, employee ids, days, codes) as of the latest refresh"""
+        if self._arrays is None:
+            self.refresh()
+        return self._arrays
+
+    @property
+    def nbytes(self):
+        arrays = self._arrays or _empty()
+        return sum(a.nbytes for a in arrays)
+
+    def __len__(self):
+        return len(self.snapshot()[0])
+
+    def _between(self, start_date, end_date):
+        _, emps, days, codes = self.snapshot()
+        mask = (days >= _day(start_date)) & (days <= _day(end_date))
+        return emps[mask], days[mask], codes[mask]
+
+    def _names(self):
+        with db.using_database(self.path):
+            return employees.column_map('name')
+
+    def attendance_rate(self, start_date, end_date):
+        """Per-employee day counts and attendance rate between two dates.
+
+        The rate is worked days (half days at HALF_DAY_WEIGHT) over marked
+        days. Employees with no marked days are left out.
+        """
+        emps, _, codes = self._between(start_date, end_date)
+        columns = ['employee_id', 'name', 'present_days', 'half_days',
+                   'absent_days', 'marked_days', 'attendance_rate']
+        if not len(emps):
+            return pd.DataFrame(columns=columns)
+        employee_ids, rows = np.unique(emps, return_inverse=True)
+        counts = np.zeros((len(employee_ids), len(STATUS_NAMES)), dtype=np.int64)
+        np.add.at(counts, (rows, codes), 1)
+        present = counts[:, STATUS_CODES['Present']]
+        half = counts[:, STATUS_CODES['Half-day']]
+        absent = counts[:, STATUS_CODES['Absent']]
+        marked = present + half + absent
+        names = self._names()
+        frame = pd.DataFrame({
+            'employee_id': employee_ids,
+            'name': [names.get(int(e), '') for e in employee_ids],
+            'present_days': present,
+            'half_days': half,
+            'absent_days': absent,
+            'marked_days': marked,
+            'attendance_rate': np.divide(present + half * db.HALF_DAY_WEIGHT, marked,
+                                         out=np.zeros(len(marked)), where=marked > 0),
+        })
+        return frame[frame['marked_days'] > 0].sort_values('name', ignore_index=True)
+
+    def absentee_streaks(self, start_date, end_date, min_days=2):
+        """Runs of at least ``min_days`` consecutive Absent days per employee"""
+        emps, days, codes = self._between(start_date, end_date)
+        columns = ['employee_id', 'name', 'start_date', 'end_date', 'days']
+        absent = codes == STATUS_CODES['Absent']
+        emps, days = emps[absent].astype(np.int64), days[absent].astype(np.int64)
+        if not len(emps):
+            return pd.DataFrame(columns=columns)
+        order = np.lexsort((days, emps))
+        emps, days = emps[order], days[order]
+        # A streak starts wherever the employee changes or a day is skipped
+        starts = np.flatnonzero(np.r_[True, (np.diff(emps) != 0) | (np.diff(days) != 1)])
+        lengths = np.diff(np.r_[starts, len(days)])
+        long_enough = lengths >= min_days
+        starts, lengths = starts[long_enough], lengths[long_enough]
+        first = days[starts]
+        epoch = np.datetime64(EPOCH.isoformat(), 'D')
+        names = self._names()
+        frame = pd.DataFrame({
+            'employee_id': emps[starts],
+            'name': [names.get(int(e), '') for e in emps[starts]],
+            'start_date': (epoch + first).astype(str),
+            'end_date': (epoch + first + lengths - 1).astype(str),
+            'days': lengths,
+        })
+        return frame.sort_values(['days', 'start_date'], ascending=[False, True],
+                                 ignore_index=True)
+
+    def employee_calendar(self, employee_id, year):
+        """12 x 31 grid (month x day of month) of one employee's statuses"""
+        emps, days, codes = self._between(f"{year:04d}-01-01", f"{year:04d}-12-31")
+        mine = emps == employee_id
+        grid = np.zeros((12, 31), dtype=np.uint8)
+        if mine.any():
+            epoch = np.datetime64(EPOCH.isoformat(), 'D')
+            dates = epoch + days[mine].astype(np.int64)
+            months = dates.astype('datetime64[M]')
+            day_of_month = (dates - months.astype('datetime64[D]')).astype(np.int64)
+            grid[months.astype(np.int64) % 12, day_of_month] = codes[mine]
+        return pd.DataFrame(STATUS_NAMES[grid], index=range(1, 13), columns=range(1, 32))
+
+
+def get_store(path=None):
+    """The refreshed store for ``path`` (default: the current database)"""
+    path = path or db.current_path()
+    with _registry_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = AttendanceStore(path)
+    return store.refresh()
+
+
+def prune(path=None):
+    """Trim the attendance change log of ``path`` (default: the current database).
+
+    Returns the number of entries deleted. Stores that had not applied them
+    yet notice the gap on their next refresh and reload in full.
+    """
+    path = path or db.current_path()
+    with db.using_database(path), db.get_connection() as conn:
+        last_change = conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM attendance_changes").fetchone()[0]
+        deleted = conn.execute(_PRUNE_QUERY, (last_change,)).rowcount
+    logger.info(f"Pruned {deleted} attendance change(s) for {path}")
+    return deleted
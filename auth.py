@@ -0,0 +1,142 @@
+import secrets
+import threading
+import time
+import logging
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import database as db
+
+logger = logging.getLogger(__name__)
+
+# Password checks are slow on purpose (scrypt), so they run on a small
+# dedicated pool: a burst of logins cannot tie up more than HASH_WORKERS
+# cores. The signing-in session waits up to LOGIN_TIMEOUT for its result;
+# the hash releases the GIL, so other sessions keep rendering meanwhile.
+HASH_WORKERS = 2
+LOGIN_TIMEOUT = 10.0
+# A successful login yields a token; reruns check the token with a dict
+# lookup instead of hashing again
+SESSION_TTL = 8 * 60 * 60
+# Per-username throttling: MAX_FAILURES failed attempts within
+# FAILURE_WINDOW seconds lock the username for LOCKOUT seconds
+MAX_FAILURES = 5
+FAILURE_WINDOW = 5 * 60
+LOCKOUT = 5 * 60
+# Throttle state is kept for at most this many usernames, so attempts with
+# made-up usernames cannot grow it without bound. Expired entries go first.
+MAX_TRACKED = 10_000
+
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix='auth')
+_lock = threading.Lock()
+_sessions = {}
+# Both in least recently failed first order
+_failures = OrderedDict()
+_locked_until = OrderedDict()
+
+
+class LoginThrottled(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Too many failed attempts; try again in {retry_after:.0f} seconds")
+        self.retry_after = retry_after
+
+
+class LoginTimeout(Exception):
+    """The password check did not finish within LOGIN_TIMEOUT"""
+
+
+def _key(username):
+    return (username or '').strip().lower()
+
+
+def _check_throttle(key, now):
+    until = _locked_until.get(key)
+    if until is None:
+        return
+    if until > now:
+        raise LoginThrottled(until - now)
+    del _locked_until[key]
+
+
+def _evict(now):
+    """Forget expired lockouts and failure windows, then the oldest over MAX_TRACKED"""
+    for key in [k for k, until in _locked_until.items() if until <= now]:
+        del _locked_until[key]
+    for key in [k for k, times in _failures.items() if times[-1] < now - FAILURE_WINDOW]:
+        del _failures[key]
+    for tracked in (_failures, _locked_until):
+        while len(tracked) > MAX_TRACKED:
+            tracked.popitem(last=False)
+
+
+def _record_failure(key, now):
+    failures = _failures.setdefault(key, deque())
+    _failures.move_to_end(key)
+    failures.append(now)
+    while failures[0] < now - FAILURE_WINDOW:
+        failures.popleft()
+    if len(failures) >= MAX_FAILURES:
+        del _failures[key]
+        _locked_until[key] = now + LOCKOUT
+        _locked_until.move_to_end(key)
+        logger.warning(f"Login for '{key}' locked for {LOCKOUT}s after "
+                       f"{MAX_FAILURES} failed attempts")
+    if len(_failures) > MAX_TRACKED or len(_locked_until) > MAX_TRACKED:
+        _evict(now)
+
+
+def login(username, password):
+    """Verify credentials and return a session token, or None if they are wrong.
+
+    Raises LoginThrottled while the username is locked out, and LoginTimeout
+    if the password check takes longer than LOGIN_TIMEOUT. The hashing pool
+    only bounds how many checks run at once: this call still blocks the
+    calling session until its check finishes or times out.
+    """
+    key = _key(username)
+    with _lock:
+        # Counted as failed until it succeeds, so concurrent attempts cannot
+        # all pass the throttle before any of them is recorded
+        now = time.monotonic()
+        _check_throttle(key, now)
+        _record_failure(key, now)
+    future = _executor.submit(db.verify_admin, username, password)
+    try:
+        ok = future.result(LOGIN_TIMEOUT)
+    except TimeoutError:
+        future.cancel()
+        logger.warning(f"Login for '{key}' timed out after {LOGIN_TIMEOUT:.0f}s")
+        raise LoginTimeout() from None
+    if not ok:
+        return None
+    now = time.monotonic()
+    with _lock:
+        _failures.pop(key, None)
+        _locked_until.pop(key, None)
+        token = secrets.token_urlsafe(32)
+        _sessions[token] = (username, now + SESSION_TTL)
+        # Drop expired sessions while we hold the lock anyway
+        for stale in [t for t, (_, expires) in _sessions.items() if expires <= now]:
+            del _sessions[stale]
+    logger.info(f"Admin '{username}' logged in")
+    return token
+
+
+def session_user(token):
+    """Username for a live session token, else None"""
+    if not token:
+        return None
+    with _lock:
+        session = _sessions.get(token)
+        if session is None:
+            return None
+        username, expires = session
+        if expires <= time.monotonic():
+            del _sessions[token]
+            return None
+        return username
+
+
+def logout(token):
+    with _lock:
+        _sessions.pop(token, None)
@@ -0,0 +1,315 @@
+"""Benchmark the public functions of database.py against synthetic data.
+
+    python benchmark.py --sizes 50,200,1000 --years 2 --output bench.json
+
+For every size a fresh temporary database is generated from a fixed seed,
+then each function is timed and p50/p95 latency and throughput are written
+out as JSON so runs can be compared across commits.
+"""
+import argparse
+import inspect
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import database as db
+import db_cache
+from db_pool import all_pools
+
+STATUSES = ['Present', 'Present', 'Present', 'Present', 'Half-day', 'Absent']
+ITEMS = ['Rice', 'Wheat flour', 'Sugar', 'Salt', 'Cooking oil', 'Milk', 'Tea',
+         'Coffee', 'Lentils', 'Onions', 'Potatoes', 'Tomatoes', 'Soap',
+         'Detergent', 'Towels', 'Bedsheets', 'Toilet paper', 'Mineral water']
+UNITS = ['kg', 'liters', 'pieces', 'packets']
+
+# Functions that are not database operations in their own right
+NOT_BENCHMARKED = {'get_connection', 'pool_stats', 'retry_on_busy', 'use_database',
+                   'current_path', 'set_current_database', 'using_database',
+                   # Lazy generators; timing the call alone measures nothing
+                   'iter_attendance', 'iter_advances', 'iter_payroll'}
+
+
+def generate_data(path, employees, years, seed=0, end=None):
+    """Fill a fresh database at ``path`` with seeded synthetic history"""
+    rng = random.Random(seed)
+    end = end or date.today()
+    start = end - timedelta(days=365 * years)
+    db.use_database(path)
+    db.init_db()
+
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(
+            """INSERT INTO employees
+               (name, aadhar_number, phone, address, join_date, daily_wage)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            ((f"Employee {i:05d}", f"{100000000000 + i}",
+              f"9{rng.randrange(10 ** 9):09d}", f"{rng.randrange(1, 500)} Main Road",
+              start.isoformat(), float(rng.choice(range(300, 1500, 50))))
+             for i in range(employees)))
+        ids = [row[0] for row in conn.execute("SELECT id FROM employees")]
+
+        def attendance_rows():
+            day = start
+            while day <= end:
+                iso = day.isoformat()
+                for emp_id in ids:
+                    yield emp_id, iso, rng.choice(STATUSES)
+                day += timedelta(days=1)
+        conn.executemany(
+            "INSERT INTO attendance (employee_id, date, status) VALUES (?, ?, ?)",
+            attendance_rows())
+
+        months = years * 12
+        conn.executemany(
+            "INSERT INTO salary_advances (employee_id, amount, date) VALUES (?, ?, ?)",
+            ((rng.choice(ids), float(rng.randrange(100, 5000, 100)),
+              (start + timedelta(days=rng.randrange(365 * years))).isoformat())
+             for _ in range(employees * months // 4)))
+
+        # Stock enters through the ledger so inventory and movements agree
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        conn.executemany(
+            """INSERT INTO inventory (item_name, quantity, unit, last_updated)
+               VALUES (?, 0, ?, ?)""",
+            ((name, rng.choice(UNITS), now) for name in ITEMS))
+        conn.executemany(
+            """INSERT INTO inventory_movements (item_id, kind, quantity, created_at)
+               VALUES (?, 'receipt', ?, ?)""",
+            ((item_id, float(rng.randrange(1, 200)), now)
+             for (item_id,) in conn.execute("SELECT id FROM inventory").fetchall()))
+
+        conn.executemany(
+            "INSERT INTO rent_payments (due_date, amount, status) VALUES (?, ?, ?)",
+            (((start + timedelta(days=30 * m)).isoformat(), 50000.0,
+              'Paid' if m < months else 'Pending') for m in range(months + 3)))
+    conn.close()
+    db_cache.clear()
+    return ids
+
+
+class Context:
+    """Argument source for benchmark calls, drawing from the generated data"""
+
+    def __init__(self, path, seed):
+        self.rng = random.Random(seed)
+        conn = sqlite3.connect(path)
+        self.employee_ids = [r[0] for r in conn.execute("SELECT id FROM employees")]
+        self.attendance_ids = [r[0] for r in conn.execute(
+            "SELECT id FROM attendance ORDER BY id DESC LIMIT 1000")]
+        self.advance_ids = [r[0] for r in conn.execute("SELECT id FROM salary_advances")]
+        self.rent_ids = [r[0] for r in conn.execute("SELECT id FROM rent_payments")]
+        self.item_ids = [r[0] for r in conn.execute("SELECT id FROM inventory")]
+        self.last_date = date.fromisoformat(
+            conn.execute("SELECT MAX(date) FROM attendance").fetchone()[0])
+        conn.close()
+        self.counter = 0
+
+    def employee(self):
+        return self.rng.choice(self.employee_ids)
+
+    def day(self, back=0):
+        return (self.last_date - timedelta(days=back)).isoformat()
+
+    def month(self):
+        return self.last_date.month, self.last_date.year
+
+    def unique(self):
+        self.counter += 1
+        return self.counter
+
+
+def _args(ctx):
+    month, year = ctx.month()
+    return {
+        'init_db': lambda: (),
+        'ensure_schema': lambda: (),
+        'schema_version': lambda: (),
+        'verify_admin': lambda: ('admin', 'admin123'),
+        'set_admin_password': lambda: ('admin', 'admin123'),
+        'add_employee': lambda: (f"Bench {ctx.unique()}", f"B{time.time_ns()}",
+                                 '9000000000', 'Bench street', 500.0),
+        'update_employee': lambda: (ctx.employee(), 'Renamed', '9000000001',
+                                    'Updated street', 600.0),
+        'delete_employee': lambda: (-ctx.unique(),),
+        'get_employees': lambda: (),
+        'add_employees_bulk': lambda: ([
+            (f"Bulk {ctx.unique()}", f"K{time.time_ns()}{i}", '9000000000',
+             'Bench street', ctx.day(), 500.0) for i in range(100)],),
+        'existing_aadhar_numbers': lambda: (
+            [f"{100000000000 + i}" for i in range(0, 1000, 7)],),
+        'get_employee_ids': lambda: (),
+        'mark_attendance': lambda: (ctx.employee(), ctx.day(), 'Present'),
+        'mark_attendance_bulk': lambda: (
+            ctx.day(), [(emp_id, 'Present') for emp_id in ctx.employee_ids]),
+        'mark_attendance_rows': lambda: (
+            [(emp_id, ctx.day(back), 'Present')
+             for back in range(7) for emp_id in ctx.employee_ids],),
+        'update_attendance': lambda: (ctx.rng.choice(ctx.attendance_ids), 'Half-day'),
+        'delete_attendance': lambda: (-ctx.unique(),),
+        'get_attendance': lambda: (ctx.day(30), ctx.day()),
+        'get_attendance_summary': lambda: (month, year),
+        'rebuild_attendance_summary': lambda: (),
+        'update_inventory': lambda: (ctx.rng.choice(ITEMS), 50.0, 'kg'),
+        'update_inventory_bulk': lambda: ([(name, 25.0, 'kg') for name in ITEMS],),
+        'record_inventory_movement': lambda: (ctx.rng.choice(ctx.item_ids), 'receipt', 5.0),
+        'delete_inventory_item': lambda: (-ctx.unique(),),
+        'get_inventory': lambda: (),
+        'get_inventory_movements': lambda: (),
+        'set_reorder_level': lambda: (ctx.rng.choice(ctx.item_ids), 20.0),
+        'get_low_stock_items': lambda: (),
+        'add_advance': lambda: (ctx.employee(), 500.0),
+        'update_advance': lambda: (ctx.rng.choice(ctx.advance_ids), 750.0),
+        'delete_advance': lambda: (-ctx.unique(),),
+        'get_advances': lambda: (ctx.employee(), month, year),
+        'compute_payroll': lambda: (month, year),
+        'add_rent_payment': lambda: (ctx.day(-30), 50000.0, 'Pending'),
+        'update_rent_payment': lambda: (ctx.rng.choice(ctx.rent_ids), 50000.0, 'Paid'),
+        'delete_rent_payment': lambda: (-ctx.unique(),),
+        'get_rent_payments': lambda: (),
+        'add_rent_schedule': lambda: ('Bench lease', 25000.0, 5, ctx.day(90)),
+        'delete_rent_schedule': lambda: (-ctx.unique(),),
+        'get_rent_schedules': lambda: (),
+        'generate_rent_payments': lambda: (),
+        'get_pending_rent': lambda: (ctx.day(), ctx.day(-7)),
+        'get_employees_page': lambda: (),
+        'get_attendance_page': lambda: (ctx.day(30), ctx.day()),
+        'get_inventory_page': lambda: (),
+        'get_rent_payments_page': lambda: (),
+    }
+
+
+def public_functions():
+    return {name: func for name, func in inspect.getmembers(db, inspect.isfunction)
+            if func.__module__ == db.__name__ and not name.startswith('_')
+            and name not in NOT_BENCHMARKED}
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def time_function(func, make_args, repeat, warmup):
+    for _ in range(warmup):
+        func(*make_args())
+    samples = []
+    for _ in range(repeat):
+        args = make_args()
+        start = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - start)
+    total = sum(samples)
+    return {
+        'calls': repeat,
+        'p50_ms': round(_percentile(samples, 50) * 1000, 4),
+        'p95_ms': round(_percentile(samples, 95) * 1000, 4),
+        'mean_ms': round(statistics.fmean(samples) * 1000, 4),
+        'ops_per_sec': round(repeat / total, 2) if total else None,
+    }
+
+
+def run_size(employees, years, repeat, warmup, seed, only=None):
+    workdir = tempfile.mkdtemp(prefix='hotel_bench_')
+    path = os.path.join(workdir, 'hotel_management.db')
+    start = time.perf_counter()
+    generate_data(path, employees, years, seed)
+    generated_in = time.perf_counter() - start
+
+    conn = sqlite3.connect(path)
+    counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+              for table in ('employees', 'attendance', 'salary_advances',
+                            'inventory', 'rent_payments')}
+    conn.close()
+
+    ctx = Context(path, seed)
+    factories = _args(ctx)
+    results, skipped = {}, []
+    for name, func in sorted(public_functions().items()):
+        if only and name not in only:
+            continue
+        if name not in factories:
+            skipped.append(name)
+            continue
+        print(f"  {name}", file=sys.stderr)
+        results[name] = time_function(func, factories[name], repeat, warmup)
+
+    pool = all_pools().get(path)
+    report = {
+        'employees': employees,
+        'years': years,
+        'rows': counts,
+        'generate_seconds': round(generated_in, 3),
+        'functions': results,
+        'skipped': skipped,
+        'pool': pool.stats() if pool else None,
+        'db_bytes': os.path.getsize(path),
+    }
+    if pool:
+        pool.close_all()
+    shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='50,200,1000',
+                        help='comma separated employee counts')
+    parser.add_argument('--years', type=int, default=1,
+                        help='years of attendance history per size')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', help='comma separated function names')
+    parser.add_argument('--cache', action='store_true',
+                        help='keep the read cache enabled while timing')
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    args = parser.parse_args(argv)
+
+    # Keep per-call INFO logging out of the timings and off stdout
+    logging.getLogger().setLevel(logging.WARNING)
+    db_cache.set_enabled(args.cache)
+    only = set(args.only.split(',')) if args.only else None
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'cache': args.cache,
+        'seed': args.seed,
+        'sizes': [],
+    }
+    for size in (int(s) for s in args.sizes.split(',')):
+        print(f"Benchmarking {size} employees x {args.years} year(s)", file=sys.stderr)
+        report['sizes'].append(run_size(size, args.years, args.repeat,
+                                        args.warmup, args.seed, only))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
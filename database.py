@@ -1,393 +1,1190 @@
-import sqlite3
-from datetime import datetime
-import pandas as pd
-import logging
-import sys
-import os
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('database.log')
-    ]
-)
-logger = logging.getLogger(__name__)
-
-def init_db():
-    """Initialize the database with proper error handling"""
-    try:
-        logger.info("Starting database initialization...")
-        logger.info(f"Current working directory: {os.getcwd()}")
-        conn = sqlite3.connect('hotel_management.db')
-        c = conn.cursor()
-        logger.info("Creating database tables...")
-
-        # Create tables
-        c.execute('''CREATE TABLE IF NOT EXISTS admin
-                         (username TEXT PRIMARY KEY, password TEXT)''')
-
-        c.execute('''CREATE TABLE IF NOT EXISTS employees
-                         (id INTEGER PRIMARY KEY, name TEXT, aadhar_number TEXT UNIQUE,
-                          phone TEXT, address TEXT, join_date TEXT, daily_wage REAL)''')
-
-        c.execute('''CREATE TABLE IF NOT EXISTS attendance
-                         (id INTEGER PRIMARY KEY, employee_id INTEGER,
-                          date TEXT, status TEXT,
-                          FOREIGN KEY (employee_id) REFERENCES employees(id))''')
-
-        c.execute('''CREATE TABLE IF NOT EXISTS salary_advances
-                         (id INTEGER PRIMARY KEY, employee_id INTEGER,
-                          amount REAL, date TEXT,
-                          FOREIGN KEY (employee_id) REFERENCES employees(id))''')
-
-        c.execute('''CREATE TABLE IF NOT EXISTS inventory
-                         (id INTEGER PRIMARY KEY, item_name TEXT,
-                          quantity REAL, unit TEXT,
-                          last_updated TEXT)''')
-
-        c.execute('''CREATE TABLE IF NOT EXISTS rent_payments
-                         (id INTEGER PRIMARY KEY, due_date TEXT,
-                          amount REAL, status TEXT)''')
-
-        # Insert default admin if not exists
-        c.execute("INSERT OR IGNORE INTO admin VALUES (?, ?)",
-                  ("admin", "admin123"))
-
-
-        conn.commit()
-        logger.info("Database tables created successfully")
-
-    except sqlite3.Error as e:
-        logger.error(f"Database error: {str(e)}")
-        raise Exception(f"Failed to initialize database: {str(e)}")
-    except Exception as e:
-        logger.error(f"Unexpected error during database initialization: {str(e)}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
-
-
-# Admin functions
-def verify_admin(username, password):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        c = conn.cursor()
-        c.execute("SELECT * FROM admin WHERE username=? AND password=?",
-                  (username, password))
-        result = c.fetchone()
-        return result is not None
-    except sqlite3.Error as e:
-        logger.error(f"Database error during admin verification: {str(e)}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
-
-# Employee functions
-def add_employee(name, aadhar, phone, address, wage):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        c = conn.cursor()
-        c.execute("""INSERT INTO employees 
-                     (name, aadhar_number, phone, address, join_date, daily_wage)
-                     VALUES (?, ?, ?, ?, ?, ?)""",
-                  (name, aadhar, phone, address,
-                   datetime.now().strftime('%Y-%m-%d'), wage))
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        logger.warning(f"Duplicate aadhar number attempted: {aadhar}")
-        return False
-    except sqlite3.Error as e:
-        logger.error(f"Database error while adding employee: {str(e)}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
-
-def update_employee(emp_id, name, phone, address, wage):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        c = conn.cursor()
-        c.execute("""UPDATE employees 
-                     SET name=?, phone=?, address=?, daily_wage=?
-                     WHERE id=?""",
-                  (name, phone, address, wage, emp_id))
-        conn.commit()
-        return c.rowcount > 0
-    except sqlite3.Error as e:
-        logger.error(f"Error updating employee: {str(e)}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
-
-def delete_employee(emp_id):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        c = conn.cursor()
-        c.execute("DELETE FROM employees WHERE id=?", (emp_id,))
-        conn.commit()
-        return c.rowcount > 0
-    except sqlite3.Error as e:
-        logger.error(f"Error deleting employee: {str(e)}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
-
-def get_employees():
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        df = pd.read_sql_query("SELECT * FROM employees", conn)
-        return df
-    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
-        logger.error(f"Error fetching employees: {str(e)}")
-        return pd.DataFrame()
-    finally:
-        if 'conn' in locals():
-            conn.close()
-
-# Attendance functions
-def mark_attendance(employee_id, date, status):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        c = conn.cursor()
-        # First check if attendance already exists for this date
-        c.execute("""SELECT id FROM attendance 
-                            WHERE employee_id=? AND date=?""",
-                  (employee_id, date))
-        existing = c.fetchone()
-        if existing:
-            # Update existing attendance
-            c.execute("""UPDATE attendance SET status=?
-                                WHERE employee_id=? AND date=?""",
-                      (status, employee_id, date))
-        else:
-            # Insert new attendance
-            c.execute("""INSERT INTO attendance (employee_id, date, status)
-                                VALUES (?, ?, ?)""", (employee_id, date, status))
-        conn.commit()
-        return True
-    except sqlite3.Error as e:
-        logger.error(f"Error marking attendance: {str(e)}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
-
-
-def update_attendance(attendance_id, status):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        c = conn.cursor()
-        c.execute("""UPDATE attendance SET status=? WHERE id=?""",
-                  (status, attendance_id))
-        conn.commit()
-        return c.rowcount > 0
-    except sqlite3.Error as e:
-        logger.error(f"Error updating attendance: {str(e)}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
-def delete_attendance(attendance_id):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        c = conn.cursor()
-        c.execute("DELETE FROM attendance WHERE id=?", (attendance_id,))
-        conn.commit()
-        return c.rowcount > 0
-    except sqlite3.Error as e:
-        logger.error(f"Error deleting attendance: {str(e)}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
-
-
-def get_attendance(start_date, end_date):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        query = """
-            SELECT a.id, e.name, a.date, a.status
-            FROM attendance a
-            JOIN employees e ON a.employee_id = e.id
-            WHERE a.date BETWEEN ? AND ?
-            """
-        df = pd.read_sql_query(query, conn, params=(start_date, end_date))
-        return df
-    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
-        logger.error(f"Error fetching attendance: {str(e)}")
-        return pd.DataFrame()
-    finally:
-        if 'conn' in locals():
-            conn.close()
-
-# Inventory functions
-def update_inventory(item_name, quantity, unit):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        c = conn.cursor()
-        c.execute("""INSERT OR REPLACE INTO inventory 
-                         (item_name, quantity, unit, last_updated)
-                         VALUES (?, ?, ?, ?)""",
-                  (item_name, quantity, unit,
-                   datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
-        conn.commit()
-        return True
-    except sqlite3.Error as e:
-        logger.error(f"Error updating inventory: {str(e)}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
-
-def delete_inventory_item(item_id):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        c = conn.cursor()
-        c.execute("DELETE FROM inventory WHERE id=?", (item_id,))
-        conn.commit()
-        return c.rowcount > 0
-    except sqlite3.Error as e:
-        logger.error(f"Error deleting inventory item: {str(e)}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
-
-
-def get_inventory():
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        df = pd.read_sql_query("SELECT * FROM inventory", conn)
-        return df
-    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
-        logger.error(f"Error fetching inventory: {str(e)}")
-        return pd.DataFrame()
-    finally:
-        if 'conn' in locals():
-            conn.close()
-#
-def add_advance(employee_id, amount):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        c = conn.cursor()
-        c.execute("""INSERT INTO salary_advances 
-                         (employee_id, amount, date)
-                         VALUES (?, ?, ?)""",
-                  (employee_id, amount, datetime.now().strftime('%Y-%m-%d')))
-        conn.commit()
-        return True
-    except sqlite3.Error as e:
-        logger.error(f"Error adding salary advance: {str(e)}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
-
-def update_advance(advance_id, amount):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        c = conn.cursor()
-        c.execute("""UPDATE salary_advances SET amount=? WHERE id=?""",
-                  (amount, advance_id))
-        conn.commit()
-        return c.rowcount > 0
-    except sqlite3.Error as e:
-        logger.error(f"Error updating salary advance: {str(e)}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
-def delete_advance(advance_id):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        c = conn.cursor()
-        c.execute("DELETE FROM salary_advances WHERE id=?", (advance_id,))
-        conn.commit()
-        return c.rowcount > 0
-    except sqlite3.Error as e:
-        logger.error(f"Error deleting salary advance: {str(e)}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
-def get_advances(employee_id, month, year):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        query = """
-            SELECT id, amount, date FROM salary_advances
-            WHERE employee_id = ?
-            AND strftime('%m', date) = ? AND strftime('%Y', date) = ?
-            """
-        df = pd.read_sql_query(query, conn,
-                           params=(employee_id, f"{month:02d}", str(year)))
-        return df
-    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
-        logger.error(f"Error fetching salary advances: {str(e)}")
-        return pd.DataFrame()
-
-    finally:
-        if 'conn' in locals():
-            conn.close()
-
-# Rent payment functions
-def add_rent_payment(due_date, amount, status):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        c = conn.cursor()
-        c.execute("""INSERT INTO rent_payments (due_date, amount, status)
-                     VALUES (?, ?, ?)""",
-                  (due_date, amount, status))
-        conn.commit()
-        return True
-    except sqlite3.Error as e:
-        logger.error(f"Error adding rent payment: {str(e)}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
-def update_rent_payment(payment_id, amount, status):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        c = conn.cursor()
-        c.execute("""UPDATE rent_payments SET amount=?, status=?
-                     WHERE id=?""", (amount, status, payment_id))
-        conn.commit()
-        return c.rowcount > 0
-    except sqlite3.Error as e:
-        logger.error(f"Error updating rent payment: {str(e)}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
-def delete_rent_payment(payment_id):
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        c = conn.cursor()
-        c.execute("DELETE FROM rent_payments WHERE id=?", (payment_id,))
-        conn.commit()
-        return c.rowcount > 0
-    except sqlite3.Error as e:
-        logger.error(f"Error deleting rent payment: {str(e)}")
-        raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
-def get_rent_payments():
-    try:
-        conn = sqlite3.connect('hotel_management.db')
-        df = pd.read_sql_query("SELECT * FROM rent_payments", conn)
-        return df
-    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
-        logger.error(f"Error fetching rent payments: {str(e)}")
-        return pd.DataFrame()
-    finally:
-        if 'conn' in locals():
-            conn.close()
\ No newline at end of file
+import sqlite3
+import calendar
+from datetime import date, datetime, timedelta
+import pandas as pd
+import logging
+import os
+import time
+import random
+import functools
+import threading
+from contextlib import contextmanager
+import logging_setup
+from db_pool import get_pool, DEFAULT_PROFILE
+import query_stats
+from query_stats import instrumented
+import migrations
+import passwords
+import db_cache
+from db_cache import cached_read, invalidate, invalidates, do_not_cache, clear as clear_cache
+
+# Configure logging (queued, rotating JSON files; see logging_setup.py)
+logging_setup.configure()
+logger = logging.getLogger(__name__)
+
+DB_PATH = 'hotel_management.db'
+
+ATTENDANCE_STATUSES = ('Present', 'Absent', 'Half-day')
+INVENTORY_UNITS = ('kg', 'liters', 'pieces', 'packets')
+
+# PRAGMAs applied to every connection; edit before the first query to tune
+STORAGE_PROFILE = dict(DEFAULT_PROFILE)
+
+BUSY_RETRIES = 5
+BUSY_BASE_DELAY = 0.05
+BUSY_MAX_DELAY = 2.0
+
+
+# Per-thread database override set by using_database(); falls back to
+# DB_PATH. This is how one process serves several property files, each
+# with its own connection pool and write lock (see properties.py).
+_route = threading.local()
+
+
+def current_path():
+    """Database file the calling thread's queries go to"""
+    return getattr(_route, 'path', None) or DB_PATH
+
+
+def set_current_database(path):
+    """Route this thread's queries to ``path`` (None for the default)"""
+    _route.path = path
+
+
+@contextmanager
+def using_database(path):
+    """Route the calling thread's queries to ``path`` inside the block"""
+    previous = getattr(_route, 'path', None)
+    _route.path = path
+    try:
+        yield
+    finally:
+        _route.path = previous
+
+
+def _pool():
+    return get_pool(current_path(), profile=STORAGE_PROFILE,
+                    on_connect=query_stats.install)
+
+
+def get_connection():
+    """Context manager yielding a pooled connection to the hotel database"""
+    return _pool().connection()
+
+
+def _is_busy(error):
+    code = getattr(error, 'sqlite_errorcode', None)
+    if code is not None:
+        # SQLITE_BUSY / SQLITE_LOCKED plus their extended codes
+        return (code & 0xff) in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def retry_on_busy(func):
+    """Retry a write with jittered exponential backoff while SQLite is busy"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(BUSY_RETRIES + 1):
+            try:
+                return func(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                # Inside an outer transaction the caller owns the retry
+                if (not _is_busy(e) or attempt == BUSY_RETRIES
+                        or _pool().holds_connection()):
+                    raise
+                delay = min(BUSY_MAX_DELAY, BUSY_BASE_DELAY * 2 ** attempt)
+                delay *= random.uniform(0.5, 1.0)
+                logger.warning(f"Database busy in {func.__name__}, "
+                               f"retrying in {delay:.2f}s")
+                time.sleep(delay)
+    return wrapper
+
+
+def use_database(path):
+    """Point every function in this module at another database file by default"""
+    global DB_PATH
+    DB_PATH = path
+    clear_cache()
+
+
+# Cached reads are keyed by database file so properties never share entries
+db_cache.set_scope(current_path)
+
+
+def pool_stats():
+    """Hit/open/wait counters for the hotel database connection pool"""
+    return _pool().stats()
+
+@invalidates('employees', 'attendance', 'salary_advances', 'inventory', 'rent_payments')
+@instrumented
+def init_db():
+    """Initialize the database with proper error handling"""
+    try:
+        logger.info("Starting database initialization...")
+        logger.info(f"Current working directory: {os.getcwd()}")
+        with get_connection() as conn:
+            c = conn.cursor()
+            logger.info("Creating database tables...")
+
+            # Create tables
+            c.execute('''CREATE TABLE IF NOT EXISTS admin
+                             (username TEXT PRIMARY KEY, password TEXT)''')
+
+            c.execute('''CREATE TABLE IF NOT EXISTS employees
+                             (id INTEGER PRIMARY KEY, name TEXT, aadhar_number TEXT UNIQUE,
+                              phone TEXT, address TEXT, join_date TEXT, daily_wage REAL)''')
+
+            c.execute('''CREATE TABLE IF NOT EXISTS attendance
+                             (id INTEGER PRIMARY KEY, employee_id INTEGER,
+                              date TEXT, status TEXT,
+                              FOREIGN KEY (employee_id) REFERENCES employees(id))''')
+
+            c.execute('''CREATE TABLE IF NOT EXISTS salary_advances
+                             (id INTEGER PRIMARY KEY, employee_id INTEGER,
+                              amount REAL, date TEXT,
+                              FOREIGN KEY (employee_id) REFERENCES employees(id))''')
+
+            c.execute('''CREATE TABLE IF NOT EXISTS inventory
+                             (id INTEGER PRIMARY KEY, item_name TEXT,
+                              quantity REAL, unit TEXT,
+                              last_updated TEXT)''')
+
+            c.execute('''CREATE TABLE IF NOT EXISTS rent_payments
+                             (id INTEGER PRIMARY KEY, due_date TEXT,
+                              amount REAL, status TEXT)''')
+
+            # Insert default admin if there is none; hashing is deliberately
+            # slow, so skip it when the table is already populated
+            if c.execute("SELECT 1 FROM admin LIMIT 1").fetchone() is None:
+                c.execute("INSERT OR IGNORE INTO admin VALUES (?, ?)",
+                          ("admin", passwords.hash_password("admin123")))
+
+            applied = migrations.migrate(conn)
+            if applied:
+                logger.info(f"Applied schema migrations: {applied}")
+
+            logger.info("Database tables created successfully")
+
+    except sqlite3.Error as e:
+        logger.error(f"Database error: {str(e)}")
+        raise Exception(f"Failed to initialize database: {str(e)}")
+    except Exception as e:
+        logger.error(f"Unexpected error during database initialization: {str(e)}")
+        raise
+
+
+def schema_version():
+    with get_connection() as conn:
+        return migrations.current_version(conn)
+
+
+def ensure_schema():
+    """Run init_db only when the database is behind the latest migration.
+
+    An up-to-date database costs a single PRAGMA. Returns True if init_db ran.
+    """
+    version = schema_version()
+    latest = migrations.latest_version()
+    if version > latest:
+        logger.warning(f"Database schema version {version} is newer than this "
+                       f"code ({latest})")
+    if version >= latest:
+        return False
+    init_db()
+    return True
+
+
+# Admin functions
+@instrumented
+def verify_admin(username, password):
+    """Check a login against the stored scrypt hash.
+
+    CPU bound by design; auth.login runs it off the Streamlit script thread.
+    """
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("SELECT password FROM admin WHERE username=?", (username,))
+            result = c.fetchone()
+    except sqlite3.Error as e:
+        logger.error(f"Database error during admin verification: {str(e)}")
+        raise
+    # Outside the connection block so hashing does not hold a pooled connection
+    return passwords.check_password(password, result[0] if result else None)
+
+
+@retry_on_busy
+@instrumented
+def set_admin_password(username, password):
+    hashed = passwords.hash_password(password)
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("UPDATE admin SET password=? WHERE username=?", (hashed, username))
+            return c.rowcount > 0
+    except sqlite3.Error as e:
+        logger.error(f"Error updating admin password: {str(e)}")
+        raise
+
+# Employee functions
+@invalidates('employees')
+@retry_on_busy
+@instrumented
+def add_employee(name, aadhar, phone, address, wage):
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("""INSERT INTO employees 
+                         (name, aadhar_number, phone, address, join_date, daily_wage)
+                         VALUES (?, ?, ?, ?, ?, ?)""",
+                      (name, aadhar, phone, address,
+                       datetime.now().strftime('%Y-%m-%d'), wage))
+            return True
+    except sqlite3.IntegrityError:
+        logger.warning(f"Duplicate aadhar number attempted: {aadhar}")
+        return False
+    except sqlite3.Error as e:
+        logger.error(f"Database error while adding employee: {str(e)}")
+        raise
+
+@invalidates('employees')
+@retry_on_busy
+@instrumented
+def update_employee(emp_id, name, phone, address, wage):
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("""UPDATE employees 
+                         SET name=?, phone=?, address=?, daily_wage=?
+                         WHERE id=?""",
+                      (name, phone, address, wage, emp_id))
+            return c.rowcount > 0
+    except sqlite3.Error as e:
+        logger.error(f"Error updating employee: {str(e)}")
+        raise
+
+@invalidates('employees')
+@retry_on_busy
+@instrumented
+def delete_employee(emp_id):
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("DELETE FROM employees WHERE id=?", (emp_id,))
+            return c.rowcount > 0
+    except sqlite3.Error as e:
+        logger.error(f"Error deleting employee: {str(e)}")
+        raise
+
+@cached_read('employees')
+@instrumented
+def get_employees():
+    try:
+        with get_connection() as conn:
+            df = pd.read_sql_query("SELECT * FROM employees", conn)
+            return df
+    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
+        logger.error(f"Error fetching employees: {str(e)}")
+        do_not_cache()
+        return pd.DataFrame()
+
+
+@invalidates('employees')
+@retry_on_busy
+@instrumented
+def add_employees_bulk(rows):
+    """Insert many employees in one transaction.
+
+    ``rows`` holds ``(name, aadhar, phone, address, join_date, wage)`` tuples.
+    Rows whose Aadhar number already exists are skipped; returns the number
+    of employees inserted.
+    """
+    try:
+        with get_connection() as conn:
+            before = conn.total_changes
+            conn.executemany("""INSERT INTO employees
+                                  (name, aadhar_number, phone, address, join_date, daily_wage)
+                                  VALUES (?, ?, ?, ?, ?, ?)
+                                  ON CONFLICT(aadhar_number) DO NOTHING""", rows)
+            return conn.total_changes - before
+    except sqlite3.Error as e:
+        logger.error(f"Error adding employees in bulk: {str(e)}")
+        raise
+
+
+@instrumented
+def existing_aadhar_numbers(numbers):
+    """Subset of ``numbers`` already registered to an employee"""
+    numbers = list(numbers)
+    found = set()
+    try:
+        with get_connection() as conn:
+            # Stay well below SQLite's bound parameter limit
+            for i in range(0, len(numbers), 500):
+                chunk = numbers[i:i + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                found.update(row[0] for row in conn.execute(
+                    f"SELECT aadhar_number FROM employees "
+                    f"WHERE aadhar_number IN ({placeholders})", chunk))
+        return found
+    except sqlite3.Error as e:
+        logger.error(f"Error checking Aadhar numbers: {str(e)}")
+        raise
+
+
+@instrumented
+def get_employee_ids():
+    try:
+        with get_connection() as conn:
+            return {row[0] for row in conn.execute("SELECT id FROM employees")}
+    except sqlite3.Error as e:
+        logger.error(f"Error fetching employee ids: {str(e)}")
+        raise
+
+# Attendance functions
+_UPSERT_ATTENDANCE = """INSERT INTO attendance (employee_id, date, status)
+                        VALUES (?, ?, ?)
+                        ON CONFLICT(employee_id, date)
+                        DO UPDATE SET status=excluded.status"""
+# For rows validated earlier: an employee deleted in between writes nothing
+_UPSERT_EXISTING_EMPLOYEE_ATTENDANCE = """
+    INSERT INTO attendance (employee_id, date, status)
+    SELECT ?, ?, ? WHERE EXISTS (SELECT 1 FROM employees WHERE id = ?)
+    ON CONFLICT(employee_id, date) DO UPDATE SET status=excluded.status"""
+
+
+@invalidates('attendance')
+@retry_on_busy
+@instrumented
+def mark_attendance(employee_id, date, status):
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute(_UPSERT_ATTENDANCE, (employee_id, date, status))
+            return True
+    except sqlite3.Error as e:
+        logger.error(f"Error marking attendance: {str(e)}")
+        raise
+
+
+@invalidates('attendance')
+@retry_on_busy
+@instrumented
+def mark_attendance_bulk(date, records):
+    """Mark attendance for many employees on one date in a single transaction.
+
+    ``records`` is an iterable of ``(employee_id, status)`` pairs.
+    """
+    try:
+        rows = [(int(employee_id), date, status) for employee_id, status in records]
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.executemany(_UPSERT_ATTENDANCE, rows)
+            return True
+    except sqlite3.Error as e:
+        logger.error(f"Error marking attendance in bulk: {str(e)}")
+        raise
+
+
+@invalidates('attendance')
+@retry_on_busy
+@instrumented
+def mark_attendance_rows(rows):
+    """Upsert ``(employee_id, date, status)`` rows spanning any dates in one transaction.
+
+    Rows for employees that do not exist are skipped; returns how many
+    rows were written.
+    """
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.executemany(_UPSERT_EXISTING_EMPLOYEE_ATTENDANCE,
+                          ((employee_id, day, status, employee_id)
+                           for employee_id, day, status in rows))
+            return c.rowcount
+    except sqlite3.Error as e:
+        logger.error(f"Error importing attendance: {str(e)}")
+        raise
+
+
+@invalidates('attendance')
+@retry_on_busy
+@instrumented
+def update_attendance(attendance_id, status):
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("""UPDATE attendance SET status=? WHERE id=?""",
+                      (status, attendance_id))
+            return c.rowcount > 0
+    except sqlite3.Error as e:
+        logger.error(f"Error updating attendance: {str(e)}")
+        raise
+@invalidates('attendance')
+@retry_on_busy
+@instrumented
+def delete_attendance(attendance_id):
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("DELETE FROM attendance WHERE id=?", (attendance_id,))
+            return c.rowcount > 0
+    except sqlite3.Error as e:
+        logger.error(f"Error deleting attendance: {str(e)}")
+        raise
+
+
+@invalidates('attendance')
+@retry_on_busy
+@instrumented
+def rebuild_attendance_summary():
+    """Recompute attendance_monthly_summary from the raw attendance rows"""
+    try:
+        with get_connection() as conn:
+            migrations.rebuild_attendance_summary(conn)
+            return True
+    except sqlite3.Error as e:
+        logger.error(f"Error rebuilding attendance summary: {str(e)}")
+        raise
+
+
+@cached_read('attendance', 'employees')
+@instrumented
+def get_attendance_summary(month, year):
+    """Per-employee Present/Half-day/Absent counts for one month"""
+    try:
+        with get_connection() as conn:
+            query = """
+                SELECT e.id AS employee_id, e.name,
+                       COALESCE(s.present_days, 0) AS present_days,
+                       COALESCE(s.half_days, 0) AS half_days,
+                       COALESCE(s.absent_days, 0) AS absent_days
+                FROM employees e
+                LEFT JOIN attendance_monthly_summary s
+                       ON s.employee_id = e.id AND s.year = ? AND s.month = ?
+                ORDER BY e.name, e.id
+                """
+            df = pd.read_sql_query(query, conn, params=(year, month))
+            return df
+    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
+        logger.error(f"Error fetching attendance summary: {str(e)}")
+        do_not_cache()
+        return pd.DataFrame()
+
+
+@cached_read('attendance', 'employees')
+@instrumented
+def get_attendance(start_date, end_date):
+    try:
+        with get_connection() as conn:
+            query = """
+                SELECT a.id, e.name, a.date, a.status
+                FROM attendance a
+                JOIN employees e ON a.employee_id = e.id
+                WHERE a.date BETWEEN ? AND ?
+                """
+            df = pd.read_sql_query(query, conn, params=(start_date, end_date))
+            return df
+    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
+        logger.error(f"Error fetching attendance: {str(e)}")
+        do_not_cache()
+        return pd.DataFrame()
+
+# Inventory functions
+#
+# inventory holds one row per item whose quantity is the current stock;
+# every change goes through the append-only inventory_movements ledger and
+# a trigger applies it to inventory.quantity (see migrations.py). Deleted
+# items are only marked with deleted_at, so their history stays auditable.
+MOVEMENT_KINDS = migrations.MOVEMENT_KINDS
+_ITEM_COLUMNS = "id, item_name, quantity, unit, last_updated, reorder_level"
+
+_UPSERT_ITEM = """INSERT INTO inventory (item_name, quantity, unit, last_updated)
+                  VALUES (?, 0, ?, ?)
+                  ON CONFLICT(item_name) DO UPDATE SET unit = excluded.unit,
+                                                       deleted_at = NULL"""
+# Records the difference between the wanted and the current quantity
+_SET_STOCK = """INSERT INTO inventory_movements (item_id, kind, quantity, note, created_at)
+                SELECT id, 'adjustment', ? - quantity, 'stock count', ?
+                FROM inventory WHERE item_name = ? AND quantity != ?"""
+
+
+@invalidates('inventory', 'inventory_movements')
+@retry_on_busy
+@instrumented
+def update_inventory(item_name, quantity, unit, reorder_level=None):
+    """Set the stock of ``item_name`` to ``quantity``, creating the item if new"""
+    try:
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute(_UPSERT_ITEM, (item_name, unit, now))
+            if reorder_level is not None:
+                c.execute("UPDATE inventory SET reorder_level=? WHERE item_name=?",
+                          (reorder_level, item_name))
+            c.execute(_SET_STOCK, (quantity, now, item_name, quantity))
+            return True
+    except sqlite3.Error as e:
+        logger.error(f"Error updating inventory: {str(e)}")
+        raise
+
+
+@invalidates('inventory', 'inventory_movements')
+@retry_on_busy
+@instrumented
+def update_inventory_bulk(rows):
+    """Apply ``(item_name, quantity, unit)`` stock counts in one transaction"""
+    try:
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.executemany(_UPSERT_ITEM, [(name, unit, now) for name, _, unit in rows])
+            c.executemany(_SET_STOCK, [(quantity, now, name, quantity)
+                                       for name, quantity, _ in rows])
+            return True
+    except sqlite3.Error as e:
+        logger.error(f"Error updating inventory in bulk: {str(e)}")
+        raise
+
+
+@invalidates('inventory', 'inventory_movements')
+@retry_on_busy
+@instrumented
+def record_inventory_movement(item_id, kind, quantity, note=None):
+    """Append a receipt, consumption or adjustment to the stock ledger.
+
+    ``quantity`` is the amount received or consumed; adjustments are signed.
+    Consumption beyond the current stock raises sqlite3.IntegrityError.
+    """
+    if kind not in MOVEMENT_KINDS:
+        raise ValueError(f"Unknown movement kind: {kind}")
+    if kind == 'receipt':
+        delta = abs(quantity)
+    elif kind == 'consumption':
+        delta = -abs(quantity)
+    else:
+        delta = quantity
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("""INSERT INTO inventory_movements
+                             (item_id, kind, quantity, note, created_at)
+                             VALUES (?, ?, ?, ?, ?)""",
+                      (item_id, kind, delta, note or None,
+                       datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+            return True
+    except sqlite3.Error as e:
+        logger.error(f"Error recording inventory movement: {str(e)}")
+        raise
+
+
+@invalidates('inventory')
+@retry_on_busy
+@instrumented
+def set_reorder_level(item_id, reorder_level):
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("UPDATE inventory SET reorder_level=? WHERE id=? AND deleted_at IS NULL",
+                      (reorder_level, item_id))
+            return c.rowcount > 0
+    except sqlite3.Error as e:
+        logger.error(f"Error updating reorder level: {str(e)}")
+        raise
+
+
+@invalidates('inventory', 'inventory_movements')
+@retry_on_busy
+@instrumented
+def delete_inventory_item(item_id):
+    """Write off the item's remaining stock and mark it deleted.
+
+    The item and its movements stay in the database; adding an item with
+    the same name later brings it back with its history.
+    """
+    try:
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("""INSERT INTO inventory_movements
+                             (item_id, kind, quantity, note, created_at)
+                         SELECT id, 'adjustment', -quantity, 'item deleted', ?
+                         FROM inventory
+                         WHERE id = ? AND deleted_at IS NULL AND quantity != 0""",
+                      (now, item_id))
+            c.execute("UPDATE inventory SET deleted_at=? WHERE id=? AND deleted_at IS NULL",
+                      (now, item_id))
+            return c.rowcount > 0
+    except sqlite3.Error as e:
+        logger.error(f"Error deleting inventory item: {str(e)}")
+        raise
+
+
+@cached_read('inventory_movements', 'inventory')
+@instrumented
+def get_inventory_movements(item_id=None, limit=100):
+    """Most recent ledger entries, for one item or all of them"""
+    where, params = "", []
+    if item_id is not None:
+        where = "WHERE m.item_id = ?"
+        params.append(item_id)
+    try:
+        with get_connection() as conn:
+            df = pd.read_sql_query(
+                f"""SELECT m.id, m.created_at, i.item_name, m.kind, m.quantity,
+                           i.unit, m.note
+                    FROM inventory_movements m
+                    JOIN inventory i ON i.id = m.item_id
+                    {where}
+                    ORDER BY m.id DESC
+                    LIMIT ?""", conn, params=params + [limit])
+            return df
+    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
+        logger.error(f"Error fetching inventory movements: {str(e)}")
+        do_not_cache()
+        return pd.DataFrame()
+
+
+@cached_read('inventory')
+@instrumented
+def get_inventory():
+    try:
+        with get_connection() as conn:
+            df = pd.read_sql_query(f"""SELECT {_ITEM_COLUMNS} FROM inventory
+                                       WHERE deleted_at IS NULL
+                                       ORDER BY item_name""", conn)
+            return df
+    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
+        logger.error(f"Error fetching inventory: {str(e)}")
+        do_not_cache()
+        return pd.DataFrame()
+
+
+@cached_read('inventory')
+@instrumented
+def get_low_stock_items():
+    """Items whose stock is below their reorder level"""
+    try:
+        with get_connection() as conn:
+            # The condition matches ix_inventory_low_stock's, so SQLite can
+            # answer from the partial index
+            df = pd.read_sql_query(
+                """SELECT id, item_name, quantity, unit, reorder_level
+                   FROM inventory
+                   WHERE quantity < reorder_level AND deleted_at IS NULL
+                   ORDER BY item_name""", conn)
+            return df
+    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
+        logger.error(f"Error fetching low stock items: {str(e)}")
+        do_not_cache()
+        return pd.DataFrame()
+#
+@invalidates('salary_advances')
+@retry_on_busy
+@instrumented
+def add_advance(employee_id, amount):
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("""INSERT INTO salary_advances 
+                             (employee_id, amount, date)
+                             VALUES (?, ?, ?)""",
+                      (employee_id, amount, datetime.now().strftime('%Y-%m-%d')))
+            return True
+    except sqlite3.Error as e:
+        logger.error(f"Error adding salary advance: {str(e)}")
+        raise
+
+@invalidates('salary_advances')
+@retry_on_busy
+@instrumented
+def update_advance(advance_id, amount):
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("""UPDATE salary_advances SET amount=? WHERE id=?""",
+                      (amount, advance_id))
+            return c.rowcount > 0
+    except sqlite3.Error as e:
+        logger.error(f"Error updating salary advance: {str(e)}")
+        raise
+@invalidates('salary_advances')
+@retry_on_busy
+@instrumented
+def delete_advance(advance_id):
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("DELETE FROM salary_advances WHERE id=?", (advance_id,))
+            return c.rowcount > 0
+    except sqlite3.Error as e:
+        logger.error(f"Error deleting salary advance: {str(e)}")
+        raise
+
+
+def _month_range(month, year):
+    """Half-open [start, end) ISO date bounds of a calendar month"""
+    start = f"{year:04d}-{month:02d}-01"
+    if month == 12:
+        end = f"{year + 1:04d}-01-01"
+    else:
+        end = f"{year:04d}-{month + 1:02d}-01"
+    return start, end
+
+
+@cached_read('salary_advances')
+@instrumented
+def get_advances(employee_id, month, year):
+    try:
+        start, end = _month_range(month, year)
+        with get_connection() as conn:
+            query = """
+                SELECT id, amount, date FROM salary_advances
+                WHERE employee_id = ?
+                AND date >= ? AND date < ?
+                """
+            df = pd.read_sql_query(query, conn,
+                               params=(employee_id, start, end))
+            return df
+    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
+        logger.error(f"Error fetching salary advances: {str(e)}")
+        do_not_cache()
+        return pd.DataFrame()
+
+
+# Payroll functions
+HALF_DAY_WEIGHT = 0.5
+
+_PAYROLL_QUERY = """
+    SELECT employee_id, name, daily_wage,
+           present_days, half_days, absent_days, gross, advances,
+           gross - advances AS net
+    FROM (
+        -- An employee without a wage is paid nothing rather than NULL
+        SELECT e.id AS employee_id, e.name, COALESCE(e.daily_wage, 0) AS daily_wage,
+               COALESCE(a.present_days, 0) AS present_days,
+               COALESCE(a.half_days, 0) AS half_days,
+               COALESCE(a.absent_days, 0) AS absent_days,
+               (COALESCE(a.present_days, 0)
+                + COALESCE(a.half_days, 0) * :half_day_weight)
+                   * COALESCE(e.daily_wage, 0) AS gross,
+               COALESCE(s.advances, 0) AS advances
+        FROM employees e
+        LEFT JOIN attendance_monthly_summary a
+               ON a.employee_id = e.id AND a.year = :year AND a.month = :month
+        LEFT JOIN (
+            SELECT employee_id, SUM(amount) AS advances
+            FROM salary_advances
+            WHERE date >= :start AND date < :end
+            GROUP BY employee_id
+        ) s ON s.employee_id = e.id
+    )
+    ORDER BY name, employee_id
+    """
+
+
+@cached_read('employees', 'attendance', 'salary_advances')
+@instrumented
+def compute_payroll(month, year):
+    """Gross pay, advances and net pay for every employee for one month"""
+    try:
+        start, end = _month_range(month, year)
+        with get_connection() as conn:
+            df = pd.read_sql_query(_PAYROLL_QUERY, conn,
+                                   params={'start': start, 'end': end,
+                                           'year': year, 'month': month,
+                                           'half_day_weight': HALF_DAY_WEIGHT})
+            return df
+    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
+        logger.error(f"Error computing payroll: {str(e)}")
+        do_not_cache()
+        return pd.DataFrame()
+
+
+# Streaming reads
+#
+# Cursor-backed generators for exports: rows are fetched ``chunk_size`` at a
+# time, so the full history is never materialised in memory. Each chunk is a
+# ``(columns, rows)`` pair. The pooled connection stays checked out by the
+# consuming thread until the generator is exhausted or closed.
+EXPORT_CHUNK_SIZE = 5000
+
+
+def _iter_query(query, params, chunk_size):
+    with get_connection() as conn:
+        cursor = conn.execute(query, params)
+        columns = [d[0] for d in cursor.description]
+        # Always yield at least once so writers can emit a header
+        rows = cursor.fetchmany(chunk_size)
+        yield columns, rows
+        while rows:
+            rows = cursor.fetchmany(chunk_size)
+            if rows:
+                yield columns, rows
+
+
+def iter_attendance(start_date, end_date, chunk_size=EXPORT_CHUNK_SIZE):
+    query = """
+        SELECT a.id, a.employee_id, e.name, a.date, a.status
+        FROM attendance a
+        JOIN employees e ON a.employee_id = e.id
+        WHERE a.date BETWEEN ? AND ?
+        ORDER BY a.date, e.name
+        """
+    return _iter_query(query, (start_date, end_date), chunk_size)
+
+
+def iter_advances(start_date, end_date, employee_id=None,
+                  chunk_size=EXPORT_CHUNK_SIZE):
+    query = """
+        SELECT s.id, s.employee_id, e.name, s.amount, s.date
+        FROM salary_advances s
+        JOIN employees e ON s.employee_id = e.id
+        WHERE s.date BETWEEN ? AND ?
+        """
+    params = [start_date, end_date]
+    if employee_id is not None:
+        query += " AND s.employee_id = ?"
+        params.append(employee_id)
+    return _iter_query(query + " ORDER BY s.date, s.id", params, chunk_size)
+
+
+def iter_payroll(month, year, chunk_size=EXPORT_CHUNK_SIZE):
+    start, end = _month_range(month, year)
+    return _iter_query(_PAYROLL_QUERY,
+                       {'start': start, 'end': end, 'year': year, 'month': month,
+                        'half_day_weight': HALF_DAY_WEIGHT}, chunk_size)
+
+
+# Rent payment functions
+@invalidates('rent_payments')
+@retry_on_busy
+@instrumented
+def add_rent_payment(due_date, amount, status):
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("""INSERT INTO rent_payments (due_date, amount, status)
+                         VALUES (?, ?, ?)""",
+                      (due_date, amount, status))
+            return True
+    except sqlite3.Error as e:
+        logger.error(f"Error adding rent payment: {str(e)}")
+        raise
+@invalidates('rent_payments')
+@retry_on_busy
+@instrumented
+def update_rent_payment(payment_id, amount, status):
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("""UPDATE rent_payments SET amount=?, status=?
+                         WHERE id=?""", (amount, status, payment_id))
+            return c.rowcount > 0
+    except sqlite3.Error as e:
+        logger.error(f"Error updating rent payment: {str(e)}")
+        raise
+@invalidates('rent_payments')
+@retry_on_busy
+@instrumented
+def delete_rent_payment(payment_id):
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("DELETE FROM rent_payments WHERE id=?", (payment_id,))
+            return c.rowcount > 0
+    except sqlite3.Error as e:
+        logger.error(f"Error deleting rent payment: {str(e)}")
+        raise
+@cached_read('rent_payments')
+@instrumented
+def get_rent_payments():
+    try:
+        with get_connection() as conn:
+            df = pd.read_sql_query("SELECT * FROM rent_payments", conn)
+            return df
+    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
+        logger.error(f"Error fetching rent payments: {str(e)}")
+        do_not_cache()
+        return pd.DataFrame()
+
+
+# Recurring rent
+#
+# A schedule owes ``amount`` on ``day_of_month`` (clamped to the month's
+# last day) from ``start_date`` until ``end_date``. Payments are generated
+# ahead of time up to a horizon, and ``generated_until`` records how far
+# each schedule has been generated so deleted entries are not recreated.
+RENT_HORIZON_DAYS = 60
+
+
+def _due_dates(day_of_month, first, last):
+    year, month = first.year, first.month
+    while True:
+        due = date(year, month, min(day_of_month, calendar.monthrange(year, month)[1]))
+        if due > last:
+            return
+        if due >= first:
+            yield due
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+@invalidates('rent_schedules')
+@retry_on_busy
+@instrumented
+def add_rent_schedule(description, amount, day_of_month, start_date, end_date=None):
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("""INSERT INTO rent_schedules
+                             (description, amount, day_of_month, start_date, end_date)
+                         VALUES (?, ?, ?, ?, ?)""",
+                      (description, amount, day_of_month, start_date, end_date))
+            return True
+    except sqlite3.Error as e:
+        logger.error(f"Error adding rent schedule: {str(e)}")
+        raise
+
+
+@invalidates('rent_schedules', 'rent_payments')
+@retry_on_busy
+@instrumented
+def delete_rent_schedule(schedule_id):
+    """Remove a schedule and its pending payments from today on; history stays"""
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            c.execute("""DELETE FROM rent_payments
+                         WHERE schedule_id=? AND status='Pending' AND due_date >= ?""",
+                      (schedule_id, date.today().isoformat()))
+            c.execute("UPDATE rent_payments SET schedule_id=NULL WHERE schedule_id=?",
+                      (schedule_id,))
+            c.execute("DELETE FROM rent_schedules WHERE id=?", (schedule_id,))
+            return c.rowcount > 0
+    except sqlite3.Error as e:
+        logger.error(f"Error deleting rent schedule: {str(e)}")
+        raise
+
+
+@cached_read('rent_schedules')
+@instrumented
+def get_rent_schedules():
+    try:
+        with get_connection() as conn:
+            df = pd.read_sql_query("SELECT * FROM rent_schedules ORDER BY id", conn)
+            return df
+    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
+        logger.error(f"Error fetching rent schedules: {str(e)}")
+        do_not_cache()
+        return pd.DataFrame()
+
+
+@retry_on_busy
+@instrumented
+def generate_rent_payments(horizon_days=RENT_HORIZON_DAYS, today=None):
+    """Create the Pending payments schedules owe up to ``horizon_days`` ahead.
+
+    Safe to run repeatedly and from several threads; returns the number of
+    payments created.
+    """
+    today = today or date.today()
+    until = today + timedelta(days=horizon_days)
+    try:
+        with get_connection() as conn:
+            c = conn.cursor()
+            schedules = c.execute(
+                """SELECT id, amount, day_of_month, start_date, end_date, generated_until
+                   FROM rent_schedules
+                   WHERE generated_until IS NULL OR generated_until < ?""",
+                (until.isoformat(),)).fetchall()
+            before = conn.total_changes
+            rows = []
+            for schedule_id, amount, day_of_month, start, end, generated in schedules:
+                first = date.fromisoformat(start)
+                if generated:
+                    first = max(first, date.fromisoformat(generated) + timedelta(days=1))
+                last = min(until, date.fromisoformat(end)) if end else until
+                rows.extend((due.isoformat(), amount, 'Pending', schedule_id)
+                            for due in _due_dates(day_of_month, first, last))
+            c.executemany("""INSERT INTO rent_payments (due_date, amount, status, schedule_id)
+                             VALUES (?, ?, ?, ?)
+                             ON CONFLICT DO NOTHING""", rows)
+            created = conn.total_changes - before
+            c.executemany("UPDATE rent_schedules SET generated_until=? WHERE id=?",
+                          [(until.isoformat(), row[0]) for row in schedules])
+    except sqlite3.Error as e:
+        logger.error(f"Error generating rent payments: {str(e)}")
+        raise
+    # Only bump generations when something changed, so the scheduler
+    # thread that calls this on every change does not wake itself forever
+    if schedules:
+        invalidate('rent_schedules')
+    if created:
+        invalidate('rent_payments')
+        logger.info(f"Generated {created} scheduled rent payment(s)")
+    return created
+
+
+@cached_read('rent_payments', 'rent_schedules')
+@instrumented
+def get_pending_rent(today, until):
+    """Pending payments due on or before ``until``, with their state on ``today``"""
+    try:
+        with get_connection() as conn:
+            # Equality on status and a range on due_date: served by
+            # ix_rent_payments_status_due, already in due date order
+            df = pd.read_sql_query(
+                """SELECT p.id, p.due_date, p.amount, s.description,
+                          CAST(julianday(p.due_date) - julianday(:today) AS INTEGER)
+                              AS days_left,
+                          CASE WHEN p.due_date < :today THEN 'Overdue'
+                               WHEN p.due_date = :today THEN 'Due today'
+                               ELSE 'Upcoming' END AS state
+                   FROM rent_payments p
+                   LEFT JOIN rent_schedules s ON s.id = p.schedule_id
+                   WHERE p.status = 'Pending' AND p.due_date <= :until
+                   ORDER BY p.due_date""",
+                conn, params={'today': today, 'until': until})
+            return df
+    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
+        logger.error(f"Error fetching pending rent: {str(e)}")
+        do_not_cache()
+        return pd.DataFrame()
+
+# Paginated reads
+#
+# Keyset pagination: each page is ordered by (sort key, id) and the cursor is
+# the (sort key, id) pair of the last row of the previous page, so fetching
+# page N costs the same as page 1 instead of scanning an OFFSET. Every page
+# function returns ``(df, next_cursor)``; next_cursor is None on the last page.
+DEFAULT_PAGE_SIZE = 50
+
+
+def _read_page(conn, columns, source, sort_expr, where, params, page_size,
+               cursor, descending=False, id_column='id'):
+    clauses = list(where)
+    params = list(params)
+    if cursor is not None:
+        op = '<' if descending else '>'
+        # Same as ({sort_expr}, id) > (?, ?), but the leading range on the
+        # sort key lets SQLite seek in the matching index instead of
+        # scanning up to the cursor
+        clauses.append(f"{sort_expr} {op}= ? AND ({sort_expr} {op} ? OR {id_column} {op} ?)")
+        sort_key, last_id = cursor
+        params.extend([sort_key, sort_key, last_id])
+    order = 'DESC' if descending else 'ASC'
+    query = f"""
+        SELECT {columns}, {sort_expr} AS _sort_key
+        FROM {source}
+        {'WHERE ' + ' AND '.join(clauses) if clauses else ''}
+        ORDER BY _sort_key {order}, {id_column} {order}
+        LIMIT ?
+        """
+    params.append(page_size + 1)
+    df = pd.read_sql_query(query, conn, params=params)
+    next_cursor = None
+    if len(df) > page_size:
+        df = df.iloc[:page_size]
+        last = df.iloc[-1]
+        sort_key = last['_sort_key']
+        if hasattr(sort_key, 'item'):
+            sort_key = sort_key.item()
+        next_cursor = (sort_key, int(last['id']))
+    return df.drop(columns='_sort_key'), next_cursor
+
+
+def _sort_expression(sort, allowed):
+    if sort not in allowed:
+        raise ValueError(f"Unsupported sort column: {sort}")
+    return allowed[sort]
+
+
+@cached_read('employees')
+@instrumented
+def get_employees_page(page_size=DEFAULT_PAGE_SIZE, cursor=None, search=None,
+                       sort='name', descending=False):
+    sort_expr = _sort_expression(sort, {
+        'id': 'id', 'name': "COALESCE(name, '')",
+        'join_date': "COALESCE(join_date, '')",
+        'daily_wage': 'COALESCE(daily_wage, 0)'})
+    where, params = [], []
+    if search:
+        where.append("(name LIKE ? OR phone LIKE ? OR aadhar_number LIKE ?)")
+        params.extend([f"%{search}%"] * 3)
+    try:
+        with get_connection() as conn:
+            return _read_page(conn, "*", "employees", sort_expr,
+                              where, params, page_size, cursor, descending)
+    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
+        logger.error(f"Error fetching employees page: {str(e)}")
+        do_not_cache()
+        return pd.DataFrame(), None
+
+
+@cached_read('attendance', 'employees')
+@instrumented
+def get_attendance_page(start_date, end_date, page_size=DEFAULT_PAGE_SIZE,
+                        cursor=None, search=None, status=None,
+                        sort='date', descending=True):
+    sort_expr = _sort_expression(sort, {
+        'date': 'a.date', 'name': "COALESCE(e.name, '')", 'status': 'a.status'})
+    where = ["a.date BETWEEN ? AND ?"]
+    params = [start_date, end_date]
+    if search:
+        where.append("e.name LIKE ?")
+        params.append(f"%{search}%")
+    if status:
+        where.append("a.status = ?")
+        params.append(status)
+    try:
+        with get_connection() as conn:
+            return _read_page(conn, "a.id, e.name, a.date, a.status",
+                              "attendance a JOIN employees e ON a.employee_id = e.id",
+                              sort_expr, where, params, page_size, cursor,
+                              descending, id_column='a.id')
+    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
+        logger.error(f"Error fetching attendance page: {str(e)}")
+        do_not_cache()
+        return pd.DataFrame(), None
+
+
+@cached_read('inventory')
+@instrumented
+def get_inventory_page(page_size=DEFAULT_PAGE_SIZE, cursor=None, search=None,
+                       sort='item_name', descending=False):
+    sort_expr = _sort_expression(sort, {
+        'item_name': "COALESCE(item_name, '')", 'quantity': 'COALESCE(quantity, 0)',
+        'last_updated': "COALESCE(last_updated, '')"})
+    where, params = ["deleted_at IS NULL"], []
+    if search:
+        where.append("item_name LIKE ?")
+        params.append(f"%{search}%")
+    try:
+        with get_connection() as conn:
+            return _read_page(conn, _ITEM_COLUMNS, "inventory", sort_expr,
+                              where, params, page_size, cursor, descending)
+    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
+        logger.error(f"Error fetching inventory page: {str(e)}")
+        do_not_cache()
+        return pd.DataFrame(), None
+
+
+@cached_read('rent_payments')
+@instrumented
+def get_rent_payments_page(page_size=DEFAULT_PAGE_SIZE, cursor=None, status=None,
+                           sort='due_date', descending=True):
+    sort_expr = _sort_expression(sort, {
+        'due_date': "COALESCE(due_date, '')", 'amount': 'COALESCE(amount, 0)'})
+    where, params = [], []
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    try:
+        with get_connection() as conn:
+            return _read_page(conn, "*", "rent_payments", sort_expr,
+                              where, params, page_size, cursor, descending)
+    except (sqlite3.Error, pd.io.sql.DatabaseError) as e:
+        logger.error(f"Error fetching rent payments page: {str(e)}")
+        do_not_cache()
+        return pd.DataFrame(), None
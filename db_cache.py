@@ -0,0 +1,153 @@
+import threading
+import functools
+import time
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Process-wide read cache for database.py. Every cached read declares the
+# tables it depends on and its key includes the current generation of each
+# of those tables. Write functions bump the generation of the tables they
+# touch, so only entries that depend on those tables go stale.
+MAX_ENTRIES = 256
+# Upper bound on entry age, for writes made by other processes (CLI tools)
+DEFAULT_TTL = 300.0
+
+_lock = threading.Lock()
+_changed = threading.Condition(_lock)
+_generations = {}
+_entries = OrderedDict()
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'evictions': 0}
+_local = threading.local()
+_enabled = True
+# Returns the part of the key that separates data sets sharing this cache
+# (the database file); generations stay global, so a write invalidates the
+# table's entries in every scope, which is conservative but never stale.
+def _no_scope():
+    return None
+
+
+_scope = _no_scope
+
+
+def set_enabled(enabled):
+    """Turn caching on or off for the whole process (e.g. for benchmarks)"""
+    global _enabled
+    _enabled = enabled
+    if not enabled:
+        clear()
+
+
+def set_scope(func):
+    global _scope
+    _scope = func
+
+
+def generation(*tables):
+    with _lock:
+        return tuple(_generations.get(t, 0) for t in tables)
+
+
+def invalidate(*tables):
+    """Mark every cached read that depends on any of ``tables`` as stale"""
+    with _lock:
+        for table in tables:
+            _generations[table] = _generations.get(table, 0) + 1
+        stale = [key for key, (deps, _, _) in _entries.items()
+                 if not deps.isdisjoint(tables)]
+        for key in stale:
+            del _entries[key]
+        _stats['invalidations'] += 1
+        _changed.notify_all()
+
+
+def wait_for_change(tables, since, timeout=None):
+    """Block until the generation of ``tables`` differs from ``since``.
+
+    Returns the current generation, which equals ``since`` on timeout.
+    """
+    with _changed:
+        _changed.wait_for(
+            lambda: tuple(_generations.get(t, 0) for t in tables) != since, timeout)
+        return tuple(_generations.get(t, 0) for t in tables)
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+
+def do_not_cache():
+    """Called by a cached read that is returning a fallback after an error"""
+    _local.skip = True
+
+
+def stats():
+    with _lock:
+        result = dict(_stats)
+        result['entries'] = len(_entries)
+        result['generations'] = dict(_generations)
+    lookups = result['hits'] + result['misses']
+    result['hit_rate'] = result['hits'] / lookups if lookups else 0.0
+    return result
+
+
+def _copy(value):
+    if isinstance(value, tuple):
+        return tuple(_copy(v) for v in value)
+    copy = getattr(value, 'copy', None)
+    return copy() if callable(copy) else value
+
+
+def cached_read(*tables, ttl=DEFAULT_TTL):
+    """Cache a read function's result per arguments and table generations.
+
+    Cached values are copied on the way out so callers may modify them.
+    """
+    deps = frozenset(tables)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            key = (func.__module__, func.__qualname__, _scope(), args,
+                   tuple(sorted(kwargs.items())), generation(*tables))
+            now = time.monotonic()
+            with _lock:
+                entry = _entries.get(key)
+                if entry is not None and (ttl is None or now - entry[1] < ttl):
+                    _entries.move_to_end(key)
+                    _stats['hits'] += 1
+                    return _copy(entry[2])
+                _stats['misses'] += 1
+
+            _local.skip = False
+            value = func(*args, **kwargs)
+            if _local.skip:
+                _local.skip = False
+                return value
+
+            with _lock:
+                _entries[key] = (deps, now, value)
+                _entries.move_to_end(key)
+                while len(_entries) > MAX_ENTRIES:
+                    _entries.popitem(last=False)
+                    _stats['evictions'] += 1
+            return _copy(value)
+        return wrapper
+    return decorator
+
+
+def invalidates(*tables):
+    """Bump the generation of ``tables`` after the wrapped write returns"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                invalidate(*tables)
+        return wrapper
+    return decorator
@@ -0,0 +1,219 @@
+import sqlite3
+import threading
+import time
+import queue
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+# Applied to every new connection. journal_mode=WAL lets readers proceed
+# while a writer commits; with WAL, synchronous=NORMAL only fsyncs at
+# checkpoints and stays crash-safe. Callers may pass their own profile.
+DEFAULT_PROFILE = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+}
+
+
+def apply_profile(conn, profile):
+    for pragma, value in profile.items():
+        if value is None:
+            continue
+        conn.execute(f"PRAGMA {pragma} = {value}").fetchall()
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """Raised when no connection becomes available within the pool timeout"""
+
+
+class ConnectionPool:
+    """Pool of long-lived SQLite connections.
+
+    A connection is bound to the calling thread while it is checked out, so
+    nested ``connection()`` blocks in the same thread share one connection and
+    one transaction. When the outermost block exits the transaction is
+    committed (or rolled back on error) and the connection goes back to the
+    idle stack instead of being closed.
+    """
+
+    def __init__(self, path, max_size=8, timeout=30.0, profile=None,
+                 on_connect=None):
+        self.path = path
+        self.profile = DEFAULT_PROFILE if profile is None else profile
+        self.on_connect = on_connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all = []
+        self._closed = False
+        self._stats = {
+            'checkouts': 0,
+            'hits': 0,
+            'reentrant': 0,
+            'opens': 0,
+            'wait_time': 0.0,
+            'max_wait': 0.0,
+            'timeouts': 0,
+        }
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            apply_profile(conn, self.profile)
+            if self.on_connect is not None:
+                self.on_connect(conn)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        with self._lock:
+            self._all.append(conn)
+            self._stats['opens'] += 1
+        logger.debug(f"Opened new connection to {self.path}")
+        return conn
+
+    def _checkout(self):
+        start = time.perf_counter()
+        acquired = self._slots.acquire(timeout=self.timeout)
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._stats['wait_time'] += waited
+            self._stats['max_wait'] = max(self._stats['max_wait'], waited)
+            if not acquired:
+                self._stats['timeouts'] += 1
+        if not acquired:
+            raise PoolTimeout(f"No connection available for {self.path} "
+                              f"after {self.timeout:.1f}s")
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self._stats['hits'] += 1
+        except queue.Empty:
+            try:
+                conn = self._open()
+            except Exception:
+                self._slots.release()
+                raise
+        with self._lock:
+            self._stats['checkouts'] += 1
+        return conn
+
+    def _checkin(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            if self._closed:
+                self._discard(conn)
+            else:
+                self._idle.put(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Discarding broken connection to {self.path}: {str(e)}")
+            self._discard(conn)
+        finally:
+            self._slots.release()
+
+    def _discard(self, conn):
+        with self._lock:
+            if conn in self._all:
+                self._all.remove(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the current thread.
+
+        Commits on a clean exit of the outermost block and rolls back if an
+        exception escapes it.
+        """
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            self._local.depth += 1
+            with self._lock:
+                self._stats['reentrant'] += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._checkout()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._checkin(conn)
+
+    def holds_connection(self):
+        """True if the current thread is inside a ``connection()`` block"""
+        return getattr(self._local, 'conn', None) is not None
+
+    def stats(self):
+        """Snapshot of the pool counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['open_connections'] = len(self._all)
+        stats['idle'] = self._idle.qsize()
+        stats['in_use'] = stats['open_connections'] - stats['idle']
+        stats['hit_rate'] = (stats['hits'] / stats['checkouts']
+                             if stats['checkouts'] else 0.0)
+        stats['avg_wait'] = (stats['wait_time'] / stats['checkouts']
+                             if stats['checkouts'] else 0.0)
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0 if isinstance(self._stats[key], int) else 0.0
+
+    def close_all(self):
+        """Close idle connections; checked-out ones are closed on return.
+
+        The pool stays usable, but from now on every connection is closed
+        when it is returned instead of being kept idle.
+        """
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path, **kwargs):
+    """Return the process-wide pool for ``path``, creating it on first use"""
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = ConnectionPool(path, **kwargs)
+            _pools[path] = pool
+        return pool
+
+
+def all_pools():
+    with _pools_lock:
+        return dict(_pools)
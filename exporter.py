@@ -0,0 +1,179 @@
+"""Streaming exports of attendance, salary advances and payroll.
+
+    python exporter.py attendance --start 2024-01-01 --end 2024-12-31 -o att.csv
+    python exporter.py payroll --month 3 --year 2025 -o payroll.xlsx
+    python exporter.py payroll --property beachside -o beachside.csv
+
+Rows come from the cursor-backed ``iter_*`` generators in database.py and
+are written chunk by chunk, so peak memory depends on the chunk size and
+not on the length of the date range.
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import database as db
+import properties
+
+FORMATS = {
+    'csv': ('text/csv', '.csv'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', '.xlsx'),
+}
+
+# Column types for Parquet; fixed up front so chunks with all-NULL columns
+# still produce one consistent schema.
+COLUMN_TYPES = {
+    'id': 'int64', 'employee_id': 'int64', 'name': 'string', 'date': 'string',
+    'status': 'string', 'amount': 'float64', 'daily_wage': 'float64',
+    'present_days': 'int64', 'half_days': 'int64', 'absent_days': 'int64',
+    'gross': 'float64', 'advances': 'float64', 'net': 'float64',
+}
+
+
+def _csv_writer(dest, chunks):
+    text = io.TextIOWrapper(dest, encoding='utf-8', newline='')
+    writer = csv.writer(text)
+    header_written = False
+    for columns, rows in chunks:
+        if not header_written:
+            writer.writerow(columns)
+            header_written = True
+        writer.writerows(rows)
+    text.flush()
+    text.detach()
+
+
+def _parquet_writer(dest, chunks):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+    writer = None
+    try:
+        for columns, rows in chunks:
+            if writer is None:
+                schema = pa.schema([(c, COLUMN_TYPES.get(c, 'string')) for c in columns])
+                writer = pq.ParquetWriter(dest, schema)
+            data = {c: [row[i] for row in rows] for i, c in enumerate(columns)}
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _xlsx_writer(dest, chunks, title):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise RuntimeError("Excel export requires openpyxl (pip install openpyxl)")
+    # write_only keeps only the current row in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title[:31])
+    header_written = False
+    for columns, rows in chunks:
+        if not header_written:
+            sheet.append(columns)
+            header_written = True
+        for row in rows:
+            sheet.append(row)
+    workbook.save(dest)
+
+
+def write_chunks(chunks, fmt, dest, title='Export'):
+    """Write ``(columns, rows)`` chunks to a binary file object or path"""
+    if fmt == 'csv':
+        if isinstance(dest, (str, os.PathLike)):
+            with open(dest, 'wb') as f:
+                _csv_writer(f, chunks)
+        else:
+            _csv_writer(dest, chunks)
+    elif fmt == 'parquet':
+        _parquet_writer(dest, chunks)
+    elif fmt == 'xlsx':
+        _xlsx_writer(dest, chunks, title)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+
+def attendance_chunks(start_date, end_date):
+    return db.iter_attendance(start_date, end_date)
+
+
+def advances_chunks(start_date, end_date, employee_id=None):
+    return db.iter_advances(start_date, end_date, employee_id)
+
+
+def payroll_chunks(month, year):
+    return db.iter_payroll(month, year)
+
+
+EXPORTS = {
+    'attendance': attendance_chunks,
+    'advances': advances_chunks,
+    'payroll': payroll_chunks,
+}
+
+
+def export(kind, fmt, dest, **params):
+    write_chunks(EXPORTS[kind](**params), fmt, dest, title=kind.capitalize())
+
+
+def export_to_tempfile(kind, fmt, **params):
+    """Export to a temporary file on disk and return it opened for reading.
+
+    Used as deferred ``data`` for ``st.download_button``; the file is removed
+    when closed.
+    """
+    f = tempfile.TemporaryFile(suffix=FORMATS[fmt][1])
+    export(kind, fmt, f, **params)
+    f.seek(0)
+    return f
+
+
+def file_name(kind, fmt, *parts):
+    suffix = "_".join(str(p) for p in parts if p is not None)
+    return f"{kind}{'_' + suffix if suffix else ''}{FORMATS[fmt][1]}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('kind', choices=sorted(EXPORTS))
+    parser.add_argument('-o', '--output', required=True)
+    parser.add_argument('--format', choices=sorted(FORMATS))
+    parser.add_argument('--start', help='first date (attendance, advances)')
+    parser.add_argument('--end', help='last date (attendance, advances)')
+    parser.add_argument('--employee', type=int, help='employee id (advances)')
+    parser.add_argument('--month', type=int, default=datetime.now().month)
+    parser.add_argument('--year', type=int, default=datetime.now().year)
+    parser.add_argument('--property', default=properties.DEFAULT_PROPERTY,
+                        help='property id (default: the main property)')
+    args = parser.parse_args(argv)
+    try:
+        properties.path_for(args.property)
+    except KeyError as e:
+        parser.error(e.args[0])
+
+    fmt = args.format or os.path.splitext(args.output)[1].lstrip('.').lower() or 'csv'
+    if fmt not in FORMATS:
+        parser.error(f"Cannot infer format from {args.output}; pass --format")
+    if args.kind == 'payroll':
+        params = {'month': args.month, 'year': args.year}
+    else:
+        if not (args.start and args.end):
+            parser.error(f"{args.kind} export needs --start and --end")
+        params = {'start_date': args.start, 'end_date': args.end}
+        if args.kind == 'advances':
+            params['employee_id'] = args.employee
+    with properties.use_property(args.property):
+        export(args.kind, fmt, args.output, **params)
+    print(f"Wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
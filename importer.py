@@ -0,0 +1,276 @@
+"""Streaming CSV/Parquet importer for employees, attendance and inventory.
+
+    python importer.py employees staff.csv
+    python importer.py attendance biometric.parquet --chunk-size 20000
+    python importer.py inventory stock.csv --rejects rejected.csv
+    python importer.py employees staff.csv --property beachside
+
+Files are read in chunks, each row is validated, and every chunk of valid
+rows is written with executemany in a single transaction. Invalid rows are
+reported and skipped without aborting the load.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import re
+import sys
+import time
+from datetime import date, datetime
+
+import pandas as pd
+
+import database as db
+import properties
+
+DEFAULT_CHUNK_SIZE = 5000
+# Rejected rows kept in the report; the count is always exact
+MAX_REJECTS_KEPT = 1000
+
+COLUMNS = {
+    'employees': ['name', 'aadhar_number', 'phone', 'address', 'join_date', 'daily_wage'],
+    'attendance': ['employee_id', 'date', 'status'],
+    'inventory': ['item_name', 'quantity', 'unit'],
+}
+REQUIRED = {
+    'employees': ['name', 'aadhar_number', 'daily_wage'],
+    'attendance': ['employee_id', 'date', 'status'],
+    'inventory': ['item_name', 'quantity', 'unit'],
+}
+
+_NON_DIGITS = re.compile(r"[\s-]")
+
+
+class RowError(ValueError):
+    pass
+
+
+def _text(value):
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ''
+    return str(value).strip()
+
+
+def _required(row, column):
+    value = _text(row.get(column))
+    if not value:
+        raise RowError(f"{column} is required")
+    return value
+
+
+def _number(row, column):
+    try:
+        value = float(_required(row, column))
+    except ValueError:
+        raise RowError(f"{column} must be a number")
+    if not math.isfinite(value):
+        raise RowError(f"{column} must be a finite number")
+    if value < 0:
+        raise RowError(f"{column} must not be negative")
+    return value
+
+
+def _iso_date(value, column):
+    try:
+        return date.fromisoformat(value[:10]).isoformat()
+    except ValueError:
+        raise RowError(f"{column} must be a YYYY-MM-DD date")
+
+
+class _EmployeeImporter:
+    def __init__(self):
+        self.seen = set()
+        self.today = datetime.now().strftime('%Y-%m-%d')
+
+    def __call__(self, row):
+        name = _required(row, 'name')
+        aadhar = _NON_DIGITS.sub('', _required(row, 'aadhar_number'))
+        if not (aadhar.isdigit() and len(aadhar) == 12):
+            raise RowError("aadhar_number must be 12 digits")
+        if aadhar in self.seen:
+            raise RowError("duplicate aadhar_number in file")
+        wage = _number(row, 'daily_wage')
+        join_date = _text(row.get('join_date'))
+        join_date = _iso_date(join_date, 'join_date') if join_date else self.today
+        self.seen.add(aadhar)
+        return (name, aadhar, _text(row.get('phone')), _text(row.get('address')),
+                join_date, wage)
+
+    def write(self, rows):
+        # Rows already in the database are rejected rather than silently skipped
+        existing = db.existing_aadhar_numbers(r[1] for r in rows)
+        fresh = [r for r in rows if r[1] not in existing]
+        # Rows registered concurrently are skipped by the insert, so count
+        # what it actually wrote
+        written = db.add_employees_bulk(fresh) if fresh else 0
+        return written, [(i, "aadhar_number already registered")
+                            for i, r in enumerate(rows) if r[1] in existing]
+
+
+class _AttendanceImporter:
+    def __init__(self):
+        self.employee_ids = db.get_employee_ids()
+        self.statuses = {s.lower(): s for s in db.ATTENDANCE_STATUSES}
+
+    def __call__(self, row):
+        try:
+            employee_id = int(float(_required(row, 'employee_id')))
+        except ValueError:
+            raise RowError("employee_id must be an integer")
+        if employee_id not in self.employee_ids:
+            raise RowError(f"unknown employee_id {employee_id}")
+        day = _iso_date(_required(row, 'date'), 'date')
+        status = self.statuses.get(_required(row, 'status').lower())
+        if status is None:
+            raise RowError(f"status must be one of {', '.join(db.ATTENDANCE_STATUSES)}")
+        return employee_id, day, status
+
+    def write(self, rows):
+        written = db.mark_attendance_rows(rows)
+        if written == len(rows):
+            return written, []
+        # The insert skips employees deleted since validation
+        self.employee_ids = db.get_employee_ids()
+        return written, [(i, f"employee_id {r[0]} no longer exists")
+                         for i, r in enumerate(rows) if r[0] not in self.employee_ids]
+
+
+class _InventoryImporter:
+    def __call__(self, row):
+        name = _required(row, 'item_name')
+        quantity = _number(row, 'quantity')
+        unit = _required(row, 'unit').lower()
+        if unit not in db.INVENTORY_UNITS:
+            raise RowError(f"unit must be one of {', '.join(db.INVENTORY_UNITS)}")
+        return name, quantity, unit
+
+    def write(self, rows):
+        db.update_inventory_bulk(rows)
+        return len(rows), []
+
+
+IMPORTERS = {
+    'employees': _EmployeeImporter,
+    'attendance': _AttendanceImporter,
+    'inventory': _InventoryImporter,
+}
+
+
+def detect_format(name):
+    ext = os.path.splitext(name or '')[1].lower()
+    if ext in ('.parquet', '.pq'):
+        return 'parquet'
+    return 'csv'
+
+
+def read_chunks(source, fmt, chunk_size):
+    """Yield DataFrames of at most ``chunk_size`` rows from a path or file object"""
+    if fmt == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet import requires pyarrow (pip install pyarrow)")
+        parquet = pq.ParquetFile(source)
+        for batch in parquet.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_size, dtype=str,
+                               keep_default_na=False, skipinitialspace=True)
+
+
+def import_file(kind, source, fmt=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                progress=None):
+    """Import ``source`` into ``kind`` ('employees', 'attendance' or 'inventory').
+
+    ``progress`` is called with the running report after every chunk.
+    Returns a report dict with counts, throughput and rejected rows.
+    """
+    if kind not in IMPORTERS:
+        raise ValueError(f"Unknown import kind: {kind}")
+    fmt = fmt or detect_format(getattr(source, 'name', source))
+    importer = IMPORTERS[kind]()
+    report = {'kind': kind, 'format': fmt, 'rows': 0, 'imported': 0,
+              'rejected': 0, 'chunks': 0, 'seconds': 0.0, 'rows_per_sec': 0.0,
+              'rejects': []}
+
+    def reject(row_number, reason, row):
+        report['rejected'] += 1
+        if len(report['rejects']) < MAX_REJECTS_KEPT:
+            report['rejects'].append({'row': row_number, 'reason': reason,
+                                      'data': row})
+
+    start = time.perf_counter()
+    for chunk in read_chunks(source, fmt, chunk_size):
+        chunk.columns = [str(c).strip().lower() for c in chunk.columns]
+        missing = [c for c in REQUIRED[kind] if c not in chunk.columns]
+        if missing:
+            raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+        valid, numbers = [], []
+        for offset, row in enumerate(chunk.to_dict('records')):
+            row_number = report['rows'] + offset + 1
+            try:
+                valid.append(importer(row))
+                numbers.append(row_number)
+            except RowError as e:
+                reject(row_number, str(e), row)
+        if valid:
+            written, refused = importer.write(valid)
+            report['imported'] += written
+            for index, reason in refused:
+                reject(numbers[index], reason, dict(zip(COLUMNS[kind], valid[index])))
+
+        report['rows'] += len(chunk)
+        report['chunks'] += 1
+        report['seconds'] = time.perf_counter() - start
+        report['rows_per_sec'] = (report['rows'] / report['seconds']
+                                  if report['seconds'] else 0.0)
+        if progress is not None:
+            progress(report)
+    return report
+
+
+def write_rejects(report, path):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['row', 'reason', 'data'])
+        for reject in report['rejects']:
+            writer.writerow([reject['row'], reject['reason'],
+                             json.dumps(reject['data'], default=str)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('kind', choices=sorted(IMPORTERS))
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=['csv', 'parquet'])
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--rejects', help='write rejected rows to this CSV file')
+    parser.add_argument('--property', default=properties.DEFAULT_PROPERTY,
+                        help='property id (default: the main property)')
+    args = parser.parse_args(argv)
+    try:
+        properties.path_for(args.property)
+    except KeyError as e:
+        parser.error(e.args[0])
+
+    def progress(report):
+        print(f"\r{report['rows']} rows, {report['imported']} imported, "
+              f"{report['rejected']} rejected, {report['rows_per_sec']:.0f} rows/s",
+              end='', file=sys.stderr)
+
+    with properties.use_property(args.property):
+        db.init_db()
+        report = import_file(args.kind, args.path, args.format, args.chunk_size,
+                             progress)
+    print(file=sys.stderr)
+    if args.rejects:
+        write_rejects(report, args.rejects)
+    summary = {k: v for k, v in report.items() if k != 'rejects'}
+    print(json.dumps(summary, indent=2))
+    return 1 if report['imported'] == 0 and report['rows'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,406 @@
+"""Persistent background jobs for work too slow for a script run.
+
+    job_id = jobs.submit('mark_attendance', {'date': '2025-03-01', 'records': rows})
+    jobs.get(job_id)        # {'status': 'running', 'progress': 0.4, ...}
+
+Jobs live in their own SQLite file (JOBS_PATH), so every session and every
+server process shares one queue and queued work survives a restart. A small
+pool of worker threads claims jobs with a single UPDATE, so no job runs
+twice at once, even across processes. Each job runs against the property
+database that was selected when it was submitted.
+
+Handlers must be idempotent. A failed job is retried up to ``max_attempts``
+times with backoff. A job whose process died mid-run is requeued once its
+lease runs out; running jobs keep their lease renewed by a heartbeat
+thread. Submitting work identical to a queued or running job returns that
+job instead of adding another, so a double click or a rerun cannot queue
+the same work twice.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import database as db
+import importer
+import payroll
+import properties
+from db_pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+JOBS_PATH = os.environ.get('HOTEL_JOBS_DB', 'jobs.db')
+# Uploaded files are copied here so a retried import can read them again
+FILES_DIR = os.environ.get('HOTEL_JOB_FILES', 'job_files')
+JOB_WORKERS = 2
+DEFAULT_ATTEMPTS = 3
+# First retry waits this long, doubling with each further attempt
+RETRY_BACKOFF = 5.0
+LEASE_SECONDS = 60.0
+POLL_INTERVAL = 1.0
+# Finished jobs are deleted after this many days
+KEEP_DAYS = 7
+
+# Bad input fails the job at once; anything else (a locked database, a
+# full disk) is retried
+PERMANENT_ERRORS = (ValueError, LookupError, TypeError)
+
+STATUSES = ('queued', 'running', 'succeeded', 'failed')
+ACTIVE = ('queued', 'running')
+
+_SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS jobs
+           (id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL,
+            database TEXT NOT NULL,
+            idempotency_key TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued'
+                CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+            progress REAL NOT NULL DEFAULT 0,
+            message TEXT,
+            result TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            run_after REAL NOT NULL,
+            lease_until REAL,
+            created_at TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT)''',
+    # At most one queued or running job per key
+    '''CREATE UNIQUE INDEX IF NOT EXISTS ux_jobs_active_key
+           ON jobs (idempotency_key) WHERE status IN ('queued', 'running')''',
+    '''CREATE INDEX IF NOT EXISTS ix_jobs_status_run_after
+           ON jobs (status, run_after)''',
+)
+
+_COLUMNS = ('id', 'kind', 'params', 'database', 'status', 'progress', 'message',
+            'result', 'error', 'attempts', 'max_attempts', 'created_at',
+            'started_at', 'finished_at')
+
+_HANDLERS = {}
+_lock = threading.Lock()
+_wakeup = threading.Condition()
+_running = set()
+_threads = []
+
+
+def _create_schema(conn):
+    for statement in _SCHEMA:
+        conn.execute(statement)
+
+
+def _connection():
+    return get_pool(JOBS_PATH, on_connect=_create_schema).connection()
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def register(kind):
+    """Decorator registering ``handler(params, progress)`` for ``kind``.
+
+    ``progress(fraction, message=None)`` records how far the job has got;
+    the handler's return value must be JSON serialisable and becomes the
+    job's result.
+    """
+    def decorator(handler):
+        _HANDLERS[kind] = handler
+        return handler
+    return decorator
+
+
+def _key(kind, params, database):
+    payload = json.dumps([kind, database, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def submit(kind, params=None, key=None, max_attempts=DEFAULT_ATTEMPTS):
+    """Queue a job against the current database and return its id.
+
+    ``key`` defaults to a hash of the kind, database and params; while a
+    job with the same key is queued or running, its id is returned instead.
+    """
+    if kind not in _HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    params = params or {}
+    database = db.current_path()
+    key = key or _key(kind, params, database)
+    with _connection() as conn:
+        cursor = conn.execute(
+            """INSERT INTO jobs (kind, params, database, idempotency_key,
+                                 max_attempts, run_after, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT DO NOTHING""",
+            (kind, json.dumps(params, default=str), database, key, max_attempts,
+             time.time(), _now()))
+        if cursor.rowcount:
+            job_id = cursor.lastrowid
+            logger.info(f"Queued job {job_id} ({kind}) for {database}")
+        else:
+            job_id = conn.execute(
+                "SELECT id FROM jobs WHERE idempotency_key = ? AND status IN (?, ?)",
+                (key, *ACTIVE)).fetchone()[0]
+    with _wakeup:
+        _wakeup.notify()
+    return job_id
+
+
+def get(job_id):
+    """The job as a dict with ``params`` and ``result`` decoded, or None"""
+    with _connection() as conn:
+        row = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?",
+                           (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = dict(zip(_COLUMNS, row))
+    job['params'] = json.loads(job['params'])
+    job['result'] = json.loads(job['result']) if job['result'] is not None else None
+    return job
+
+
+def retry(job_id):
+    """Queue a failed job again with a fresh set of attempts"""
+    with _connection() as conn:
+        cursor = conn.execute(
+            """UPDATE jobs SET status = 'queued', attempts = 0, progress = 0,
+                               error = NULL, message = NULL, run_after = ?
+               WHERE id = ? AND status = 'failed'""", (time.time(), job_id))
+        retried = cursor.rowcount > 0
+    if retried:
+        with _wakeup:
+            _wakeup.notify()
+    return retried
+
+
+def list_jobs(limit=50):
+    """Most recent jobs, newest first"""
+    with _connection() as conn:
+        return pd.read_sql_query(
+            """SELECT id, kind, database, status, progress, message, error,
+                      attempts, created_at, started_at, finished_at
+               FROM jobs ORDER BY id DESC LIMIT ?""", conn, params=(limit,))
+
+
+def stage_file(name, data):
+    """Copy uploaded bytes to FILES_DIR and return the path.
+
+    Files are named by content hash, so uploading the same file twice gives
+    the same path and therefore the same job key.
+    """
+    os.makedirs(FILES_DIR, exist_ok=True)
+    extension = os.path.splitext(name)[1].lower()
+    path = os.path.join(FILES_DIR, hashlib.sha256(data).hexdigest() + extension)
+    if not os.path.exists(path):
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+# Worker side
+
+def _recover(conn, now):
+    """Requeue (or fail) running jobs whose lease ran out"""
+    cursor = conn.execute(
+        """UPDATE jobs
+           SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+               error = 'Worker stopped before the job finished',
+               finished_at = CASE WHEN attempts >= max_attempts THEN ? END,
+               lease_until = NULL, run_after = ?
+           WHERE status = 'running' AND lease_until < ?""", (_now(), now, now))
+    if cursor.rowcount:
+        logger.warning(f"Recovered {cursor.rowcount} job(s) with an expired lease")
+
+
+def _purge(conn):
+    cutoff = (datetime.now() - timedelta(days=KEEP_DAYS)).isoformat(timespec='seconds')
+    conn.execute("DELETE FROM jobs WHERE status IN ('succeeded', 'failed') "
+                 "AND finished_at < ?", (cutoff,))
+
+
+def _claim():
+    now = time.time()
+    with _connection() as conn:
+        # Read first, so idle polls do not take the write lock
+        if conn.execute("SELECT 1 FROM jobs WHERE status = 'queued' AND run_after <= ? "
+                        "LIMIT 1", (now,)).fetchone() is None:
+            return None
+        return conn.execute(
+            """UPDATE jobs
+               SET status = 'running', attempts = attempts + 1, lease_until = ?,
+                   started_at = ?, progress = 0, message = NULL
+               WHERE id = (SELECT id FROM jobs
+                           WHERE status = 'queued' AND run_after <= ?
+                           ORDER BY run_after, id LIMIT 1)
+               RETURNING id, kind, params, database, attempts, max_attempts""",
+            (now + LEASE_SECONDS, _now(), now)).fetchone()
+
+
+def _reporter(job_id):
+    def progress(fraction, message=None):
+        with _connection() as conn:
+            conn.execute("UPDATE jobs SET progress = ?, message = ? WHERE id = ?",
+                         (min(max(float(fraction), 0.0), 1.0), message, job_id))
+    return progress
+
+
+def _run(job):
+    job_id, kind, params, database, attempts, max_attempts = job
+    handler = _HANDLERS.get(kind)
+    with _lock:
+        _running.add(job_id)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind '{kind}'")
+        start = time.perf_counter()
+        with db.using_database(database):
+            result = handler(json.loads(params), _reporter(job_id))
+        with _connection() as conn:
+            conn.execute(
+                """UPDATE jobs SET status = 'succeeded', progress = 1, result = ?,
+                                   error = NULL, lease_until = NULL, finished_at = ?
+                   WHERE id = ?""",
+                (json.dumps(result, default=str), _now(), job_id))
+        logger.info(f"Job {job_id} ({kind}) finished in "
+                    f"{time.perf_counter() - start:.2f}s")
+    except Exception as e:
+        final = isinstance(e, PERMANENT_ERRORS) or attempts >= max_attempts
+        logger.error(f"Job {job_id} ({kind}) attempt {attempts}/{max_attempts} "
+                     f"failed: {str(e)}")
+        with _connection() as conn:
+            conn.execute(
+                """UPDATE jobs SET status = ?, error = ?, lease_until = NULL,
+                                   run_after = ?, finished_at = ?
+                   WHERE id = ?""",
+                ('failed' if final else 'queued', str(e),
+                 time.time() + RETRY_BACKOFF * 2 ** (attempts - 1),
+                 _now() if final else None, job_id))
+    finally:
+        with _lock:
+            _running.discard(job_id)
+
+
+def _work():
+    while True:
+        try:
+            job = _claim()
+        except sqlite3.Error as e:
+            logger.error(f"Could not claim a job: {str(e)}")
+            job = None
+        if job is None:
+            # Jobs submitted by other processes or due for retry are found
+            # on the next poll
+            with _wakeup:
+                _wakeup.wait(POLL_INTERVAL)
+            continue
+        _run(job)
+
+
+def _heartbeat():
+    while True:
+        time.sleep(LEASE_SECONDS / 3)
+        try:
+            with _lock:
+                running = list(_running)
+            with _connection() as conn:
+                # Renew this process's leases before expiring anyone's
+                if running:
+                    placeholders = ", ".join("?" * len(running))
+                    conn.execute(f"UPDATE jobs SET lease_until = ? WHERE status = 'running' "
+                                 f"AND id IN ({placeholders})",
+                                 (time.time() + LEASE_SECONDS, *running))
+                _recover(conn, time.time())
+                _purge(conn)
+        except sqlite3.Error as e:
+            logger.error(f"Job heartbeat failed: {str(e)}")
+
+
+def start(workers=JOB_WORKERS):
+    """Start the worker threads and the lease heartbeat once per process"""
+    with _lock:
+        if _threads and all(t.is_alive() for t in _threads):
+            return
+        _threads.clear()
+        for n in range(workers):
+            _threads.append(threading.Thread(target=_work, name=f'job-worker-{n}',
+                                             daemon=True))
+        _threads.append(threading.Thread(target=_heartbeat, name='job-heartbeat',
+                                         daemon=True))
+        for thread in _threads:
+            thread.start()
+
+
+# Built-in jobs
+ROSTER_CHUNK = 200
+
+
+@register('mark_attendance')
+def _mark_attendance(params, progress):
+    """``{'date', 'records': [[employee_id, status], ...]}``"""
+    records = params['records']
+    for done in range(0, len(records), ROSTER_CHUNK):
+        db.mark_attendance_bulk(params['date'], records[done:done + ROSTER_CHUNK])
+        marked = min(done + ROSTER_CHUNK, len(records))
+        progress(marked / len(records), f"{marked} of {len(records)} employees marked")
+    return {'marked': len(records)}
+
+
+def _count_rows(path, fmt):
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    with open(path, 'rb') as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+@register('import')
+def _import(params, progress):
+    """``{'kind', 'path'}`` of a file staged with stage_file"""
+    fmt = importer.detect_format(params['path'])
+    total = _count_rows(params['path'], fmt)
+
+    def report_progress(report):
+        progress(report['rows'] / total if total else 1.0,
+                 f"{report['rows']} rows read, {report['imported']} imported, "
+                 f"{report['rejected']} rejected")
+    return importer.import_file(params['kind'], params['path'], fmt=fmt,
+                                progress=report_progress)
+
+
+def _frame(df):
+    """DataFrame as JSON-ready ``split`` parts; ``pd.DataFrame(**parts)`` rebuilds it"""
+    return json.loads(df.to_json(orient='split', index=False))
+
+
+@register('payroll')
+def _payroll(params, progress):
+    """``{'month', 'year'}``: this property's payroll, plus every property's if there are several"""
+    progress(0.1, "Computing payroll")
+    result = {'payroll': _frame(db.compute_payroll(params['month'], params['year']))}
+    if len(properties.list_properties()) > 1:
+        progress(0.5, "Computing payroll for every property")
+        result['all_properties'] = _frame(properties.payroll_all(params['month'],
+                                                                 params['year']))
+    return result
+
+
+@register('annual_payroll')
+def _annual_payroll(params, progress):
+    """``{'year', 'overtime': {...} or None, 'paid_leave': {...} or None}``"""
+    rules = []
+    if params.get('overtime') is not None:
+        rules.append(payroll.Overtime(**params['overtime']))
+    if params.get('paid_leave') is not None:
+        rules.append(payroll.PaidLeave(**params['paid_leave']))
+    progress(0.1, "Loading attendance")
+    annual = payroll.annual_payroll(params['year'], rules=tuple(rules))
+    return _frame(annual)
@@ -0,0 +1,147 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+
+# Process-wide logging. Callers only enqueue records through a QueueHandler;
+# a QueueListener thread formats them and does the file and console I/O, so
+# request threads never wait on disk. Records go to database.log when they
+# come from the data layer and to app.log otherwise, as JSON lines, and both
+# files rotate by size. Slow query records have a file of their own.
+LOG_LEVEL = os.environ.get('HOTEL_LOG_LEVEL', 'INFO').upper()
+LOG_DIR = os.environ.get('HOTEL_LOG_DIR', '.')
+APP_LOG = 'app.log'
+DATABASE_LOG = 'database.log'
+SLOW_QUERY_LOG = os.environ.get('HOTEL_SLOW_QUERY_LOG', 'slow_queries.log')
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 5
+
+# Loggers (and their children) written to database.log
+DATABASE_LOGGERS = ('database', 'db_pool', 'db_cache', 'migrations', 'query_stats',
+                    'importer', 'exporter', 'alerts', 'scheduler', 'properties',
+                    'payroll', 'attendance_store', 'jobs', 'repository')
+# Logger for query_stats' slow query records; they go to SLOW_QUERY_LOG only
+SLOW_QUERY_LOGGER = 'query_stats.slow'
+
+_lock = threading.Lock()
+_listener = None
+_handler = None
+
+# Attributes every LogRecord has; anything else came in through ``extra=``
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any ``extra=`` fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+            'thread': record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RecordFormatter(logging.Formatter):
+    """The record's ``record`` attribute (a dict) as one JSON line"""
+
+    def format(self, record):
+        return json.dumps(record.record, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps records structured for the JSON formatter.
+
+    The stock prepare() flattens the message and traceback into one string;
+    here only what cannot be pickled or may change later (args, exc_info)
+    is resolved.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _NameFilter(logging.Filter):
+    def __init__(self, names, include):
+        super().__init__()
+        self.names = names
+        self.include = include
+
+    def filter(self, record):
+        matched = any(record.name == name or record.name.startswith(name + '.')
+                      for name in self.names)
+        return matched == self.include
+
+
+def _file_handler(name, filters, formatter=None):
+    handler = logging.handlers.RotatingFileHandler(
+        os.path.join(LOG_DIR, name), maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT,
+        encoding='utf-8', delay=True)
+    handler.setFormatter(formatter or JsonFormatter())
+    for log_filter in filters:
+        handler.addFilter(log_filter)
+    return handler
+
+
+def configure(level=None):
+    """Install the queued handlers on the root logger once per process"""
+    global _listener, _handler
+    with _lock:
+        if _listener is not None:
+            return
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        not_slow = _NameFilter((SLOW_QUERY_LOGGER,), False)
+        console.addFilter(not_slow)
+        records = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(
+            records, console,
+            _file_handler(DATABASE_LOG, (_NameFilter(DATABASE_LOGGERS, True), not_slow)),
+            _file_handler(APP_LOG, (_NameFilter(DATABASE_LOGGERS, False), not_slow)),
+            _file_handler(SLOW_QUERY_LOG, (_NameFilter((SLOW_QUERY_LOGGER,), True),),
+                          RecordFormatter()),
+            respect_handler_level=True)
+        _listener.start()
+
+        _handler = _QueueHandler(records)
+        root = logging.getLogger()
+        root.addHandler(_handler)
+        root.setLevel(level or LOG_LEVEL)
+        atexit.register(shutdown)
+
+
+def shutdown():
+    """Flush queued records and stop the writer thread"""
+    global _listener, _handler
+    with _lock:
+        if _listener is None:
+            return
+        logging.getLogger().removeHandler(_handler)
+        _listener.stop()
+        _listener = _handler = None
@@ -0,0 +1,77 @@
+"""Maintenance commands for the hotel database.
+
+    python manage.py migrate
+    python manage.py rebuild-summary
+    python manage.py prune-attendance-changes
+    python manage.py add-property beachside "Beachside Inn"
+    python manage.py list-properties
+"""
+import argparse
+import sys
+
+import attendance_store
+import database as db
+import properties
+
+
+def migrate(args):
+    db.init_db()
+    for _, _, path in properties.list_properties()[1:]:
+        with db.using_database(path):
+            db.init_db()
+    print("Databases are up to date")
+
+
+def rebuild_summary(args):
+    db.init_db()
+    for slug, _, path in properties.list_properties():
+        with db.using_database(path):
+            db.rebuild_attendance_summary()
+        print(f"Rebuilt attendance_monthly_summary for {slug}")
+
+
+def prune_attendance_changes(args):
+    db.init_db()
+    for slug, _, path in properties.list_properties():
+        deleted = attendance_store.prune(path)
+        print(f"Pruned {deleted} attendance change(s) for {slug}")
+
+
+def add_property(args):
+    db.init_db()
+    path = properties.add_property(args.slug, args.name)
+    print(f"Added {args.slug} at {path}")
+
+
+def list_properties(args):
+    db.init_db()
+    for slug, name, path in properties.list_properties():
+        print(f"{slug}\t{name}\t{path}")
+
+
+COMMANDS = {
+    'migrate': (migrate, "create tables and apply pending schema migrations"),
+    'rebuild-summary': (rebuild_summary,
+                        "recompute the monthly attendance summary from raw rows"),
+    'prune-attendance-changes': (prune_attendance_changes,
+                                 "trim the change log read by the attendance analytics"),
+    'add-property': (add_property, "register a property with its own database file"),
+    'list-properties': (list_properties, "show registered properties"),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, (func, help_text) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.set_defaults(func=func)
+        if func is add_property:
+            subparser.add_argument('slug', help="short id, e.g. beachside")
+            subparser.add_argument('name', help="display name")
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,332 @@
+import sqlite3
+import logging
+
+import passwords
+
+logger = logging.getLogger(__name__)
+
+# (version, description, function taking a connection), applied in order.
+# The schema version is tracked with PRAGMA user_version, so a migration
+# must never be edited once released; add a new one instead.
+MIGRATIONS = []
+
+
+def migration(version, description):
+    def register(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return func
+    return register
+
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def latest_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def migrate(conn):
+    """Apply every pending migration, each in its own transaction.
+
+    Returns the list of versions that were applied.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    applied = []
+    for version, description, func in MIGRATIONS:
+        if version <= current_version(conn):
+            continue
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Another process may have migrated while we waited for the lock
+            if version <= current_version(conn):
+                conn.rollback()
+                continue
+            logger.info(f"Applying migration {version}: {description}")
+            func(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+            applied.append(version)
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Migration {version} failed: {str(e)}")
+            raise
+    if applied:
+        conn.execute("PRAGMA optimize")
+    return applied
+
+
+@migration(1, "unique attendance per employee and day")
+def _attendance_unique(conn):
+    # Older databases may hold duplicates from before the constraint
+    # existed; keep the most recent row for each pair before enforcing it.
+    conn.execute('''DELETE FROM attendance WHERE id NOT IN
+                        (SELECT MAX(id) FROM attendance GROUP BY employee_id, date)''')
+    conn.execute('''CREATE UNIQUE INDEX IF NOT EXISTS ux_attendance_employee_date
+                        ON attendance (employee_id, date)''')
+
+
+@migration(2, "indexes for date range and per-employee lookups")
+def _hot_path_indexes(conn):
+    conn.execute('''CREATE INDEX IF NOT EXISTS ix_attendance_date_employee
+                        ON attendance (date, employee_id)''')
+    conn.execute('''CREATE INDEX IF NOT EXISTS ix_salary_advances_employee_date
+                        ON salary_advances (employee_id, date)''')
+    conn.execute('''CREATE INDEX IF NOT EXISTS ix_rent_payments_due_date
+                        ON rent_payments (due_date)''')
+
+
+REBUILD_ATTENDANCE_SUMMARY = [
+    "DELETE FROM attendance_monthly_summary",
+    '''INSERT INTO attendance_monthly_summary
+           (employee_id, year, month, present_days, half_days, absent_days)
+       SELECT employee_id,
+              CAST(substr(date, 1, 4) AS INTEGER),
+              CAST(substr(date, 6, 2) AS INTEGER),
+              SUM(status = 'Present'), SUM(status = 'Half-day'), SUM(status = 'Absent')
+       FROM attendance
+       GROUP BY 1, 2, 3''',
+]
+
+
+def rebuild_attendance_summary(conn):
+    for statement in REBUILD_ATTENDANCE_SUMMARY:
+        conn.execute(statement)
+
+
+def _summary_delta(row, sign):
+    """Trigger body applying one attendance row (NEW or OLD) to the summary.
+
+    Written as an upsert rather than INSERT OR IGNORE + UPDATE: the conflict
+    policy of the statement firing the trigger (ABORT for the attendance
+    upsert) overrides an OR clause inside the trigger body.
+    """
+    return f'''
+        INSERT INTO attendance_monthly_summary
+            (employee_id, year, month, present_days, half_days, absent_days)
+        VALUES ({row}.employee_id,
+                CAST(substr({row}.date, 1, 4) AS INTEGER),
+                CAST(substr({row}.date, 6, 2) AS INTEGER),
+                {sign}({row}.status = 'Present'), {sign}({row}.status = 'Half-day'),
+                {sign}({row}.status = 'Absent'))
+        ON CONFLICT (employee_id, year, month) DO UPDATE
+        SET present_days = present_days + excluded.present_days,
+            half_days = half_days + excluded.half_days,
+            absent_days = absent_days + excluded.absent_days;'''
+
+
+def _summary_prune(row):
+    """Drop the summary row for ``row``'s month once it no longer counts anything"""
+    return f'''
+        DELETE FROM attendance_monthly_summary
+        WHERE employee_id = {row}.employee_id
+          AND year = CAST(substr({row}.date, 1, 4) AS INTEGER)
+          AND month = CAST(substr({row}.date, 6, 2) AS INTEGER)
+          AND present_days = 0 AND half_days = 0 AND absent_days = 0;'''
+
+
+@migration(3, "monthly attendance summary maintained by triggers")
+def _attendance_summary(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS attendance_monthly_summary
+                        (employee_id INTEGER NOT NULL, year INTEGER NOT NULL,
+                         month INTEGER NOT NULL,
+                         present_days INTEGER NOT NULL DEFAULT 0,
+                         half_days INTEGER NOT NULL DEFAULT 0,
+                         absent_days INTEGER NOT NULL DEFAULT 0,
+                         PRIMARY KEY (employee_id, year, month)) WITHOUT ROWID''')
+    conn.execute('''CREATE INDEX IF NOT EXISTS ix_attendance_summary_period
+                        ON attendance_monthly_summary (year, month)''')
+    conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_attendance_summary_insert
+                         AFTER INSERT ON attendance
+                         BEGIN {_summary_delta('NEW', '+')}
+                         END''')
+    conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_attendance_summary_delete
+                         AFTER DELETE ON attendance
+                         BEGIN {_summary_delta('OLD', '-')}
+                         {_summary_prune('OLD')}
+                         END''')
+    conn.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_attendance_summary_update
+                         AFTER UPDATE OF employee_id, date, status ON attendance
+                         BEGIN {_summary_delta('OLD', '-')}
+                         {_summary_delta('NEW', '+')}
+                         {_summary_prune('OLD')}
+                         END''')
+    rebuild_attendance_summary(conn)
+
+
+MOVEMENT_KINDS = ('receipt', 'consumption', 'adjustment')
+
+
+@migration(4, "unique inventory items with an append-only stock ledger")
+def _inventory_ledger(conn):
+    # INSERT OR REPLACE without a unique key appended a row per update, so
+    # the newest row for each name holds the current quantity.
+    conn.execute('''DELETE FROM inventory WHERE id NOT IN
+                        (SELECT MAX(id) FROM inventory GROUP BY item_name)''')
+    conn.execute("UPDATE inventory SET quantity = 0 WHERE quantity IS NULL")
+    conn.execute('''CREATE UNIQUE INDEX IF NOT EXISTS ux_inventory_item_name
+                        ON inventory (item_name)''')
+    kinds = ", ".join(f"'{kind}'" for kind in MOVEMENT_KINDS)
+    conn.execute(f'''CREATE TABLE IF NOT EXISTS inventory_movements
+                         (id INTEGER PRIMARY KEY,
+                          item_id INTEGER NOT NULL REFERENCES inventory(id),
+                          kind TEXT NOT NULL CHECK (kind IN ({kinds})),
+                          quantity REAL NOT NULL,
+                          note TEXT,
+                          created_at TEXT NOT NULL)''')
+    conn.execute('''CREATE INDEX IF NOT EXISTS ix_inventory_movements_item
+                        ON inventory_movements (item_id, id)''')
+    # Opening balances, recorded before the trigger exists so they are not
+    # added to the quantities a second time
+    conn.execute('''INSERT INTO inventory_movements
+                        (item_id, kind, quantity, note, created_at)
+                    SELECT id, 'adjustment', quantity, 'opening balance',
+                           COALESCE(last_updated, datetime('now', 'localtime'))
+                    FROM inventory WHERE quantity != 0''')
+    # inventory.quantity is the current-stock view of the ledger
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_inventory_movements_check
+                        BEFORE INSERT ON inventory_movements
+                        WHEN (SELECT quantity FROM inventory WHERE id = NEW.item_id)
+                             + NEW.quantity < 0
+                        BEGIN SELECT RAISE(ABORT, 'insufficient stock'); END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_inventory_movements_apply
+                        AFTER INSERT ON inventory_movements
+                        BEGIN
+                            UPDATE inventory
+                            SET quantity = quantity + NEW.quantity,
+                                last_updated = NEW.created_at
+                            WHERE id = NEW.item_id;
+                        END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_inventory_movements_no_update
+                        BEFORE UPDATE ON inventory_movements
+                        BEGIN SELECT RAISE(ABORT, 'inventory movements are append-only'); END''')
+    # History may only go once its item has been deleted
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_inventory_movements_no_delete
+                        BEFORE DELETE ON inventory_movements
+                        WHEN EXISTS (SELECT 1 FROM inventory WHERE id = OLD.item_id)
+                        BEGIN SELECT RAISE(ABORT, 'inventory movements are append-only'); END''')
+
+
+@migration(5, "per-item reorder levels with a low-stock index")
+def _reorder_levels(conn):
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(inventory)")]
+    if 'reorder_level' not in columns:
+        # 10 was the fixed low-stock threshold before levels were per item
+        conn.execute('''ALTER TABLE inventory
+                            ADD COLUMN reorder_level REAL NOT NULL DEFAULT 10''')
+    # Only items below their level are indexed, so the low-stock query
+    # reads just those rows however large the catalogue grows
+    conn.execute('''CREATE INDEX IF NOT EXISTS ix_inventory_low_stock
+                        ON inventory (item_name) WHERE quantity < reorder_level''')
+
+
+@migration(6, "recurring rent schedules and a status/due date index")
+def _rent_schedules(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS rent_schedules
+                        (id INTEGER PRIMARY KEY,
+                         description TEXT,
+                         amount REAL NOT NULL,
+                         day_of_month INTEGER NOT NULL
+                             CHECK (day_of_month BETWEEN 1 AND 31),
+                         start_date TEXT NOT NULL,
+                         end_date TEXT,
+                         generated_until TEXT)''')
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(rent_payments)")]
+    if 'schedule_id' not in columns:
+        conn.execute('''ALTER TABLE rent_payments
+                            ADD COLUMN schedule_id INTEGER REFERENCES rent_schedules(id)''')
+    # One generated payment per schedule and due date, so concurrent
+    # generators cannot create the same month twice
+    conn.execute('''CREATE UNIQUE INDEX IF NOT EXISTS ux_rent_payments_schedule_due
+                        ON rent_payments (schedule_id, due_date)
+                        WHERE schedule_id IS NOT NULL''')
+    conn.execute('''CREATE INDEX IF NOT EXISTS ix_rent_payments_status_due
+                        ON rent_payments (status, due_date)''')
+
+
+@migration(7, "store admin passwords as salted scrypt hashes")
+def _hash_admin_passwords(conn):
+    rows = conn.execute("SELECT username, password FROM admin").fetchall()
+    conn.executemany("UPDATE admin SET password = ? WHERE username = ?",
+                     [(passwords.hash_password(password or ''), username)
+                      for username, password in rows
+                      if not passwords.is_hashed(password)])
+
+
+@migration(8, "catalog of property databases")
+def _properties(conn):
+    # Only read in the main database; other property files carry it empty
+    conn.execute('''CREATE TABLE IF NOT EXISTS properties
+                        (slug TEXT PRIMARY KEY,
+                         name TEXT NOT NULL,
+                         path TEXT NOT NULL UNIQUE)''')
+
+
+@migration(9, "change log of updated and deleted attendance rows")
+def _attendance_changes(conn):
+    # New rows are found by id; this log covers what an id high-water mark
+    # cannot see: status changes (upserts keep the id), deletes, and inserts
+    # that reuse the id of a deleted row
+    conn.execute('''CREATE TABLE IF NOT EXISTS attendance_changes
+                        (seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                         attendance_id INTEGER NOT NULL)''')
+    conn.execute('''CREATE INDEX IF NOT EXISTS ix_attendance_changes_attendance
+                        ON attendance_changes (attendance_id)''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_attendance_changes_update
+                        AFTER UPDATE ON attendance
+                        WHEN OLD.status IS NOT NEW.status OR OLD.date IS NOT NEW.date
+                          OR OLD.employee_id IS NOT NEW.employee_id OR OLD.id != NEW.id
+                    BEGIN
+                        INSERT INTO attendance_changes (attendance_id) VALUES (OLD.id);
+                        INSERT INTO attendance_changes (attendance_id)
+                            SELECT NEW.id WHERE NEW.id != OLD.id;
+                    END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_attendance_changes_delete
+                        AFTER DELETE ON attendance
+                    BEGIN
+                        INSERT INTO attendance_changes (attendance_id) VALUES (OLD.id);
+                    END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_attendance_changes_reuse
+                        AFTER INSERT ON attendance
+                        WHEN EXISTS (SELECT 1 FROM attendance_changes
+                                     WHERE attendance_id = NEW.id)
+                    BEGIN
+                        INSERT INTO attendance_changes (attendance_id) VALUES (NEW.id);
+                    END''')
+
+
+@migration(10, "soft-delete inventory items so their ledger survives")
+def _inventory_soft_delete(conn):
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(inventory)")]
+    if 'deleted_at' not in columns:
+        conn.execute("ALTER TABLE inventory ADD COLUMN deleted_at TEXT")
+    # Deleting an item now only marks it, so the ledger never loses history
+    conn.execute("DROP TRIGGER IF EXISTS trg_inventory_movements_no_delete")
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_inventory_movements_no_delete
+                        BEFORE DELETE ON inventory_movements
+                        BEGIN SELECT RAISE(ABORT, 'inventory movements are append-only'); END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS trg_inventory_movements_live_item
+                        BEFORE INSERT ON inventory_movements
+                        WHEN NOT EXISTS (SELECT 1 FROM inventory
+                                         WHERE id = NEW.item_id AND deleted_at IS NULL)
+                        BEGIN SELECT RAISE(ABORT, 'unknown or deleted inventory item'); END''')
+
+
+@migration(11, "expression indexes matching the keyset page sort keys")
+def _page_sort_indexes(conn):
+    # The pages sort on COALESCE(column, ...) so NULLs get a comparable
+    # cursor value; only an index on the same expression lets SQLite walk
+    # it in order instead of sorting the whole table for every page. The
+    # rowid is implicitly the last key, which matches the id tie-breaker.
+    conn.execute('''CREATE INDEX IF NOT EXISTS ix_employees_page_name
+                        ON employees (COALESCE(name, ''))''')
+    conn.execute('''CREATE INDEX IF NOT EXISTS ix_attendance_page_date
+                        ON attendance (date)''')
+    conn.execute('''CREATE INDEX IF NOT EXISTS ix_inventory_page_item_name
+                        ON inventory (COALESCE(item_name, ''))''')
+    conn.execute('''CREATE INDEX IF NOT EXISTS ix_rent_payments_page_due
+                        ON rent_payments (COALESCE(due_date, ''))''')
+    conn.execute('''CREATE INDEX IF NOT EXISTS ix_rent_payments_page_status_due
+                        ON rent_payments (status, COALESCE(due_date, ''))''')
@@ -0,0 +1,236 @@
+import streamlit as st
+import pandas as pd
+
+import alerts
+import auth
+import database as db
+import exporter
+import jobs
+import properties
+
+
+# One-time setup shared by app.py and every page. st.cache_resource keeps
+# the result for the life of the server process (per property database),
+# so reruns and page switches skip the schema check entirely.
+@st.cache_resource(show_spinner="Preparing database...")
+def _prepare_database(path):
+    db.ensure_schema()
+    return db.schema_version()
+
+
+def init_database():
+    """Create and migrate the schema once per server process"""
+    return _prepare_database(db.current_path())
+
+
+def use_selected_property():
+    """Route this script run's queries to the property picked in the sidebar"""
+    slug = st.session_state.get('property', properties.DEFAULT_PROPERTY)
+    try:
+        path = properties.path_for(slug)
+    except KeyError:
+        slug, path = properties.DEFAULT_PROPERTY, db.DB_PATH
+        st.session_state.property = slug
+    # Script runs get a fresh thread, so this is set at the top of each run
+    db.set_current_database(path)
+    return slug
+
+
+def property_selector():
+    """Sidebar picker shown once more than one property is registered"""
+    choices = properties.list_properties()
+    if len(choices) < 2:
+        return
+    names = {slug: name for slug, name, _ in choices}
+    st.sidebar.selectbox("Property", list(names), format_func=names.__getitem__,
+                         key='property')
+
+
+def require_login():
+    """Guard at the top of every page: one-time setup plus a session check"""
+    use_selected_property()
+    init_database()
+    if (not st.session_state.get('authenticated')
+            or auth.session_user(st.session_state.get('auth_token')) is None):
+        st.session_state.authenticated = False
+        st.error("Please login first")
+        st.stop()
+    property_selector()
+    low_stock_badge()
+    jobs.start()
+
+
+# Lookup helpers for selectbox dropdowns. Build these once per fetch and
+# pass ``labels.__getitem__`` as ``format_func`` instead of masking the
+# DataFrame for every option.
+def index_by_id(df, id_column='id'):
+    """DataFrame indexed by its id column for O(1) ``.loc[id]`` row lookups"""
+    return df.set_index(id_column, drop=False)
+
+
+def label_map(df, fmt, id_column='id'):
+    """Map each id to ``fmt(row)``, where row is a dict of column values"""
+    return {row[id_column]: fmt(row) for row in df.to_dict('records')}
+
+
+# Keyset pager. ``fetch(page_size, cursor)`` must return ``(df, next_cursor)``
+# like the ``get_*_page`` functions in database.py. The stack of cursors seen
+# so far lives in session state so Previous can step back without OFFSET.
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def _pager_state(key, filters):
+    state = st.session_state.get(key)
+    if state is None or state['filters'] != filters:
+        state = {'filters': filters, 'cursors': [None]}
+        st.session_state[key] = state
+    return state
+
+
+def _next_page(key, cursor):
+    st.session_state[key]['cursors'].append(cursor)
+
+
+def _previous_page(key):
+    cursors = st.session_state[key]['cursors']
+    if len(cursors) > 1:
+        cursors.pop()
+
+
+def paged_dataframe(key, fetch, filters=()):
+    """Show one page of records with Previous/Next controls.
+
+    ``filters`` should hold every argument that changes the result set, so
+    the pager goes back to the first page when any of them changes.
+    Returns the DataFrame of the visible page.
+    """
+    page_size = st.session_state.get(f"{key}_page_size", PAGE_SIZES[1])
+    state = _pager_state(key, tuple(filters) + (page_size,))
+    cursors = state['cursors']
+    df, next_cursor = fetch(page_size, cursors[-1])
+    st.dataframe(df, hide_index=True)
+
+    col1, col2, col3, col4 = st.columns([1, 2, 1, 2])
+    with col1:
+        st.button("◀ Previous", key=f"{key}_prev", disabled=len(cursors) == 1,
+                  on_click=_previous_page, args=(key,))
+    with col2:
+        st.caption(f"Page {len(cursors)} · {len(df)} rows")
+    with col3:
+        st.button("Next ▶", key=f"{key}_next", disabled=next_cursor is None,
+                  on_click=_next_page, args=(key, next_cursor))
+    with col4:
+        st.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(page_size),
+                     key=f"{key}_page_size", label_visibility="collapsed")
+    return df
+
+
+def bulk_import_widget(kind, help_text):
+    """File uploader that imports a CSV/Parquet file through importer.py in a job"""
+    with st.expander("Bulk import from CSV / Parquet"):
+        st.caption(help_text)
+        upload = st.file_uploader("File", type=["csv", "parquet"],
+                                  key=f"{kind}_import_file")
+        if upload is not None and st.button("Import", key=f"{kind}_import_button"):
+            path = jobs.stage_file(upload.name, upload.getvalue())
+            submit_job(f"{kind}_import_job", 'import', {'kind': kind, 'path': path})
+        report = job_progress(f"{kind}_import_job")
+        if report is not None:
+            report = report['result']
+            st.success(f"Imported {report['imported']} of {report['rows']} rows "
+                       f"in {report['seconds']:.2f}s")
+            if report['rejects']:
+                st.warning(f"{report['rejected']} rows were rejected")
+                st.dataframe(pd.DataFrame(report['rejects'])[['row', 'reason']],
+                             hide_index=True)
+
+
+# Background jobs. A page submits slow work with submit_job and calls
+# job_progress on every run; the job id lives in st.session_state, so the
+# session can rerun freely (or the user can switch pages) while a worker
+# thread does the work.
+def submit_job(state_key, kind, params):
+    """Queue a job and remember its id under ``state_key`` for job_progress"""
+    st.session_state[state_key] = jobs.submit(kind, params)
+
+
+def _show_job(job):
+    if job['status'] == 'queued' and job['attempts']:
+        st.warning(f"Retrying ({job['attempts']}/{job['max_attempts']} attempts "
+                   f"so far) after: {job['error']}")
+    elif job['status'] == 'queued':
+        st.info("Queued...")
+    elif job['status'] == 'running':
+        st.progress(job['progress'], text=job['message'] or "Running...")
+    elif job['status'] == 'failed':
+        st.error(f"Failed after {job['attempts']} attempt(s): {job['error']}")
+
+
+def job_progress(state_key):
+    """Show the job remembered under ``state_key``; return it once it succeeded.
+
+    While the job is queued or running, a fragment polls it every
+    jobs.POLL_INTERVAL seconds and reruns the page when it is done, without
+    blocking the rest of the page. Failed jobs get a Retry button.
+    """
+    job_id = st.session_state.get(state_key)
+    job = jobs.get(job_id) if job_id is not None else None
+    if job is None:
+        st.session_state.pop(state_key, None)
+        return None
+
+    if job['status'] in jobs.ACTIVE:
+        @st.fragment(run_every=jobs.POLL_INTERVAL)
+        def poll():
+            current = jobs.get(job_id)
+            if current['status'] not in jobs.ACTIVE:
+                st.rerun()
+            _show_job(current)
+        poll()
+        return None
+
+    _show_job(job)
+    if job['status'] == 'failed':
+        if st.button("Retry", key=f"{state_key}_retry"):
+            jobs.retry(job_id)
+            st.rerun()
+        return None
+    return job
+
+
+def export_buttons(kind, key, file_parts=(), **params):
+    """Format picker plus a download button that streams the export on click"""
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        fmt = st.selectbox("Export format", list(exporter.FORMATS), key=f"{key}_format",
+                           label_visibility="collapsed")
+    # The deferred export runs on another thread, which has no route of its
+    # own; pin it to the database this page is showing
+    path = db.current_path()
+
+    def export():
+        with db.using_database(path):
+            return exporter.export_to_tempfile(kind, fmt, **params)
+
+    with col2:
+        st.download_button(
+            f"⬇ Download {kind} ({fmt.upper()})",
+            data=export,
+            file_name=exporter.file_name(kind, fmt, *file_parts),
+            mime=exporter.FORMATS[fmt][0],
+            key=f"{key}_download",
+            on_click="ignore",
+        )
+
+
+def low_stock_badge():
+    """Sidebar badge with the number of items below their reorder level.
+
+    Reads the list kept by the background checker in alerts.py, so it costs
+    no query unless inventory changed since the last check.
+    """
+    alerts.start()
+    count = alerts.alert_count()
+    if count:
+        st.sidebar.warning(f"⚠️ {count} item{'s' if count != 1 else ''} below "
+                           f"reorder level")
@@ -1,112 +1,171 @@
-import streamlit as st
-import database as db
-from datetime import datetime, timedelta
-import pandas as pd
-
-if 'authenticated' not in st.session_state or not st.session_state.authenticated:
-    st.error("Please login first")
-    st.stop()
-
-st.title("Attendance Management")
-
-tab1, tab2, tab3 = st.tabs(["Mark Attendance", "View/Update Attendance", "Delete Attendance"])
-
-with tab1:
-    employees = db.get_employees()
-    date = st.date_input("Date", datetime.now())
-
-    if not employees.empty:
-        attendance_data = []
-        with st.form("attendance_form"):
-            for _, employee in employees.iterrows():
-                status = st.selectbox(
-                    f"Status for {employee['name']}",
-                    ['Present', 'Absent', 'Half-day'],
-                    key=f"attendance_{employee['id']}"
-                )
-                attendance_data.append({
-                    'employee_id': employee['id'],
-                    'status': status
-                })
-            if st.form_submit_button("Mark Attendance"):
-                success = True
-                for data in attendance_data:
-                    if not db.mark_attendance(
-                        data['employee_id'],
-                        date.strftime('%Y-%m-%d'),
-                        data['status']
-                    ):
-                        success = False
-                        break
-                if success:
-                    st.success("Attendance marked successfully")
-                    st.rerun()
-                else:
-                    st.error("Failed to mark attendance")
-    else:
-        st.info("No employees found")
-
-with tab2:
-    col1, col2 = st.columns(2)
-    with col1:
-        start_date = st.date_input("Start Date",
-                                   datetime.now() - timedelta(days=30))
-    with col2:
-        end_date = st.date_input("End Date", datetime.now())
-
-    attendance = db.get_attendance(
-        start_date.strftime('%Y-%m-%d'),
-        end_date.strftime('%Y-%m-%d')
-    )
-
-
-
-    if not attendance.empty:
-        st.dataframe(attendance)
-        # Update attendance section
-        st.subheader("Update Attendance")
-        with st.form("update_attendance"):
-            attendance_id = st.selectbox(
-                "Select Attendance Record",
-                attendance['id'].tolist(),
-                format_func=lambda x: f"{attendance[attendance['id'] == x]['name'].iloc[0]} - "
-                                      f"{attendance[attendance['id'] == x]['date'].iloc[0]}"
-            )
-            new_status = st.selectbox(
-                "New Status",
-                ['Present', 'Absent', 'Half-day']
-            )
-            if st.form_submit_button("Update Attendance"):
-                if db.update_attendance(attendance_id, new_status):
-                    st.success("Attendance updated successfully")
-                    st.rerun()
-                else:
-                    st.error("Failed to update attendance")
-    else:
-        st.info("No attendance records found")
-
-with tab3:
-    if not attendance.empty:
-        st.warning("⚠️ Warning: This action cannot be undone!")
-        with st.form("delete_attendance"):
-            attendance_id_to_delete = st.selectbox(
-                "Select Attendance Record to Delete",
-                attendance['id'].tolist(),
-                format_func=lambda x: f"{attendance[attendance['id']==x]['name'].iloc[0]} - "
-                                    f"{attendance[attendance['id']==x]['date'].iloc[0]}"
-            )
-            confirm = st.text_input(
-                "Type 'DELETE' to confirm",
-                help="This action is irreversible"
-            )
-            if st.form_submit_button("Delete Attendance"):
-                if confirm == "DELETE":
-                    if db.delete_attendance(attendance_id_to_delete):
-                        st.success("Attendance record deleted successfully")
-                        st.rerun()
-                    else:
-                        st.error("Failed to delete attendance record")
-                else:
-                    st.error("Please type 'DELETE' to confirm")
-    else:
-        st.info("No attendance records found")
\ No newline at end of file
+import streamlit as st
+import attendance_store
+import database as db
+import repository
+from datetime import datetime, timedelta
+import pandas as pd
+from page_helpers import (bulk_import_widget, export_buttons, job_progress, label_map,
+                          paged_dataframe, require_login, submit_job)
+
+require_login()
+
+st.title("Attendance Management")
+
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["Mark Attendance", "View/Update Attendance",
+                                        "Delete Attendance", "Monthly Summary", "Analytics"])
+
+with tab1:
+    # Ids and names are all the form needs, not the full employee rows
+    employee_names = repository.employees.column_map('name')
+    date = st.date_input("Date", datetime.now())
+
+    if employee_names:
+        attendance_data = []
+        with st.form("attendance_form"):
+            for employee_id, employee_name in employee_names.items():
+                status = st.selectbox(
+                    f"Status for {employee_name}",
+                    ['Present', 'Absent', 'Half-day'],
+                    key=f"attendance_{employee_id}"
+                )
+                attendance_data.append({
+                    'employee_id': employee_id,
+                    'status': status
+                })
+            if st.form_submit_button("Mark Attendance"):
+                records = [(int(data['employee_id']), data['status'])
+                           for data in attendance_data]
+                submit_job("attendance_job", 'mark_attendance',
+                           {'date': date.strftime('%Y-%m-%d'), 'records': records})
+        if job_progress("attendance_job") is not None:
+            st.success("Attendance marked successfully")
+    else:
+        st.info("No employees found")
+
+    bulk_import_widget(
+        "attendance",
+        "Columns: employee_id, date (YYYY-MM-DD), status (Present, Absent or Half-day). "
+        "Existing entries for the same employee and date are overwritten."
+    )
+
+with tab2:
+    col1, col2 = st.columns(2)
+    with col1:
+        start_date = st.date_input("Start Date",
+                                   datetime.now() - timedelta(days=30))
+    with col2:
+        end_date = st.date_input("End Date", datetime.now())
+
+    search = st.text_input("Search by employee name", key="attendance_search")
+    start, end = start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+    # Only the visible page is fetched; the update/delete forms below act on it
+    attendance = paged_dataframe(
+        "attendance_pager",
+        lambda size, cursor: db.get_attendance_page(start, end, size, cursor,
+                                                    search=search),
+        filters=(start, end, search)
+    )
+    export_buttons("attendance", "attendance_export", (start, end),
+                   start_date=start, end_date=end)
+    attendance_labels = label_map(attendance, lambda r: f"{r['name']} - {r['date']}")
+
+    if not attendance.empty:
+        # Update attendance section
+        st.subheader("Update Attendance")
+        with st.form("update_attendance"):
+            attendance_id = st.selectbox(
+                "Select Attendance Record",
+                attendance['id'].tolist(),
+                format_func=attendance_labels.__getitem__
+            )
+            new_status = st.selectbox(
+                "New Status",
+                ['Present', 'Absent', 'Half-day']
+            )
+            if st.form_submit_button("Update Attendance"):
+                if db.update_attendance(attendance_id, new_status):
+                    st.success("Attendance updated successfully")
+                    st.rerun()
+                else:
+                    st.error("Failed to update attendance")
+    else:
+        st.info("No attendance records found")
+
+with tab3:
+    if not attendance.empty:
+        st.warning("⚠️ Warning: This action cannot be undone!")
+        with st.form("delete_attendance"):
+            attendance_id_to_delete = st.selectbox(
+                "Select Attendance Record to Delete",
+                attendance['id'].tolist(),
+                format_func=attendance_labels.__getitem__
+            )
+            confirm = st.text_input(
+                "Type 'DELETE' to confirm",
+                help="This action is irreversible"
+            )
+            if st.form_submit_button("Delete Attendance"):
+                if confirm == "DELETE":
+                    if db.delete_attendance(attendance_id_to_delete):
+                        st.success("Attendance record deleted successfully")
+                        st.rerun()
+                    else:
+                        st.error("Failed to delete attendance record")
+                else:
+                    st.error("Please type 'DELETE' to confirm")
+    else:
+        st.info("No attendance records found")
+
+with tab4:
+    col1, col2 = st.columns(2)
+    with col1:
+        summary_month = st.selectbox("Month", range(1, 13),
+                                     index=datetime.now().month - 1,
+                                     key="summary_month")
+    with col2:
+        summary_year = st.selectbox("Year", range(2020, datetime.now().year + 1),
+                                    index=datetime.now().year - 2020,
+                                    key="summary_year")
+    summary = db.get_attendance_summary(summary_month, summary_year)
+    if not summary.empty:
+        st.dataframe(summary, hide_index=True)
+    else:
+        st.info("No employees found")
+
+with tab5:
+    store = attendance_store.get_store()
+    col1, col2 = st.columns(2)
+    with col1:
+        analytics_start = st.date_input("From", datetime.now() - timedelta(days=90),
+                                        key="analytics_start")
+    with col2:
+        analytics_end = st.date_input("To", datetime.now(), key="analytics_end")
+
+    st.subheader("Attendance Rate")
+    rates = store.attendance_rate(analytics_start, analytics_end)
+    if not rates.empty:
+        st.dataframe(rates, hide_index=True,
+                     column_config={"attendance_rate": st.column_config.ProgressColumn(
+                         "attendance_rate", min_value=0.0, max_value=1.0, format="percent")})
+    else:
+        st.info("No attendance records found")
+
+    st.subheader("Absentee Streaks")
+    min_days = st.number_input("Minimum consecutive absent days", min_value=1, value=3)
+    streaks = store.absentee_streaks(analytics_start, analytics_end, min_days)
+    if not streaks.empty:
+        st.dataframe(streaks, hide_index=True)
+    else:
+        st.info("No absentee streaks found")
+
+    st.subheader("Employee Calendar")
+    if employee_names:
+        calendar_employee = st.selectbox(
+            "Select Employee", list(employee_names),
+            format_func=employee_names.__getitem__,
+            key="calendar_employee")
+        calendar_year = st.selectbox("Year", range(2020, datetime.now().year + 1),
+                                     index=datetime.now().year - 2020,
+                                     key="calendar_year")
+        st.dataframe(store.employee_calendar(calendar_employee, calendar_year))
+    st.caption(f"{len(store)} records held in {store.nbytes / 1024:.0f} KiB")
@@ -1,132 +1,194 @@
-import streamlit as st
-import database as db
-from datetime import datetime
-import pandas as pd
-
-if 'authenticated' not in st.session_state or not st.session_state.authenticated:
-    st.error("Please login first")
-    st.stop()
-
-st.title("Salary Management")
-
-tab1, tab2, tab3 = st.tabs(["Calculate Salary", "Advance Management", "Update/Delete Advances"])
-
-with tab1:
-    employees = db.get_employees()
-    if not employees.empty:
-        employee_id = st.selectbox(
-            "Select Employee",
-            employees['id'].tolist(),
-            format_func=lambda x: employees[employees['id'] == x]['name'].iloc[0]
-        )
-
-        month = st.selectbox("Month", range(1, 13))
-        year = st.selectbox("Year", range(2020, datetime.now().year + 1))
-
-        if st.button("Calculate Salary"):
-            attendance = db.get_attendance(
-                f"{year}-{month:02d}-01",
-                f"{year}-{month:02d}-31"
-            )
-
-            if not attendance.empty:
-                present_days = len(attendance[attendance['status'] == 'Present'])
-                half_days = len(attendance[attendance['status'] == 'Half-day'])
-                daily_wage = employees[employees['id'] == employee_id]['daily_wage'].iloc[0]
-
-                total_salary = (present_days + (half_days * 0.5)) * daily_wage
-
-                advances = db.get_advances(employee_id, month, year)
-                total_advance = advances['amount'].sum() if not advances.empty else 0
-
-                st.write(f"Present Days: {present_days}")
-                st.write(f"Half Days: {half_days}")
-                st.write(f"Total Salary: ₹{total_salary}")
-                st.write(f"Total Advances: ₹{total_advance}")
-                st.write(f"Net Salary: ₹{total_salary - total_advance}")
-            else:
-                st.warning("No attendance records found for selected period")
-    else:
-        st.info("No employees found")
-
-with tab2:
-    if not employees.empty:
-        with st.form("advance_form"):
-            emp_id = st.selectbox(
-                "Select Employee",
-                employees['id'].tolist(),
-                format_func=lambda x: employees[employees['id'] == x]['name'].iloc[0],
-                key="advance_emp_select"
-            )
-            amount = st.number_input("Advance Amount", min_value=0.0)
-
-            if st.form_submit_button("Add Advance"):
-                if db.add_advance(emp_id, amount):
-                    st.success("Advance recorded successfully")
-                    st.rerun()
-                else:
-                    st.error("Failed to record advance")
-    else:
-        st.info("No employees found")
-
-with tab3:
-    if not employees.empty:
-        # View and manage advances
-        selected_emp = st.selectbox(
-            "Select Employee",
-            employees['id'].tolist(),
-            format_func=lambda x: employees[employees['id']==x]['name'].iloc[0],
-            key="manage_advance_emp_select"
-        )
-        month = st.selectbox("Month", range(1, 13), key="manage_advance_month")
-        year = st.selectbox("Year", range(2020, datetime.now().year + 1),
-                          key="manage_advance_year")
-        advances = db.get_advances(selected_emp, month, year)
-        if not advances.empty:
-            st.dataframe(advances)
-            # Update advance
-            st.subheader("Update Advance")
-            with st.form("update_advance"):
-                advance_id = st.selectbox(
-                    "Select Advance to Update",
-                    advances['id'].tolist(),
-                    format_func=lambda x: f"Amount: ₹{advances[advances['id']==x]['amount'].iloc[0]} "
-                                        f"(Date: {advances[advances['id']==x]['date'].iloc[0]})"
-                )
-                new_amount = st.number_input(
-                    "New Amount",
-                    value=float(advances[advances['id']==advance_id]['amount'].iloc[0]),
-                    min_value=0.0
-                )
-                if st.form_submit_button("Update Advance"):
-                    if db.update_advance(advance_id, new_amount):
-                        st.success("Advance updated successfully")
-                        st.rerun()
-                    else:
-                        st.error("Failed to update advance")
-            # Delete advance
-            st.subheader("Delete Advance")
-            with st.form("delete_advance"):
-                advance_id_to_delete = st.selectbox(
-                    "Select Advance to Delete",
-                    advances['id'].tolist(),
-                    format_func=lambda x: f"Amount: ₹{advances[advances['id']==x]['amount'].iloc[0]} "
-                                        f"(Date: {advances[advances['id']==x]['date'].iloc[0]})"
-                )
-                confirm = st.text_input(
-                    "Type 'DELETE' to confirm",
-                    help="This action is irreversible"
-                )
-                if st.form_submit_button("Delete Advance"):
-                    if confirm == "DELETE":
-                        if db.delete_advance(advance_id_to_delete):
-                            st.success("Advance deleted successfully")
-                            st.rerun()
-                        else:
-                            st.error("Failed to delete advance")
-                    else:
-                        st.error("Please type 'DELETE' to confirm")
-        else:
-            st.info("No advances found for selected period")
-    else:
-        st.info("No employees found")
\ No newline at end of file
+import calendar
+import streamlit as st
+import database as db
+import repository
+from datetime import datetime
+import pandas as pd
+from page_helpers import (export_buttons, index_by_id, job_progress, label_map,
+                          require_login, submit_job)
+
+require_login()
+
+st.title("Salary Management")
+
+tab1, tab2, tab3, tab4 = st.tabs(["Calculate Salary", "Advance Management",
+                                  "Update/Delete Advances", "Annual Reconciliation"])
+
+with tab1:
+    employee_names = repository.employees.column_map('name')
+    if employee_names:
+        employee_id = st.selectbox(
+            "Select Employee",
+            list(employee_names),
+            format_func=employee_names.__getitem__
+        )
+
+        month = st.selectbox("Month", range(1, 13))
+        year = st.selectbox("Year", range(2020, datetime.now().year + 1))
+
+        export_buttons("payroll", "payroll_export", (year, f"{month:02d}"),
+                       month=month, year=year)
+
+        period = {'month': month, 'year': year}
+        if st.button("Calculate Salary"):
+            submit_job("salary_job", 'payroll', period)
+        job = job_progress("salary_job")
+        if job is not None and job['params'] == period:
+            payroll = pd.DataFrame(**job['result']['payroll'])
+            # An empty result has no columns to filter on
+            row = (payroll[payroll['employee_id'] == employee_id]
+                   if not payroll.empty else payroll)
+
+            if not row.empty and row[['present_days', 'half_days',
+                                      'absent_days']].sum(axis=1).iloc[0] > 0:
+                row = row.iloc[0]
+                st.write(f"Present Days: {row['present_days']}")
+                st.write(f"Half Days: {row['half_days']}")
+                st.write(f"Total Salary: ₹{row['gross']}")
+                st.write(f"Total Advances: ₹{row['advances']}")
+                st.write(f"Net Salary: ₹{row['net']}")
+            else:
+                st.warning("No attendance records found for selected period")
+
+            with st.expander("Payroll for all employees"):
+                st.dataframe(payroll, hide_index=True)
+            if 'all_properties' in job['result']:
+                with st.expander("Payroll across all properties"):
+                    st.dataframe(pd.DataFrame(**job['result']['all_properties']),
+                                 hide_index=True)
+        elif job is not None:
+            st.info("Period changed; calculate the salary again")
+    else:
+        st.info("No employees found")
+
+with tab2:
+    if employee_names:
+        with st.form("advance_form"):
+            emp_id = st.selectbox(
+                "Select Employee",
+                list(employee_names),
+                format_func=employee_names.__getitem__,
+                key="advance_emp_select"
+            )
+            amount = st.number_input("Advance Amount", min_value=0.0)
+
+            if st.form_submit_button("Add Advance"):
+                if db.add_advance(emp_id, amount):
+                    st.success("Advance recorded successfully")
+                    st.rerun()
+                else:
+                    st.error("Failed to record advance")
+    else:
+        st.info("No employees found")
+
+with tab3:
+    if employee_names:
+        # View and manage advances
+        selected_emp = st.selectbox(
+            "Select Employee",
+            list(employee_names),
+            format_func=employee_names.__getitem__,
+            key="manage_advance_emp_select"
+        )
+        month = st.selectbox("Month", range(1, 13), key="manage_advance_month")
+        year = st.selectbox("Year", range(2020, datetime.now().year + 1),
+                          key="manage_advance_year")
+        advances = db.get_advances(selected_emp, month, year)
+        last_day = calendar.monthrange(year, month)[1]
+        export_buttons("advances", "advances_export",
+                       (selected_emp, year, f"{month:02d}"),
+                       start_date=f"{year}-{month:02d}-01",
+                       end_date=f"{year}-{month:02d}-{last_day:02d}",
+                       employee_id=selected_emp)
+        if not advances.empty:
+            advances_by_id = index_by_id(advances)
+            advance_labels = label_map(
+                advances, lambda r: f"Amount: ₹{r['amount']} (Date: {r['date']})")
+            st.dataframe(advances)
+            # Update advance
+            st.subheader("Update Advance")
+            with st.form("update_advance"):
+                advance_id = st.selectbox(
+                    "Select Advance to Update",
+                    advances['id'].tolist(),
+                    format_func=advance_labels.__getitem__
+                )
+                new_amount = st.number_input(
+                    "New Amount",
+                    value=float(advances_by_id.loc[advance_id, 'amount']),
+                    min_value=0.0
+                )
+                if st.form_submit_button("Update Advance"):
+                    if db.update_advance(advance_id, new_amount):
+                        st.success("Advance updated successfully")
+                        st.rerun()
+                    else:
+                        st.error("Failed to update advance")
+            # Delete advance
+            st.subheader("Delete Advance")
+            with st.form("delete_advance"):
+                advance_id_to_delete = st.selectbox(
+                    "Select Advance to Delete",
+                    advances['id'].tolist(),
+                    format_func=advance_labels.__getitem__
+                )
+                confirm = st.text_input(
+                    "Type 'DELETE' to confirm",
+                    help="This action is irreversible"
+                )
+                if st.form_submit_button("Delete Advance"):
+                    if confirm == "DELETE":
+                        if db.delete_advance(advance_id_to_delete):
+                            st.success("Advance deleted successfully")
+                            st.rerun()
+                        else:
+                            st.error("Failed to delete advance")
+                    else:
+                        st.error("Please type 'DELETE' to confirm")
+        else:
+            st.info("No advances found for selected period")
+    else:
+        st.info("No employees found")
+
+with tab4:
+    if employee_names:
+        recon_year = st.selectbox("Year", range(2020, datetime.now().year + 1),
+                                  index=datetime.now().year - 2020, key="recon_year")
+        col1, col2 = st.columns(2)
+        with col1:
+            use_overtime = st.checkbox("Pay overtime")
+            standard_days = st.number_input("Standard days per month", min_value=0.0,
+                                            max_value=31.0, value=26.0,
+                                            disabled=not use_overtime)
+            premium = st.number_input("Overtime premium (share of daily wage)",
+                                      min_value=0.0, value=0.5, step=0.25,
+                                      disabled=not use_overtime)
+        with col2:
+            use_leave = st.checkbox("Paid leave")
+            leave_days = st.number_input("Paid absent days per month", min_value=0.0,
+                                         max_value=31.0, value=1.0,
+                                         disabled=not use_leave)
+
+        params = {
+            'year': recon_year,
+            'overtime': ({'standard_days': standard_days, 'premium': premium}
+                         if use_overtime else None),
+            'paid_leave': {'days_per_month': leave_days} if use_leave else None,
+        }
+        if st.button("Run Reconciliation"):
+            submit_job("payroll_job", 'annual_payroll', params)
+        job = job_progress("payroll_job")
+        if job is not None and job['params'] == params:
+            annual = pd.DataFrame(**job['result'])
+            if annual.empty:
+                st.info("No payroll data for selected year")
+            else:
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Gross", f"₹{annual['gross'].sum():,.2f}")
+                col2.metric("Advances", f"₹{annual['advances'].sum():,.2f}")
+                col3.metric("Net", f"₹{annual['net'].sum():,.2f}")
+                st.dataframe(annual, hide_index=True)
+        elif job is not None:
+            st.info("Settings changed; run the reconciliation again")
+    else:
+        st.info("No employees found")
@@ -1,60 +1,107 @@
-import streamlit as st
-import database as db
-import pandas as pd
-
-if 'authenticated' not in st.session_state or not st.session_state.authenticated:
-    st.error("Please login first")
-    st.stop()
-
-st.title("Inventory Management")
-
-tab1, tab2 = st.tabs(["Update Inventory", "View Inventory"])
-
-with tab1:
-    with st.form("inventory_form"):
-        item_name = st.text_input("Item Name")
-        quantity = st.number_input("Quantity", min_value=0.0)
-        unit = st.selectbox("Unit", ["kg", "liters", "pieces", "packets"])
-
-        if st.form_submit_button("Update Inventory"):
-            if db.update_inventory(item_name, quantity, unit):
-                st.success("Inventory updated successfully")
-                st.rerun()
-            else:
-                st.error("Failed to update inventory")
-
-with tab2:
-    inventory = db.get_inventory()
-    if not inventory.empty:
-        st.dataframe(inventory)
-
-        # Show low stock alerts
-        low_stock = inventory[inventory['quantity'] < 10]
-        if not low_stock.empty:
-            st.warning("Low Stock Alert!")
-            st.dataframe(low_stock)
-            # Delete inventory item
-            st.subheader("Delete Inventory Item")
-            with st.form("delete_inventory"):
-                item_id = st.selectbox(
-                    "Select Item to Delete",
-                    inventory['id'].tolist(),
-                    format_func=lambda x: f"{inventory[inventory['id'] == x]['item_name'].iloc[0]} "
-                                          f"({inventory[inventory['id'] == x]['quantity'].iloc[0]} "
-                                          f"{inventory[inventory['id'] == x]['unit'].iloc[0]})"
-                )
-                confirm = st.text_input(
-                    "Type 'DELETE' to confirm",
-                    help="This action is irreversible"
-                )
-                if st.form_submit_button("Delete Item"):
-                    if confirm == "DELETE":
-                        if db.delete_inventory_item(item_id):
-                            st.success("Item deleted successfully")
-                            st.rerun()
-                        else:
-                            st.error("Failed to delete item")
-                    else:
-                        st.error("Please type 'DELETE' to confirm")
-    else:
-        st.info("No inventory items found")
+import sqlite3
+import streamlit as st
+import database as db
+import alerts
+import pandas as pd
+from page_helpers import bulk_import_widget, label_map, paged_dataframe, require_login
+
+require_login()
+
+st.title("Inventory Management")
+
+tab1, tab2, tab3 = st.tabs(["Update Inventory", "View Inventory", "Stock Movements"])
+
+with tab1:
+    with st.form("inventory_form"):
+        item_name = st.text_input("Item Name")
+        quantity = st.number_input("Quantity", min_value=0.0)
+        unit = st.selectbox("Unit", ["kg", "liters", "pieces", "packets"])
+        reorder_level = st.number_input(
+            "Reorder Level", min_value=0.0, value=None, placeholder="unchanged",
+            help="Alert when stock falls below this; new items default to 10")
+
+        st.caption("Sets the counted stock; the difference is recorded as an adjustment.")
+        if st.form_submit_button("Update Inventory"):
+            if db.update_inventory(item_name, quantity, unit, reorder_level):
+                st.success("Inventory updated successfully")
+                st.rerun()
+            else:
+                st.error("Failed to update inventory")
+
+    bulk_import_widget(
+        "inventory",
+        "Columns: item_name, quantity, unit (kg, liters, pieces or packets)."
+    )
+
+with tab2:
+    inventory = db.get_inventory()
+    if not inventory.empty:
+        search = st.text_input("Search items", key="inventory_search")
+        paged_dataframe(
+            "inventory_pager",
+            lambda size, cursor: db.get_inventory_page(size, cursor, search=search),
+            filters=(search,)
+        )
+        item_labels = label_map(
+            inventory, lambda r: f"{r['item_name']} ({r['quantity']} {r['unit']})")
+
+        # Show low stock alerts
+        low_stock = alerts.low_stock()
+        if not low_stock.empty:
+            st.warning("Low Stock Alert!")
+            st.dataframe(low_stock, hide_index=True)
+            # Delete inventory item
+            st.subheader("Delete Inventory Item")
+            with st.form("delete_inventory"):
+                item_id = st.selectbox(
+                    "Select Item to Delete",
+                    inventory['id'].tolist(),
+                    format_func=item_labels.__getitem__
+                )
+                confirm = st.text_input(
+                    "Type 'DELETE' to confirm",
+                    help="Remaining stock is written off; the item's movement "
+                         "history is kept"
+                )
+                if st.form_submit_button("Delete Item"):
+                    if confirm == "DELETE":
+                        if db.delete_inventory_item(item_id):
+                            st.success("Item deleted successfully")
+                            st.rerun()
+                        else:
+                            st.error("Failed to delete item")
+                    else:
+                        st.error("Please type 'DELETE' to confirm")
+    else:
+        st.info("No inventory items found")
+
+with tab3:
+    inventory = db.get_inventory()
+    if not inventory.empty:
+        item_labels = label_map(
+            inventory, lambda r: f"{r['item_name']} ({r['quantity']} {r['unit']})")
+        with st.form("movement_form"):
+            item_id = st.selectbox("Item", inventory['id'].tolist(),
+                                   format_func=item_labels.__getitem__)
+            kind = st.selectbox("Movement", ["receipt", "consumption"],
+                                format_func=str.capitalize)
+            quantity = st.number_input("Quantity", min_value=0.0, key="movement_quantity")
+            note = st.text_input("Note")
+
+            if st.form_submit_button("Record Movement"):
+                try:
+                    db.record_inventory_movement(item_id, kind, quantity, note)
+                    st.success("Movement recorded successfully")
+                    st.rerun()
+                except sqlite3.IntegrityError:
+                    st.error("Not enough stock for this consumption")
+
+        st.subheader("Recent Movements")
+        only_item = st.checkbox("Only the selected item")
+        movements = db.get_inventory_movements(item_id if only_item else None)
+        if not movements.empty:
+            st.dataframe(movements, hide_index=True)
+        else:
+            st.info("No movements recorded")
+    else:
+        st.info("No inventory items found")
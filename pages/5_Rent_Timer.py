@@ -1,86 +1,141 @@
-import streamlit as st
-import database as db
-from datetime import datetime, timedelta
-import pandas as pd
-import sqlite3
-
-if 'authenticated' not in st.session_state or not st.session_state.authenticated:
-    st.error("Please login first")
-    st.stop()
-
-st.title("Rent Timer")
-
-tab1, tab2 = st.tabs(["Add Rent Payment", "View Payments"])
-
-with tab1:
-    with st.form("rent_form"):
-        due_date = st.date_input("Due Date")
-        amount = st.number_input("Amount", min_value=0.0)
-        status = st.selectbox("Status", ["Pending", "Paid"])
-
-        if st.form_submit_button("Add Payment"):
-            if db.add_rent_payment(due_date.strftime('%Y-%m-%d'), amount, status):
-                st.success("Payment record added successfully")
-                st.rerun()
-            else:
-                st.error("Failed to add payment record")
-
-with tab2:
-    payments = db.get_rent_payments()
-    if not payments.empty:
-        st.dataframe(payments)
-
-        # Show upcoming payments
-        upcoming = payments[
-            (payments['status'] == 'Pending') &
-            (pd.to_datetime(payments['due_date']) > datetime.now())
-            ]
-        if not upcoming.empty:
-            st.warning("Upcoming Payments")
-            st.dataframe(upcoming)
-        # Update payment
-        st.subheader("Update Payment")
-        with st.form("update_payment"):
-            payment_id = st.selectbox(
-                "Select Payment to Update",
-                payments['id'].tolist(),
-                format_func=lambda x: f"₹{payments[payments['id'] == x]['amount'].iloc[0]} "
-                                      f"(Due: {payments[payments['id'] == x]['due_date'].iloc[0]})"
-            )
-            selected_payment = payments[payments['id'] == payment_id].iloc[0]
-            new_amount = st.number_input("New Amount",
-                                         value=float(selected_payment['amount']),
-                                         min_value=0.0)
-            new_status = st.selectbox("New Status",
-                                      ["Pending", "Paid"],
-                                      index=0 if selected_payment['status'] == "Pending" else 1)
-            if st.form_submit_button("Update Payment"):
-                if db.update_rent_payment(payment_id, new_amount, new_status):
-                    st.success("Payment updated successfully")
-                    st.rerun()
-                else:
-                    st.error("Failed to update payment")
-        # Delete payment
-        st.subheader("Delete Payment")
-        with st.form("delete_payment"):
-            payment_id_to_delete = st.selectbox(
-                "Select Payment to Delete",
-                payments['id'].tolist(),
-                format_func=lambda x: f"₹{payments[payments['id'] == x]['amount'].iloc[0]} "
-                                      f"(Due: {payments[payments['id'] == x]['due_date'].iloc[0]})"
-            )
-            confirm = st.text_input(
-                "Type 'DELETE' to confirm",
-                help="This action is irreversible"
-            )
-            if st.form_submit_button("Delete Payment"):
-                if confirm == "DELETE":
-                    if db.delete_rent_payment(payment_id_to_delete):
-                        st.success("Payment deleted successfully")
-                        st.rerun()
-                    else:
-                        st.error("Failed to delete payment")
-                else:
-                    st.error("Please type 'DELETE' to confirm")
-    else:
-        st.info("No payment records found")
\ No newline at end of file
+import streamlit as st
+import database as db
+import scheduler
+from page_helpers import index_by_id, label_map, paged_dataframe, require_login
+
+require_login()
+
+st.title("Rent Timer")
+
+scheduler.start()
+for reminder in scheduler.reminders():
+    st.warning(reminder)
+
+tab1, tab2, tab3 = st.tabs(["Add Rent Payment", "View Payments", "Recurring Rent"])
+
+with tab1:
+    with st.form("rent_form"):
+        due_date = st.date_input("Due Date")
+        amount = st.number_input("Amount", min_value=0.0)
+        status = st.selectbox("Status", ["Pending", "Paid"])
+
+        if st.form_submit_button("Add Payment"):
+            if db.add_rent_payment(due_date.strftime('%Y-%m-%d'), amount, status):
+                st.success("Payment record added successfully")
+                st.rerun()
+            else:
+                st.error("Failed to add payment record")
+
+with tab2:
+    status_filter = st.selectbox("Show", ["All", "Pending", "Paid"],
+                                 key="rent_status_filter")
+    status_filter = None if status_filter == "All" else status_filter
+    # Only the visible page is fetched; the update/delete forms below act on it
+    payments = paged_dataframe(
+        "rent_pager",
+        lambda size, cursor: db.get_rent_payments_page(size, cursor,
+                                                       status=status_filter),
+        filters=(status_filter,)
+    )
+
+    # The scheduler's precomputed list: overdue payments and those due within
+    # REMINDER_DAYS. Choose Pending above to page through every pending payment.
+    due_soon = scheduler.due()
+    if not due_soon.empty:
+        st.warning(f"Overdue or due in the next {scheduler.REMINDER_DAYS} days")
+        st.dataframe(due_soon, hide_index=True)
+
+    if not payments.empty:
+        payment_labels = label_map(payments,
+                                   lambda r: f"₹{r['amount']} (Due: {r['due_date']})")
+        payments = index_by_id(payments)
+        # Update payment
+        st.subheader("Update Payment")
+        with st.form("update_payment"):
+            payment_id = st.selectbox(
+                "Select Payment to Update",
+                list(payment_labels),
+                format_func=payment_labels.__getitem__
+            )
+            selected_payment = payments.loc[payment_id]
+            new_amount = st.number_input("New Amount",
+                                         value=float(selected_payment['amount']),
+                                         min_value=0.0)
+            new_status = st.selectbox("New Status",
+                                      ["Pending", "Paid"],
+                                      index=0 if selected_payment['status'] == "Pending" else 1)
+            if st.form_submit_button("Update Payment"):
+                if db.update_rent_payment(payment_id, new_amount, new_status):
+                    st.success("Payment updated successfully")
+                    st.rerun()
+                else:
+                    st.error("Failed to update payment")
+        # Delete payment
+        st.subheader("Delete Payment")
+        with st.form("delete_payment"):
+            payment_id_to_delete = st.selectbox(
+                "Select Payment to Delete",
+                list(payment_labels),
+                format_func=payment_labels.__getitem__
+            )
+            confirm = st.text_input(
+                "Type 'DELETE' to confirm",
+                help="This action is irreversible"
+            )
+            if st.form_submit_button("Delete Payment"):
+                if confirm == "DELETE":
+                    if db.delete_rent_payment(payment_id_to_delete):
+                        st.success("Payment deleted successfully")
+                        st.rerun()
+                    else:
+                        st.error("Failed to delete payment")
+                else:
+                    st.error("Please type 'DELETE' to confirm")
+    else:
+        st.info("No payment records found")
+
+with tab3:
+    with st.form("schedule_form"):
+        description = st.text_input("Description", placeholder="e.g. Building lease")
+        schedule_amount = st.number_input("Monthly Amount", min_value=0.0)
+        day_of_month = st.number_input("Due Day of Month", min_value=1, max_value=31,
+                                       value=1, help="Clamped to the last day of "
+                                                     "shorter months")
+        col1, col2 = st.columns(2)
+        with col1:
+            start_date = st.date_input("Starts", key="schedule_start")
+        with col2:
+            end_date = st.date_input("Ends", value=None, key="schedule_end")
+
+        if st.form_submit_button("Add Schedule"):
+            if end_date is not None and end_date < start_date:
+                st.error("End date must be after the start date")
+            elif db.add_rent_schedule(description, schedule_amount, int(day_of_month),
+                                      start_date.strftime('%Y-%m-%d'),
+                                      end_date.strftime('%Y-%m-%d') if end_date else None):
+                st.success("Schedule added; payments are generated "
+                           f"{db.RENT_HORIZON_DAYS} days ahead")
+                st.rerun()
+            else:
+                st.error("Failed to add schedule")
+
+    schedules = db.get_rent_schedules()
+    if not schedules.empty:
+        st.dataframe(schedules, hide_index=True)
+        schedule_labels = label_map(
+            schedules, lambda r: f"{r['description'] or 'Rent'} (₹{r['amount']} on day "
+                                 f"{r['day_of_month']})")
+        with st.form("delete_schedule"):
+            schedule_id = st.selectbox("Select Schedule to Delete",
+                                       schedules['id'].tolist(),
+                                       format_func=schedule_labels.__getitem__)
+            st.caption("Pending payments from today on are removed; "
+                       "past payments are kept.")
+            if st.form_submit_button("Delete Schedule"):
+                if db.delete_rent_schedule(schedule_id):
+                    st.success("Schedule deleted successfully")
+                    st.rerun()
+                else:
+                    st.error("Failed to delete schedule")
+    else:
+        st.info("No recurring rent set up")
@@ -0,0 +1,67 @@
+import streamlit as st
+import database as db
+import db_cache
+import jobs
+import logging_setup
+import query_stats
+import pandas as pd
+from page_helpers import require_login
+
+require_login()
+
+st.title("Query Statistics")
+
+tab1, tab2, tab3, tab4 = st.tabs(["Functions", "Slow Queries", "Pool & Cache",
+                                  "Background Jobs"])
+
+with tab1:
+    stats = query_stats.snapshot()
+    if stats:
+        df = pd.DataFrame(stats)
+        df['callers'] = df['callers'].apply(
+            lambda callers: ", ".join(f"{name} ({count})" for name, count in callers.items()))
+        st.dataframe(
+            df[['function', 'calls', 'total_ms', 'avg_ms', 'max_ms', 'rows',
+                'statements', 'slow', 'errors', 'callers']],
+            hide_index=True
+        )
+    else:
+        st.info("No database calls recorded yet")
+    if st.button("Reset counters"):
+        query_stats.reset()
+        st.rerun()
+
+with tab2:
+    st.caption(f"Calls slower than {query_stats.SLOW_QUERY_MS:.0f} ms are logged to "
+               f"{logging_setup.SLOW_QUERY_LOG}")
+    slow = query_stats.recent_slow()
+    if slow:
+        df = pd.DataFrame(reversed(slow))
+        df['sql'] = df['sql'].apply(" | ".join)
+        st.dataframe(df, hide_index=True)
+    else:
+        st.info("No slow queries recorded")
+
+with tab3:
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Connection pool")
+        st.json(db.pool_stats())
+    with col2:
+        st.subheader("Read cache")
+        st.json(db_cache.stats())
+
+with tab4:
+    recent = jobs.list_jobs()
+    if not recent.empty:
+        st.dataframe(recent, hide_index=True,
+                     column_config={"progress": st.column_config.ProgressColumn(
+                         "progress", min_value=0.0, max_value=1.0)})
+        failed = recent.loc[recent['status'] == 'failed', 'id'].tolist()
+        if failed:
+            job_id = st.selectbox("Failed job", failed)
+            if st.button("Retry job"):
+                jobs.retry(job_id)
+                st.rerun()
+    else:
+        st.info("No background jobs yet")
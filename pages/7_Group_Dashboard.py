@@ -0,0 +1,68 @@
+import streamlit as st
+from datetime import datetime
+import reports
+from page_helpers import require_login
+
+require_login()
+
+
+# Start the report workers once per server process, before any report
+@st.cache_resource(show_spinner="Starting report workers...")
+def _report_workers():
+    return reports.start_pool()
+
+
+_report_workers()
+
+st.title("Group Dashboard")
+
+col1, col2, col3 = st.columns([1, 1, 2])
+with col1:
+    month = st.selectbox("Month", range(1, 13), index=datetime.now().month - 1,
+                         key="dashboard_month")
+with col2:
+    year = st.selectbox("Year", range(2020, datetime.now().year + 1),
+                        index=datetime.now().year - 2020, key="dashboard_year")
+with col3:
+    st.write("")
+    if st.button("Refresh figures"):
+        reports.refresh()
+
+with st.spinner("Aggregating properties..."):
+    report = reports.group_report(month, year)
+
+totals = report['totals']
+if totals:
+    rate = totals['attendance_rate']
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Net payroll", f"₹{totals['net_payroll']:,.0f}",
+              help=f"Gross ₹{totals['gross_payroll']:,.0f} less advances "
+                   f"₹{totals['advances']:,.0f}")
+    c2.metric("Attendance rate", f"{rate:.1%}" if rate is not None else "—",
+              help="Half days count as half; weighted by days marked")
+    c3.metric("Stock lines", totals['stock_items'],
+              delta=f"{totals['low_stock_items']} low" if totals['low_stock_items'] else None,
+              delta_color="inverse")
+    c4.metric("Rent due (30 days)", f"₹{totals['rent_due_soon']:,.0f}",
+              delta=f"₹{totals['rent_overdue']:,.0f} overdue" if totals['rent_overdue'] else None,
+              delta_color="inverse")
+
+    frame = report['properties']
+    st.subheader("By property")
+    st.dataframe(
+        frame.drop(columns=['seconds']),
+        hide_index=True,
+        column_config={
+            'attendance_rate': st.column_config.NumberColumn("attendance_rate",
+                                                             format="percent"),
+        }
+    )
+    st.bar_chart(frame.set_index('property')[['net_payroll', 'advances']])
+    st.caption(f"Generated {report['generated_at']:%H:%M:%S} in {report['seconds']:.2f}s "
+               f"(slowest property {frame['seconds'].max():.2f}s); cached for "
+               f"{reports.REPORT_TTL / 60:.0f} minutes or until data changes")
+else:
+    st.info("No figures available")
+
+for slug, message in report['errors'].items():
+    st.error(f"{slug}: {message}")
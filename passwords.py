@@ -0,0 +1,57 @@
+import base64
+import functools
+import hashlib
+import hmac
+import secrets
+
+# scrypt parameters: 2**14 iterations with r=8 use 16 MB and take tens of
+# milliseconds, which is the point. They are stored with every hash so they
+# can be raised later without invalidating existing passwords.
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+KEY_BYTES = 32
+PREFIX = 'scrypt'
+
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii')
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r, dklen=KEY_BYTES)
+
+
+def hash_password(password):
+    """Salted scrypt hash as ``scrypt$n$r$p$salt$key`` (base64 fields)"""
+    salt = secrets.token_bytes(SALT_BYTES)
+    key = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"{PREFIX}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(key)}"
+
+
+def is_hashed(stored):
+    return isinstance(stored, str) and stored.startswith(PREFIX + '$')
+
+
+@functools.lru_cache(maxsize=1)
+def _dummy_hash():
+    # Checked when the user does not exist, so unknown and known usernames
+    # take the same time to reject
+    return hash_password(secrets.token_hex(8))
+
+
+def check_password(password, stored):
+    """True if ``password`` matches ``stored``; ``stored`` may be None"""
+    if not is_hashed(stored):
+        stored, known = _dummy_hash(), False
+    else:
+        known = True
+    try:
+        _, n, r, p, salt, key = stored.split('$')
+        expected = base64.b64decode(key)
+        actual = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(actual, expected) and known
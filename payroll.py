@@ -0,0 +1,230 @@
+"""Vectorized payroll over many months at once.
+
+Attendance for a run of months is loaded into an employee x day matrix of
+status codes; day counts, gross pay, advances and net pay for every employee
+and month then come out of a handful of NumPy reductions rather than one
+query per employee and month.
+
+    period = load_period(1, 2025, months=12)
+    period.present_days                     # (employees, months) int array
+
+    annual_payroll(2025, rules=(Overtime(standard_days=26), PaidLeave(1)))
+
+A rule is any hashable callable taking a ``PayrollPeriod`` and returning an
+(employees, months) array of pay added to gross (negative for deductions);
+its ``name`` becomes a column of the result.
+"""
+import logging
+import sqlite3
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import database as db
+from db_cache import cached_read, do_not_cache
+
+logger = logging.getLogger(__name__)
+
+# Status codes in the attendance matrix; 0 means no record for that day
+UNMARKED = 0
+STATUS_CODES = {status: code for code, status in enumerate(db.ATTENDANCE_STATUSES, 1)}
+
+# Day offsets and status codes are worked out by SQLite, so each attendance
+# row arrives as three small ints instead of two strings to parse
+_ATTENDANCE_QUERY = f"""
+    SELECT employee_id,
+           CAST(julianday(date) - julianday(:start) AS INTEGER),
+           CASE status {' '.join(f"WHEN '{s}' THEN {c}" for s, c in STATUS_CODES.items())}
+                ELSE {UNMARKED} END
+    FROM attendance
+    WHERE date >= :start AND date < :end
+    """
+
+
+@dataclass(frozen=True, slots=True)
+class PayrollPeriod:
+    first: np.datetime64              # first month, datetime64[M]
+    employee_ids: np.ndarray          # (employees,) int64, payroll order
+    names: np.ndarray                 # (employees,) object
+    daily_wage: np.ndarray            # (employees,) float64
+    month_starts: np.ndarray          # (months,) day offset of each month
+    status: np.ndarray                # (employees, days) uint8 status codes
+    advances: np.ndarray              # (employees, months) float64
+
+    @property
+    def months(self):
+        return len(self.month_starts)
+
+    def days_with(self, status):
+        """(employees, months) count of days marked ``status``"""
+        marked = (self.status == STATUS_CODES[status]).astype(np.int32)
+        if not marked.shape[1]:
+            return np.zeros((len(self.employee_ids), self.months), dtype=np.int32)
+        return np.add.reduceat(marked, self.month_starts, axis=1)
+
+    @property
+    def present_days(self):
+        return self.days_with('Present')
+
+    @property
+    def half_days(self):
+        return self.days_with('Half-day')
+
+    @property
+    def absent_days(self):
+        return self.days_with('Absent')
+
+    @property
+    def worked_days(self):
+        """Present days plus half days at HALF_DAY_WEIGHT"""
+        return self.present_days + self.half_days * db.HALF_DAY_WEIGHT
+
+    @property
+    def base_pay(self):
+        return self.worked_days * self.daily_wage[:, None]
+
+    def calendar(self):
+        """(years, months) arrays naming each month of the period"""
+        months = (self.first + np.arange(self.months)).astype(np.int64)
+        return months // 12 + 1970, months % 12 + 1
+
+
+@dataclass(frozen=True)
+class Overtime:
+    """Premium for days worked beyond ``standard_days`` in a month.
+
+    Every worked day is already in base pay, so only the premium share of
+    the daily wage is added per overtime day.
+    """
+    standard_days: float = 26
+    premium: float = 0.5
+    name = 'overtime'
+
+    def __call__(self, period):
+        extra = np.maximum(period.worked_days - self.standard_days, 0)
+        return extra * period.daily_wage[:, None] * self.premium
+
+
+@dataclass(frozen=True)
+class PaidLeave:
+    """Pay up to ``days_per_month`` absent days a month at the daily wage"""
+    days_per_month: float = 1
+    name = 'paid_leave'
+
+    def __call__(self, period):
+        paid = np.minimum(period.absent_days, self.days_per_month)
+        return paid * period.daily_wage[:, None]
+
+
+def _rows_for(employee_ids, ids):
+    """Row of each id in ``employee_ids``, -1 for ids no longer there"""
+    return pd.Index(employee_ids).get_indexer(np.asarray(ids, dtype=np.int64))
+
+
+def load_period(month, year, months=12):
+    """Attendance and advances for ``months`` months from ``month``/``year``"""
+    first = np.datetime64(f"{year:04d}-{month:02d}", 'M')
+    bounds = (first + np.arange(months + 1)).astype('datetime64[D]')
+    start_day = bounds[0]
+    offsets = (bounds - start_day).astype(np.int64)
+    start, end = str(bounds[0]), str(bounds[-1])
+
+    with db.get_connection() as conn:
+        employees = conn.execute(
+            "SELECT id, name, COALESCE(daily_wage, 0) FROM employees "
+            "ORDER BY name, id").fetchall()
+        attendance = conn.execute(_ATTENDANCE_QUERY,
+                                  {'start': start, 'end': end}).fetchall()
+        advances = conn.execute(
+            "SELECT employee_id, date, amount FROM salary_advances "
+            "WHERE date >= ? AND date < ?", (start, end)).fetchall()
+
+    ids, names, wages = (zip(*employees) if employees else ((), (), ()))
+    employee_ids = np.array(ids, dtype=np.int64)
+    daily_wage = np.array(wages, dtype=np.float64)
+
+    status = np.zeros((len(employee_ids), offsets[-1]), dtype=np.uint8)
+    if attendance:
+        emp, days, codes = np.array(attendance, dtype=np.int64).T
+        rows = _rows_for(employee_ids, emp)
+        keep = rows >= 0
+        status[rows[keep], days[keep]] = codes[keep]
+
+    paid = np.zeros((len(employee_ids), months), dtype=np.float64)
+    if advances:
+        emp, dates, amounts = zip(*advances)
+        rows = _rows_for(employee_ids, emp)
+        month_index = (np.array(dates, dtype='datetime64[D]').astype('datetime64[M]')
+                       - first).astype(np.int64)
+        keep = rows >= 0
+        np.add.at(paid, (rows[keep], month_index[keep]),
+                  np.array(amounts, dtype=np.float64)[keep])
+
+    return PayrollPeriod(
+        first=first,
+        employee_ids=employee_ids,
+        names=np.array(names, dtype=object),
+        daily_wage=daily_wage,
+        month_starts=offsets[:-1],
+        status=status,
+        advances=paid,
+    )
+
+
+@cached_read('employees', 'attendance', 'salary_advances')
+def compute_payroll_range(month, year, months=12, rules=()):
+    """Payroll for every employee and month, one row per (employee, month).
+
+    With no rules, ``gross`` matches database.compute_payroll for each month.
+    Columns: employee_id, name, year, month, daily_wage, present_days,
+    half_days, absent_days, base, one column per rule, gross, advances, net.
+    """
+    names = [rule.name for rule in rules]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Payroll rules need distinct names: {names}")
+    try:
+        period = load_period(month, year, months)
+    except sqlite3.Error as e:
+        logger.error(f"Error loading payroll period: {str(e)}")
+        do_not_cache()
+        return pd.DataFrame()
+
+    columns = {
+        'present_days': period.present_days,
+        'half_days': period.half_days,
+        'absent_days': period.absent_days,
+        'base': period.base_pay,
+    }
+    gross = columns['base'].copy()
+    for rule in rules:
+        columns[rule.name] = np.asarray(rule(period), dtype=np.float64)
+        gross += columns[rule.name]
+    columns['gross'] = gross
+    columns['advances'] = period.advances
+    columns['net'] = gross - period.advances
+
+    n_employees, n_months = len(period.employee_ids), period.months
+    years, month_numbers = period.calendar()
+    frame = pd.DataFrame({
+        'employee_id': np.repeat(period.employee_ids, n_months),
+        'name': np.repeat(period.names, n_months),
+        'year': np.tile(years, n_employees),
+        'month': np.tile(month_numbers, n_employees),
+        'daily_wage': np.repeat(period.daily_wage, n_months),
+        **{column: values.ravel() for column, values in columns.items()},
+    })
+    return frame
+
+
+def annual_payroll(year, rules=()):
+    """One row per employee with the year's totals, for annual reconciliation"""
+    monthly = compute_payroll_range(1, year, 12, tuple(rules))
+    if monthly.empty:
+        return monthly
+    totals = [c for c in monthly.columns
+              if c not in ('employee_id', 'name', 'year', 'month', 'daily_wage')]
+    # Grouped by id alone: name and wage are the same in every month
+    return (monthly.groupby('employee_id', sort=False, as_index=False)
+            .agg(name=('name', 'first'), daily_wage=('daily_wage', 'first'),
+                 **{column: (column, 'sum') for column in totals}))
@@ -0,0 +1,133 @@
+"""One SQLite file per property, with routing and cross-property queries.
+
+The main database (database.DB_PATH) is the default property and holds the
+catalog of the others. Each property file has the full schema, its own
+connection pool and its own write lock, so writes to different properties
+never wait on each other.
+
+    with use_property('beachside'):
+        db.mark_attendance(...)
+
+    fan_out(db.compute_payroll, 3, 2025)    # {slug: DataFrame}
+"""
+import os
+import re
+import sqlite3
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pandas as pd
+
+import database as db
+from db_cache import cached_read, invalidates, do_not_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROPERTY = 'main'
+DEFAULT_NAME = 'Main property'
+DATA_DIR = os.environ.get('HOTEL_DATA_DIR', 'properties')
+FANOUT_WORKERS = 8
+
+_SLUG = re.compile(r'^[a-z0-9][a-z0-9_-]{0,39}$')
+_executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS,
+                               thread_name_prefix='property')
+
+
+@cached_read('properties')
+def _catalog():
+    try:
+        with db.using_database(db.DB_PATH), db.get_connection() as conn:
+            return conn.execute(
+                "SELECT slug, name, path FROM properties ORDER BY name").fetchall()
+    except sqlite3.Error as e:
+        logger.error(f"Error reading property catalog: {str(e)}")
+        do_not_cache()
+        return []
+
+
+def list_properties():
+    """``[(slug, name, path)]`` with the main property first"""
+    return [(DEFAULT_PROPERTY, DEFAULT_NAME, db.DB_PATH)] + _catalog()
+
+
+def path_for(slug):
+    for prop_slug, _, path in list_properties():
+        if prop_slug == slug:
+            return path
+    raise KeyError(f"Unknown property: {slug}")
+
+
+@invalidates('properties')
+def add_property(slug, name):
+    """Register a property and create its database file with the full schema"""
+    if not _SLUG.match(slug or '') or slug == DEFAULT_PROPERTY:
+        raise ValueError("Property id must be lowercase letters, digits, '-' or '_'")
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"{slug}.db")
+    with db.using_database(path):
+        db.init_db()
+    with db.using_database(db.DB_PATH), db.get_connection() as conn:
+        conn.execute("INSERT INTO properties (slug, name, path) VALUES (?, ?, ?)",
+                     (slug, name, path))
+    logger.info(f"Added property '{slug}' at {path}")
+    return path
+
+
+@contextmanager
+def use_property(slug):
+    with db.using_database(path_for(slug)):
+        yield
+
+
+def _call_in(path, func, args, kwargs):
+    with db.using_database(path):
+        return func(*args, **kwargs)
+
+
+def fan_out(func, *args, slugs=None, **kwargs):
+    """Run ``func(*args, **kwargs)`` against every property in parallel.
+
+    Returns ``{slug: result}``; properties whose call failed are logged and
+    left out.
+    """
+    targets = [(slug, path) for slug, _, path in list_properties()
+               if slugs is None or slug in slugs]
+    futures = {slug: _executor.submit(_call_in, path, func, args, kwargs)
+               for slug, path in targets}
+    results = {}
+    for slug, future in futures.items():
+        try:
+            results[slug] = future.result()
+        except Exception as e:
+            logger.error(f"{func.__name__} failed for property '{slug}': {str(e)}")
+    return results
+
+
+def _combine(results):
+    names = {slug: name for slug, name, _ in list_properties()}
+    frames = [df.assign(property=names[slug]) for slug, df in results.items()
+              if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    combined = pd.concat(frames, ignore_index=True)
+    return combined[['property'] + [c for c in combined.columns if c != 'property']]
+
+
+def payroll_all(month, year):
+    """compute_payroll for every property, one row per employee and property"""
+    return _combine(fan_out(db.compute_payroll, month, year))
+
+
+def inventory_all():
+    """Current stock of every property, one row per item and property"""
+    return _combine(fan_out(db.get_inventory))
+
+
+def stock_totals():
+    """Stock summed across properties per item and unit"""
+    stock = inventory_all()
+    if stock.empty:
+        return stock
+    return (stock.groupby(['item_name', 'unit'], as_index=False)
+            .agg(quantity=('quantity', 'sum'), properties=('property', 'nunique')))
@@ -0,0 +1,163 @@
+import functools
+import os
+import re
+import sys
+import threading
+import time
+import logging
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+# Records of slow calls; logging_setup writes them to their own JSON-lines
+# file from its queue listener, so the calling thread never touches disk
+slow_logger = logging.getLogger(f"{__name__}.slow")
+
+# Calls slower than this are logged through slow_logger
+SLOW_QUERY_MS = float(os.environ.get('HOTEL_SLOW_QUERY_MS', 100))
+RECENT_SLOW = 100
+
+_lock = threading.Lock()
+_counters = {}
+_recent_slow = deque(maxlen=RECENT_SLOW)
+_local = threading.local()
+
+# Modules that make up the data layer; the first frame outside them is
+# reported as the caller (normally a Streamlit page).
+_INTERNAL_FILES = {'query_stats.py', 'database.py', 'db_cache.py', 'db_pool.py',
+                   'repository.py', 'functools.py', 'contextlib.py'}
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+
+def configure(threshold_ms=None):
+    global SLOW_QUERY_MS
+    if threshold_ms is not None:
+        SLOW_QUERY_MS = float(threshold_ms)
+
+
+def sql_shape(sql):
+    """Normalise a statement so calls differing only in values group together"""
+    shape = _STRING_LITERAL.sub('?', sql)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _WHITESPACE.sub(' ', shape).strip()
+    return _VALUE_LIST.sub('(?)', shape)
+
+
+def trace(statement):
+    """sqlite3 trace callback; records statements run by the active call"""
+    statements = getattr(_local, 'statements', None)
+    if statements is not None:
+        statements.append(statement)
+
+
+def install(conn):
+    """Connection hook that routes executed statements to ``trace``"""
+    conn.set_trace_callback(trace)
+
+
+def _caller():
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.basename(frame.f_code.co_filename)
+        if filename not in _INTERNAL_FILES:
+            return filename
+        frame = frame.f_back
+    return None
+
+
+def _rows(result):
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    if hasattr(result, 'shape'):
+        return int(result.shape[0])
+    if isinstance(result, (list, dict)):
+        return len(result)
+    return None
+
+
+def _record(name, caller, elapsed, rows, statements, failed):
+    elapsed_ms = elapsed * 1000
+    with _lock:
+        entry = _counters.get(name)
+        if entry is None:
+            entry = _counters[name] = {
+                'function': name, 'calls': 0, 'errors': 0, 'total_ms': 0.0,
+                'max_ms': 0.0, 'rows': 0, 'slow': 0, 'statements': 0,
+                'callers': {}}
+        entry['calls'] += 1
+        entry['errors'] += failed
+        entry['total_ms'] += elapsed_ms
+        entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+        entry['rows'] += rows or 0
+        entry['statements'] += len(statements)
+        if caller:
+            entry['callers'][caller] = entry['callers'].get(caller, 0) + 1
+        slow = elapsed_ms >= SLOW_QUERY_MS
+        if slow:
+            entry['slow'] += 1
+
+    if slow:
+        record = {
+            'ts': datetime.now().isoformat(timespec='milliseconds'),
+            'function': name,
+            'caller': caller,
+            'duration_ms': round(elapsed_ms, 3),
+            'rows': rows,
+            'error': bool(failed),
+            'sql': list(dict.fromkeys(sql_shape(s) for s in statements)),
+        }
+        with _lock:
+            _recent_slow.append(record)
+        slow_logger.info(f"Slow call to {name}: {elapsed_ms:.1f} ms",
+                         extra={'record': record})
+
+
+def instrumented(func):
+    """Record wall time, rows returned and SQL shape of every call"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        outer = getattr(_local, 'statements', None)
+        statements = []
+        _local.statements = statements
+        failed = False
+        result = None
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+            return result
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            _local.statements = outer
+            if outer is not None:
+                outer.extend(statements)
+            _record(func.__name__, _caller(), elapsed, _rows(result),
+                    statements, failed)
+    return wrapper
+
+
+def snapshot():
+    """Per-function counters, slowest total time first"""
+    with _lock:
+        rows = [dict(entry, callers=dict(entry['callers']))
+                for entry in _counters.values()]
+    for row in rows:
+        row['avg_ms'] = row['total_ms'] / row['calls'] if row['calls'] else 0.0
+    return sorted(rows, key=lambda r: r['total_ms'], reverse=True)
+
+
+def recent_slow():
+    with _lock:
+        return list(_recent_slow)
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _recent_slow.clear()
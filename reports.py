@@ -0,0 +1,214 @@
+"""Group-level reports across every property.
+
+Each property's figures are computed by ``property_report`` in a worker
+process, one database per task, so a group report takes about as long as
+the slowest property rather than the sum of all of them. The merged result
+is cached with a TTL and dropped early when this process writes to any of
+the tables it reads.
+
+The worker processes are started once per server process by ``start_pool``;
+if they cannot be started, reports are computed serially from then on.
+"""
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+import database as db
+import db_cache
+import properties
+from db_cache import cached_read
+
+logger = logging.getLogger(__name__)
+
+REPORT_TTL = 300.0
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+# Rent due within this many days counts as an upcoming obligation
+RENT_WINDOW_DAYS = 30
+
+_SOURCE_TABLES = ('employees', 'attendance', 'salary_advances', 'inventory',
+                  'rent_payments', 'rent_schedules', 'properties')
+
+_lock = threading.Lock()
+_executor = None
+_unavailable = False
+
+
+def _init_worker():
+    # Workers only compute; leave the log files to the parent process
+    import logging_setup
+    logging_setup.shutdown()
+    logging.basicConfig(level=logging.WARNING)
+    db_cache.set_enabled(False)
+
+
+@contextmanager
+def _without_main_script():
+    # Streamlit runs each page as __main__, and a spawned child re-imports
+    # __main__ from its file, which would re-run the page in every worker
+    main = sys.modules.get('__main__')
+    placeholder = sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        yield
+    finally:
+        # Another session's script run may have installed its own page
+        # meanwhile; only put back what we replaced
+        if sys.modules.get('__main__') is placeholder:
+            sys.modules['__main__'] = main
+
+
+def start_pool():
+    """Start the worker processes once; None if they cannot be started.
+
+    Workers are only ever started here, so __main__ is swapped out once per
+    server process rather than on every report.
+    """
+    global _executor, _unavailable
+    with _lock:
+        if _executor is None and not _unavailable:
+            executor = None
+            try:
+                # spawn, not fork: the parent runs pool, logging and Streamlit
+                # threads whose locks must not be copied mid-operation
+                executor = ProcessPoolExecutor(
+                    max_workers=MAX_WORKERS, initializer=_init_worker,
+                    mp_context=multiprocessing.get_context('spawn'))
+                # Each submit starts a worker while none is idle, so this
+                # starts all of them now, while __main__ is hidden
+                with _without_main_script():
+                    warmup = [executor.submit(os.getpid) for _ in range(MAX_WORKERS)]
+                for future in warmup:
+                    future.result()
+            except (BrokenProcessPool, OSError) as e:
+                # e.g. sandboxed hosts: same numbers, just not in parallel
+                logger.warning(f"Process pool unavailable, reporting serially: {str(e)}")
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                _unavailable = True
+            else:
+                _executor = executor
+        return _executor
+
+
+def _stop_pool(reason):
+    global _executor, _unavailable
+    logger.warning(f"Process pool failed, reporting serially from now on: {reason}")
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _unavailable = True
+
+
+def property_report(path, month, year, today):
+    """Aggregate one property's figures; runs in a worker process"""
+    start = time.perf_counter()
+    today = date.fromisoformat(today)
+    with db.using_database(path):
+        payroll = db.compute_payroll(month, year)
+        inventory = db.get_inventory()
+        low_stock = db.get_low_stock_items()
+        rent = db.get_pending_rent(
+            today.isoformat(), (today + timedelta(days=RENT_WINDOW_DAYS)).isoformat())
+
+    marked = present = 0.0
+    if not payroll.empty:
+        present = (payroll['present_days'].sum()
+                   + db.HALF_DAY_WEIGHT * payroll['half_days'].sum())
+        marked = payroll[['present_days', 'half_days', 'absent_days']].to_numpy().sum()
+    overdue = rent[rent['state'] == 'Overdue'] if not rent.empty else rent
+    return {
+        'employees': int(len(payroll)),
+        'gross_payroll': float(payroll['gross'].sum()) if not payroll.empty else 0.0,
+        'advances': float(payroll['advances'].sum()) if not payroll.empty else 0.0,
+        'net_payroll': float(payroll['net'].sum()) if not payroll.empty else 0.0,
+        'attendance_rate': float(present / marked) if marked else None,
+        'marked_days': int(marked),
+        'stock_items': int(len(inventory)),
+        'low_stock_items': int(len(low_stock)),
+        'rent_overdue': float(overdue['amount'].sum()) if not overdue.empty else 0.0,
+        'rent_due_soon': (float(rent['amount'].sum() - overdue['amount'].sum())
+                          if not rent.empty else 0.0),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def _run_serially(targets, month, year, today):
+    return {slug: property_report(path, month, year, today)
+            for slug, _, path in targets}
+
+
+def _run_in_processes(executor, targets, month, year, today):
+    futures = {slug: executor.submit(property_report, path, month, year, today)
+               for slug, _, path in targets}
+    results, errors = {}, {}
+    for slug, future in futures.items():
+        try:
+            results[slug] = future.result()
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            logger.error(f"Report for property '{slug}' failed: {str(e)}")
+            errors[slug] = str(e)
+    return results, errors
+
+
+@cached_read(*_SOURCE_TABLES, 'group_reports', ttl=REPORT_TTL)
+def group_report(month, year):
+    """Per-property figures plus group totals for one month.
+
+    Returns a dict with ``properties`` (DataFrame, one row per property),
+    ``totals`` (dict), ``errors`` ({slug: message}), ``generated_at`` and
+    ``seconds`` (wall time of the whole fan-out).
+    """
+    start = time.perf_counter()
+    targets = properties.list_properties()
+    today = date.today().isoformat()
+    executor = start_pool()
+    if executor is not None:
+        try:
+            results, errors = _run_in_processes(executor, targets, month, year, today)
+        except (BrokenProcessPool, OSError) as e:
+            _stop_pool(str(e))
+            executor = None
+    if executor is None:
+        results, errors = _run_serially(targets, month, year, today), {}
+
+    names = {slug: name for slug, name, _ in targets}
+    rows = [dict(property=names[slug], **figures) for slug, figures in results.items()]
+    frame = pd.DataFrame(rows)
+    totals = {}
+    if not frame.empty:
+        for column in ('employees', 'gross_payroll', 'advances', 'net_payroll',
+                       'marked_days', 'stock_items', 'low_stock_items',
+                       'rent_overdue', 'rent_due_soon'):
+            totals[column] = frame[column].sum().item()
+        # Weighted by marked days, so large properties count for more
+        rated = frame.dropna(subset=['attendance_rate'])
+        totals['attendance_rate'] = (
+            float((rated['attendance_rate'] * rated['marked_days']).sum()
+                  / rated['marked_days'].sum())
+            if not rated.empty and rated['marked_days'].sum() else None)
+    if errors:
+        db_cache.do_not_cache()
+    return {
+        'properties': frame,
+        'totals': totals,
+        'errors': errors,
+        'generated_at': datetime.now(),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def refresh():
+    """Drop cached group reports so the next call recomputes them"""
+    db_cache.invalidate('group_reports')
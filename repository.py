@@ -0,0 +1,170 @@
+"""Typed, cursor-backed reads for pages that need rows rather than frames.
+
+    from repository import employees
+    emp = employees.get_by_id(3)           # Employee or None
+    for payment in rent_payments.iter_all(where="status = ?", params=("Pending",)):
+        ...
+
+Rows are ``__slots__`` dataclasses built straight from cursor tuples, so a
+point read or a short list costs no pandas construction. ``to_frame`` turns
+rows into a DataFrame when a table widget needs one.
+
+Like the reads in database.py, every read except ``iter_all`` is cached
+against its table's generation and shows up on the Query Stats page, under
+names such as ``employees.get_by_id``.
+"""
+import functools
+from dataclasses import dataclass, fields
+
+import pandas as pd
+
+import database as db
+from db_cache import cached_read
+from query_stats import instrumented
+
+DEFAULT_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True, slots=True)
+class Employee:
+    id: int
+    name: str
+    aadhar_number: str
+    phone: str
+    address: str
+    join_date: str
+    daily_wage: float
+
+
+@dataclass(frozen=True, slots=True)
+class AttendanceRecord:
+    id: int
+    employee_id: int
+    date: str
+    status: str
+
+
+@dataclass(frozen=True, slots=True)
+class Advance:
+    id: int
+    employee_id: int
+    amount: float
+    date: str
+
+
+@dataclass(frozen=True, slots=True)
+class InventoryItem:
+    id: int
+    item_name: str
+    quantity: float
+    unit: str
+    last_updated: str
+    reorder_level: float
+
+
+@dataclass(frozen=True, slots=True)
+class RentPayment:
+    id: int
+    due_date: str
+    amount: float
+    status: str
+    schedule_id: int
+
+
+class Repository:
+    """Reads one table into ``model`` instances.
+
+    ``where`` and ``order_by`` are SQL fragments written by the caller, never
+    user input; values always go through ``params``, which must be a tuple
+    so it can be part of the cache key.
+    """
+
+    _CACHED_READS = ('get_by_id', 'get_many', 'list', 'column_map', 'count')
+
+    def __init__(self, table, model, default_order='id'):
+        self.table = table
+        self.model = model
+        self.columns = [f.name for f in fields(model)]
+        self.default_order = default_order
+        self._select = f"SELECT {', '.join(self.columns)} FROM {table}"
+        for name in self._CACHED_READS:
+            setattr(self, name, self._cached(name))
+
+    def _cached(self, name):
+        """This repository's ``name`` read, instrumented and cached per table"""
+        method = getattr(type(self), name)
+
+        @functools.wraps(method)
+        def read(*args, **kwargs):
+            return method(self, *args, **kwargs)
+        # The name keys both the cache and the Query Stats counters
+        read.__name__ = read.__qualname__ = f"{self.table}.{name}"
+        return cached_read(self.table)(instrumented(read))
+
+    def get_by_id(self, row_id):
+        with db.get_connection() as conn:
+            row = conn.execute(f"{self._select} WHERE id = ?", (row_id,)).fetchone()
+        return self.model(*row) if row is not None else None
+
+    def get_many(self, ids):
+        """Rows for ``ids`` (a tuple) keyed by id; missing ids are left out"""
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {}
+        placeholders = ", ".join("?" * len(ids))
+        with db.get_connection() as conn:
+            rows = conn.execute(f"{self._select} WHERE id IN ({placeholders})",
+                                ids).fetchall()
+        return {row[0]: self.model(*row) for row in rows}
+
+    def iter_all(self, where=None, params=(), order_by=None,
+                 batch_size=DEFAULT_BATCH_SIZE):
+        """Yield rows lazily, fetching ``batch_size`` at a time from the cursor.
+
+        Not cached: meant for scans too large to keep in memory.
+        """
+        query = self._select
+        if where:
+            query += f" WHERE {where}"
+        query += f" ORDER BY {order_by or self.default_order}"
+        with db.get_connection() as conn:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield self.model(*row)
+
+    def list(self, where=None, params=(), order_by=None):
+        return list(self.iter_all(where, params, order_by))
+
+    def column_map(self, column, where=None, params=(), order_by=None):
+        """``{id: column}`` for dropdown labels, without building rows"""
+        if column not in self.columns:
+            raise ValueError(f"Unknown column for {self.table}: {column}")
+        query = f"SELECT id, {column} FROM {self.table}"
+        if where:
+            query += f" WHERE {where}"
+        query += f" ORDER BY {order_by or self.default_order}"
+        with db.get_connection() as conn:
+            return dict(conn.execute(query, params).fetchall())
+
+    def count(self, where=None, params=()):
+        query = f"SELECT COUNT(*) FROM {self.table}"
+        if where:
+            query += f" WHERE {where}"
+        with db.get_connection() as conn:
+            return conn.execute(query, params).fetchone()[0]
+
+    def to_frame(self, rows):
+        """DataFrame with this table's columns from an iterable of rows"""
+        return pd.DataFrame([tuple(getattr(row, c) for c in self.columns) for row in rows],
+                            columns=self.columns)
+
+
+employees = Repository('employees', Employee)
+attendance = Repository('attendance', AttendanceRecord, default_order='date, id')
+advances = Repository('salary_advances', Advance, default_order='date, id')
+inventory = Repository('inventory', InventoryItem, default_order='item_name')
+rent_payments = Repository('rent_payments', RentPayment, default_order='due_date, id')
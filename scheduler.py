@@ -0,0 +1,119 @@
+import threading
+import logging
+import time
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+import database as db
+import db_cache
+import properties
+
+logger = logging.getLogger(__name__)
+
+# Rent due state is worked out by a background thread, the same way
+# alerts.py handles low stock: it generates scheduled payments and reads
+# the pending ones once per change to rent data or once per day, and pages
+# only read the precomputed result. Every property is refreshed; state is
+# kept per database file.
+CHECK_INTERVAL = db_cache.DEFAULT_TTL
+# How often the waiting thread looks for a wake-up from due()
+WAKE_INTERVAL = 1.0
+# Pending payments due within this many days are reminded about
+REMINDER_DAYS = 7
+
+_TABLES = ('rent_payments', 'rent_schedules')
+_lock = threading.Lock()
+_states = {}
+_thread = None
+_wakeup = threading.Event()
+
+
+def _key():
+    return db_cache.generation(*_TABLES), date.today()
+
+
+def refresh():
+    """Generate scheduled payments and recompute the due list"""
+    db.generate_rent_payments()
+    key = _key()
+    today = key[1]
+    due = db.get_pending_rent(today.isoformat(),
+                              (today + timedelta(days=REMINDER_DAYS)).isoformat())
+    with _lock:
+        _states[db.current_path()] = {'key': key, 'due': due,
+                                      'checked_at': datetime.now()}
+    return due.copy()
+
+
+def due():
+    """Overdue payments and those due within REMINDER_DAYS.
+
+    Never queries: returns the last state the thread computed, and wakes
+    the thread when that state is out of date (a write in this process or
+    a new day it has not caught up with). Empty until the first check.
+    """
+    with _lock:
+        state = _states.get(db.current_path())
+    if state is None or state['key'] != _key():
+        _wakeup.set()
+    if state is None:
+        return pd.DataFrame(columns=['id', 'due_date', 'amount', 'description',
+                                     'days_left', 'state'])
+    return state['due'].copy()
+
+
+def reminders():
+    """One line per overdue or soon due payment, most urgent first"""
+    messages = []
+    for row in due().to_dict('records'):
+        label = f"₹{row['amount']:,.0f}" + (f" ({row['description']})"
+                                            if row['description'] else "")
+        if row['state'] == 'Overdue':
+            days = -row['days_left']
+            messages.append(f"{label} overdue by {days} day{'s' if days != 1 else ''}")
+        elif row['state'] == 'Due today':
+            messages.append(f"{label} due today")
+        else:
+            days = row['days_left']
+            messages.append(f"{label} due in {days} day{'s' if days != 1 else ''}")
+    return messages
+
+
+def last_checked():
+    with _lock:
+        state = _states.get(db.current_path())
+        return state['checked_at'] if state else None
+
+
+def _wait(generation):
+    """Block until rent data changes, due() asks for a refresh or CHECK_INTERVAL passes"""
+    deadline = time.monotonic() + CHECK_INTERVAL
+    while not _wakeup.is_set() and time.monotonic() < deadline:
+        if db_cache.wait_for_change(_TABLES, generation, WAKE_INTERVAL) != generation:
+            break
+    _wakeup.clear()
+
+
+def _run():
+    generation = None
+    while True:
+        try:
+            _wait(generation)
+            for _, _, path in properties.list_properties():
+                with db.using_database(path):
+                    refresh()
+            # refresh() may have generated payments; wait from what it saw
+            generation = db_cache.generation(*_TABLES)
+        except Exception as e:
+            logger.error(f"Rent schedule check failed: {str(e)}")
+
+
+def start():
+    """Start the background scheduler once per process"""
+    global _thread
+    with _lock:
+        if _thread is not None and _thread.is_alive():
+            return
+        _thread = threading.Thread(target=_run, name='rent-scheduler', daemon=True)
+        _thread.start()
@@ -0,0 +1,44 @@
+"""Shared fixtures: every test runs against a database file of its own.
+
+    python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+
+# Logs, the job queue and property files go to a scratch directory instead
+# of next to the sources; the modules read these when they are imported
+_SCRATCH = tempfile.mkdtemp(prefix='hotel_tests_')
+os.environ.setdefault('HOTEL_LOG_DIR', _SCRATCH)
+os.environ.setdefault('HOTEL_JOBS_DB', os.path.join(_SCRATCH, 'jobs.db'))
+os.environ.setdefault('HOTEL_JOB_FILES', os.path.join(_SCRATCH, 'job_files'))
+os.environ.setdefault('HOTEL_DATA_DIR', os.path.join(_SCRATCH, 'properties'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import database as db
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of an empty database file that every database.py call goes to"""
+    previous = db.DB_PATH
+    path = str(tmp_path / 'hotel.db')
+    db.use_database(path)
+    yield path
+    db.use_database(previous)
+
+
+@pytest.fixture
+def hotel_db(db_path):
+    """A new database with the full schema"""
+    db.init_db()
+    return db_path
+
+
+@pytest.fixture
+def employee(hotel_db):
+    """Id of an employee earning 100 a day"""
+    db.add_employee('Asha', '111122223333', '9000000000', 'Pune', 100.0)
+    return min(db.get_employee_ids())
@@ -0,0 +1,95 @@
+import numpy as np
+
+import attendance_store
+import database as db
+
+
+def _assert_matches_fresh_load(store):
+    fresh = attendance_store.AttendanceStore(store.path).refresh()
+    for current, expected in zip(store.snapshot(), fresh.snapshot()):
+        np.testing.assert_array_equal(current, expected)
+
+
+def _change_count():
+    with db.get_connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM attendance_changes").fetchone()[0]
+
+
+def _ids(where, *params):
+    with db.get_connection() as conn:
+        return [row[0] for row in conn.execute(
+            f"SELECT id FROM attendance WHERE {where} ORDER BY id", params)]
+
+
+def test_refresh_applies_inserts_updates_and_deletes(employee):
+    db.mark_attendance_bulk('2024-03-01', [(employee, 'Present')])
+    store = attendance_store.get_store()
+    assert len(store) == 1
+
+    db.mark_attendance(employee, '2024-03-02', 'Absent')
+    db.mark_attendance(employee, '2024-03-01', 'Half-day')
+    db.mark_attendance(employee, '2024-03-03', 'Absent')
+    db.delete_attendance(_ids("date = '2024-03-03'")[0])
+    store = attendance_store.get_store()
+
+    assert len(store) == 2
+    _assert_matches_fresh_load(store)
+    rate = store.attendance_rate('2024-03-01', '2024-03-31')
+    assert rate[['half_days', 'absent_days', 'marked_days']].values.tolist() == [[1, 1, 2]]
+
+
+def test_reused_id_replaces_the_deleted_row(employee):
+    db.mark_attendance(employee, '2024-03-01', 'Present')
+    db.mark_attendance(employee, '2024-03-02', 'Present')
+    store = attendance_store.get_store()
+
+    last = _ids("date = '2024-03-02'")[0]
+    db.delete_attendance(last)
+    # INTEGER PRIMARY KEY without AUTOINCREMENT hands the id out again
+    db.mark_attendance(employee, '2024-03-05', 'Absent')
+    assert _ids("date = '2024-03-05'") == [last]
+
+    _assert_matches_fresh_load(attendance_store.get_store())
+    assert store.employee_calendar(employee, 2024).loc[3, 5] == 'Absent'
+
+
+def test_rows_without_a_usable_date_are_skipped(employee):
+    db.mark_attendance(employee, '2024-03-01', 'Present')
+    store = attendance_store.get_store()
+    # Dates julianday cannot parse, as an old import could have written
+    db.mark_attendance(employee, '03/02/2024', 'Present')
+    db.mark_attendance(employee, 'unknown', 'Absent')
+
+    assert len(store.refresh()) == 1
+    fresh = attendance_store.AttendanceStore(store.path)
+    assert len(fresh.refresh()) == 1
+
+
+def test_refresh_does_not_write(employee):
+    db.mark_attendance(employee, '2024-03-01', 'Present')
+    attendance_store.get_store()
+    db.mark_attendance(employee, '2024-03-01', 'Absent')
+    before = _change_count()
+
+    attendance_store.get_store()
+
+    assert before and _change_count() == before
+
+
+def test_store_reloads_after_entries_it_missed_are_pruned(employee):
+    db.mark_attendance(employee, '2024-03-01', 'Present')
+    db.mark_attendance(employee, '2024-03-02', 'Present')
+    store = attendance_store.get_store()
+
+    db.mark_attendance(employee, '2024-03-01', 'Absent')
+    deleted_id = _ids("date = '2024-03-02'")[0]
+    db.delete_attendance(deleted_id)
+    # Keeps the delete entry: trg_attendance_changes_reuse looks it up
+    assert attendance_store.prune() == 1
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT attendance_id FROM attendance_changes"
+                            ).fetchall() == [(deleted_id,)]
+
+    store.refresh()
+    assert len(store) == 1
+    _assert_matches_fresh_load(store)
@@ -0,0 +1,54 @@
+import pytest
+
+import auth
+
+
+@pytest.fixture(autouse=True)
+def throttle(monkeypatch):
+    """Fresh throttle state and a fast password check: 'right' is the only password"""
+    monkeypatch.setattr(auth, '_failures', auth.OrderedDict())
+    monkeypatch.setattr(auth, '_locked_until', auth.OrderedDict())
+    monkeypatch.setattr(auth.db, 'verify_admin', lambda username, password: password == 'right')
+
+
+def test_login_returns_a_session_token():
+    token = auth.login('admin', 'right')
+    assert auth.session_user(token) == 'admin'
+    auth.logout(token)
+    assert auth.session_user(token) is None
+    assert auth.login('admin', 'wrong') is None
+
+
+def test_repeated_failures_lock_the_username(monkeypatch):
+    for _ in range(auth.MAX_FAILURES):
+        assert auth.login('Admin ', 'wrong') is None
+    with pytest.raises(auth.LoginThrottled):
+        auth.login('admin', 'right')
+    # Other usernames are not affected
+    assert auth.login('manager', 'right')
+
+    clock = auth.time.monotonic() + auth.LOCKOUT + 1
+    monkeypatch.setattr(auth.time, 'monotonic', lambda: clock)
+    assert auth.login('admin', 'right')
+    assert 'admin' not in auth._failures and 'admin' not in auth._locked_until
+
+
+def test_success_clears_earlier_failures():
+    for _ in range(auth.MAX_FAILURES - 1):
+        auth.login('admin', 'wrong')
+    assert auth.login('admin', 'right')
+    assert auth.login('admin', 'wrong') is None
+    assert len(auth._failures['admin']) == 1
+
+
+def test_throttle_state_is_bounded(monkeypatch):
+    monkeypatch.setattr(auth, 'MAX_TRACKED', 10)
+    for _ in range(auth.MAX_FAILURES):
+        auth.login('admin', 'wrong')
+    for n in range(50):
+        auth.login(f'random-{n}', 'wrong')
+
+    assert len(auth._failures) <= 10
+    # Eviction drops the oldest failures, not a lockout still in force
+    with pytest.raises(auth.LoginThrottled):
+        auth.login('admin', 'right')
@@ -0,0 +1,50 @@
+import database as db
+import importer
+
+
+def _csv(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_valid_rows_are_written_and_bad_ones_reported(employee, tmp_path):
+    path = _csv(tmp_path, 'attendance.csv',
+                "employee_id,date,status\n"
+                f"{employee},2024-03-01,present\n"
+                f"{employee},2024-03-02,Absent\n"
+                "999,2024-03-03,Present\n"
+                f"{employee},2024-03-04,Holiday\n"
+                f"{employee},04/03/2024,Present\n")
+
+    report = importer.import_file('attendance', path, chunk_size=2)
+
+    assert (report['rows'], report['imported'], report['rejected']) == (5, 2, 3)
+    assert [r['row'] for r in report['rejects']] == [3, 4, 5]
+    assert 'unknown employee_id 999' in report['rejects'][0]['reason']
+    attendance = db.get_attendance('2024-03-01', '2024-03-31')
+    assert sorted(attendance['status']) == ['Absent', 'Present']
+
+
+def test_employee_deleted_after_validation_is_rejected(employee):
+    rows = importer._AttendanceImporter()
+    valid = rows({'employee_id': employee, 'date': '2024-03-01', 'status': 'Present'})
+    db.delete_employee(employee)
+
+    written, rejects = rows.write([valid])
+
+    assert written == 0
+    assert rejects == [(0, f"employee_id {employee} no longer exists")]
+    assert db.get_attendance('2024-03-01', '2024-03-31').empty
+
+
+def test_employees_with_a_known_aadhar_are_skipped(employee, tmp_path):
+    path = _csv(tmp_path, 'staff.csv',
+                "name,aadhar_number,phone,address,join_date,daily_wage\n"
+                "Asha again,1111 2222 3333,,,2024-01-01,90\n"
+                "Ravi,444455556666,,,2024-01-01,80\n")
+
+    report = importer.import_file('employees', path)
+
+    assert (report['imported'], report['rejected']) == (1, 1)
+    assert len(db.get_employee_ids()) == 2
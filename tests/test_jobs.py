@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+import database as db
+import jobs
+
+
+@pytest.fixture
+def queue(hotel_db, tmp_path, monkeypatch):
+    """An empty job queue; tests run jobs by hand instead of on worker threads"""
+    monkeypatch.setattr(jobs, 'JOBS_PATH', str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(jobs, 'RETRY_BACKOFF', 0.0)
+    calls = []
+
+    def flaky(params, progress):
+        calls.append(params)
+        if len(calls) < params['fail_times'] + 1:
+            raise RuntimeError(f"attempt {len(calls)} failed")
+        progress(0.5, "halfway")
+        return {'database': db.current_path()}
+
+    def broken(params, progress):
+        raise ValueError("bad params")
+
+    monkeypatch.setitem(jobs._HANDLERS, 'flaky', flaky)
+    monkeypatch.setitem(jobs._HANDLERS, 'broken', broken)
+    return calls
+
+
+def _run_next():
+    job = jobs._claim()
+    assert job is not None
+    jobs._run(job)
+    return job[0]
+
+
+def test_failed_attempts_are_retried(queue):
+    job_id = jobs.submit('flaky', {'fail_times': 1})
+    _run_next()
+    job = jobs.get(job_id)
+    assert (job['status'], job['attempts'], job['error']) == ('queued', 1, 'attempt 1 failed')
+
+    _run_next()
+    job = jobs.get(job_id)
+    assert job['status'] == 'succeeded'
+    assert job['result'] == {'database': db.current_path()}
+    assert jobs._claim() is None
+
+
+def test_last_attempt_fails_the_job(queue):
+    job_id = jobs.submit('flaky', {'fail_times': 5}, max_attempts=2)
+    _run_next()
+    _run_next()
+    assert jobs.get(job_id)['status'] == 'failed'
+
+    assert jobs.retry(job_id)
+    job = jobs.get(job_id)
+    assert (job['status'], job['attempts']) == ('queued', 0)
+
+
+def test_permanent_errors_are_not_retried(queue):
+    job_id = jobs.submit('broken', {})
+    _run_next()
+    job = jobs.get(job_id)
+    assert (job['status'], job['attempts']) == ('failed', 1)
+
+
+def test_identical_active_jobs_are_submitted_once(queue):
+    first = jobs.submit('flaky', {'fail_times': 0})
+    assert jobs.submit('flaky', {'fail_times': 0}) == first
+    assert jobs.submit('flaky', {'fail_times': 1}) != first
+
+    _run_next()
+    # Finished jobs no longer absorb new submissions
+    assert jobs.submit('flaky', {'fail_times': 0}) != first
+
+
+def test_expired_lease_requeues_the_job(queue):
+    job_id = jobs.submit('flaky', {'fail_times': 0})
+    claimed = jobs._claim()
+    assert claimed[0] == job_id
+    with jobs._connection() as conn:
+        # As if the claiming process died and stopped renewing the lease
+        conn.execute("UPDATE jobs SET lease_until = 0 WHERE id = ?", (job_id,))
+        jobs._recover(conn, time.time())
+    job = jobs.get(job_id)
+    assert (job['status'], job['attempts']) == ('queued', 1)
+
+    _run_next()
+    assert jobs.get(job_id)['status'] == 'succeeded'
+
+
+def test_unknown_kind_is_refused(queue):
+    with pytest.raises(ValueError):
+        jobs.submit('no_such_job', {})
@@ -0,0 +1,83 @@
+import sqlite3
+
+import database as db
+import migrations
+import passwords
+
+# The tables as the first release created them, before any migration
+LEGACY_SCHEMA = """
+    CREATE TABLE admin (username TEXT PRIMARY KEY, password TEXT);
+    CREATE TABLE employees (id INTEGER PRIMARY KEY, name TEXT, aadhar_number TEXT UNIQUE,
+                            phone TEXT, address TEXT, join_date TEXT, daily_wage REAL);
+    CREATE TABLE attendance (id INTEGER PRIMARY KEY, employee_id INTEGER,
+                             date TEXT, status TEXT);
+    CREATE TABLE salary_advances (id INTEGER PRIMARY KEY, employee_id INTEGER,
+                                  amount REAL, date TEXT);
+    CREATE TABLE inventory (id INTEGER PRIMARY KEY, item_name TEXT,
+                            quantity REAL, unit TEXT, last_updated TEXT);
+    CREATE TABLE rent_payments (id INTEGER PRIMARY KEY, due_date TEXT,
+                                amount REAL, status TEXT);
+"""
+
+
+def _objects(conn, kind):
+    return {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = ?", (kind,))}
+
+
+def test_new_database_is_at_latest_version(hotel_db):
+    assert db.schema_version() == migrations.latest_version()
+    with db.get_connection() as conn:
+        indexes = _objects(conn, 'index')
+        triggers = _objects(conn, 'trigger')
+    assert {'ux_attendance_employee_date', 'ix_attendance_date_employee',
+            'ux_inventory_item_name', 'ix_inventory_low_stock',
+            'ix_rent_payments_status_due', 'ix_employees_page_name',
+            'ix_rent_payments_page_status_due'} <= indexes
+    assert {'trg_attendance_summary_insert', 'trg_inventory_movements_apply',
+            'trg_attendance_changes_delete'} <= triggers
+
+
+def test_versions_are_unique_and_ordered():
+    versions = [version for version, _, _ in migrations.MIGRATIONS]
+    assert versions == sorted(set(versions))
+    assert versions == list(range(1, migrations.latest_version() + 1))
+
+
+def test_init_db_again_applies_nothing(hotel_db):
+    with db.get_connection() as conn:
+        assert migrations.migrate(conn) == []
+    assert db.ensure_schema() is False
+
+
+def test_legacy_database_is_migrated(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.execute("INSERT INTO admin VALUES ('admin', 'secret')")
+    conn.execute("INSERT INTO employees VALUES (1, 'Asha', '1', 'p', 'a', '2024-01-01', 100)")
+    conn.executemany("INSERT INTO attendance (employee_id, date, status) VALUES (?, ?, ?)",
+                     [(1, '2024-01-02', 'Absent'), (1, '2024-01-02', 'Present'),
+                      (1, '2024-01-03', 'Half-day')])
+    # Every update used to append a row; the last one holds the stock
+    conn.executemany("INSERT INTO inventory (item_name, quantity, unit, last_updated) "
+                     "VALUES (?, ?, 'kg', '2024-01-01')", [('Rice', 5), ('Rice', 8)])
+    conn.commit()
+    conn.close()
+
+    db.init_db()
+
+    assert db.schema_version() == migrations.latest_version()
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT status FROM attendance WHERE date = '2024-01-02'"
+                            ).fetchall() == [('Present',)]
+        assert conn.execute("SELECT present_days, half_days, absent_days "
+                            "FROM attendance_monthly_summary").fetchall() == [(1, 1, 0)]
+        stored = conn.execute("SELECT password FROM admin").fetchone()[0]
+    assert passwords.is_hashed(stored)
+    assert db.verify_admin('admin', 'secret')
+
+    inventory = db.get_inventory()
+    assert inventory[['item_name', 'quantity']].values.tolist() == [['Rice', 8.0]]
+    movements = db.get_inventory_movements()
+    assert movements[['kind', 'quantity', 'note']].values.tolist() == [
+        ['adjustment', 8.0, 'opening balance']]
@@ -0,0 +1,62 @@
+import pytest
+
+import database as db
+import payroll
+
+
+@pytest.fixture
+def march(employee):
+    """Asha (100 a day): 2 present, 1 half day, 2 absent and a 60 advance in March 2024"""
+    for day, status in [(1, 'Present'), (4, 'Present'), (5, 'Half-day'),
+                        (6, 'Absent'), (7, 'Absent')]:
+        db.mark_attendance(employee, f'2024-03-{day:02d}', status)
+    with db.get_connection() as conn:
+        conn.execute("INSERT INTO salary_advances (employee_id, amount, date) "
+                     "VALUES (?, 60, '2024-03-10')", (employee,))
+    db.invalidate('salary_advances')
+    return employee
+
+
+def test_monthly_payroll(march):
+    row = db.compute_payroll(3, 2024).set_index('employee_id').loc[march]
+    assert (row['present_days'], row['half_days'], row['absent_days']) == (2, 1, 2)
+    assert row['gross'] == pytest.approx(2 * 100 + db.HALF_DAY_WEIGHT * 100)
+    assert row['net'] == pytest.approx(row['gross'] - 60)
+
+
+def test_range_matches_monthly_payroll(march):
+    monthly = db.compute_payroll(3, 2024).set_index('employee_id')
+    ranged = payroll.compute_payroll_range(3, 2024, months=1).set_index('employee_id')
+    for column in ('gross', 'advances', 'net'):
+        assert ranged.loc[march, column] == pytest.approx(monthly.loc[march, column])
+
+
+def test_rules_add_to_gross(march):
+    rules = (payroll.Overtime(standard_days=1, premium=0.5),
+             payroll.PaidLeave(days_per_month=1))
+    annual = payroll.annual_payroll(2024, rules=rules).set_index('employee_id')
+    # 2.5 worked days, 1.5 beyond the standard; one of two absences paid
+    assert annual.loc[march, 'overtime'] == pytest.approx(1.5 * 100 * 0.5)
+    assert annual.loc[march, 'paid_leave'] == pytest.approx(100)
+    assert annual.loc[march, 'gross'] == pytest.approx(250 + 75 + 100)
+    with pytest.raises(ValueError):
+        payroll.compute_payroll_range(1, 2024, rules=(payroll.PaidLeave(),) * 2)
+
+
+def test_missing_wage_pays_zero_everywhere(march):
+    with db.get_connection() as conn:
+        conn.execute("UPDATE employees SET daily_wage = NULL")
+    db.invalidate('employees')
+
+    monthly = db.compute_payroll(3, 2024).set_index('employee_id')
+    annual = payroll.annual_payroll(2024).set_index('employee_id')
+    assert monthly.loc[march, 'gross'] == 0
+    assert annual.loc[march, 'gross'] == 0
+    assert monthly.loc[march, 'net'] == annual.loc[march, 'net'] == -60
+
+
+def test_writes_invalidate_cached_payroll(march):
+    before = db.compute_payroll(3, 2024).set_index('employee_id').loc[march, 'gross']
+    db.mark_attendance(march, '2024-03-08', 'Present')
+    after = db.compute_payroll(3, 2024).set_index('employee_id').loc[march, 'gross']
+    assert after == pytest.approx(before + 100)
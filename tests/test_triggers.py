@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+
+import database as db
+import migrations
+
+
+def _summary(conn):
+    return conn.execute("SELECT employee_id, year, month, present_days, half_days, "
+                        "absent_days FROM attendance_monthly_summary "
+                        "ORDER BY 1, 2, 3").fetchall()
+
+
+def test_summary_follows_attendance_writes(employee):
+    db.add_employee('Ravi', '444455556666', '9000000001', 'Pune', 80.0)
+    other = max(db.get_employee_ids())
+    db.mark_attendance_bulk('2024-01-02', [(employee, 'Present'), (other, 'Absent')])
+    db.mark_attendance(employee, '2024-01-03', 'Half-day')
+    db.mark_attendance(employee, '2024-02-01', 'Absent')
+    # An upsert changes the status in place
+    db.mark_attendance(employee, '2024-01-02', 'Absent')
+    with db.get_connection() as conn:
+        feb = conn.execute("SELECT id FROM attendance WHERE date = '2024-02-01'"
+                           ).fetchone()[0]
+        jan_other = conn.execute("SELECT id FROM attendance WHERE employee_id = ?",
+                                 (other,)).fetchone()[0]
+    db.update_attendance(jan_other, 'Present')
+    db.delete_attendance(feb)
+
+    with db.get_connection() as conn:
+        maintained = _summary(conn)
+        # Months left empty by a delete are dropped, not kept as zeros
+        assert maintained == [(employee, 2024, 1, 0, 1, 1), (other, 2024, 1, 1, 0, 0)]
+        migrations.rebuild_attendance_summary(conn)
+        assert _summary(conn) == maintained
+        conn.rollback()
+
+    summary = db.get_attendance_summary(1, 2024)
+    assert summary.set_index('employee_id').loc[employee, 'half_days'] == 1
+
+
+def test_stock_is_the_sum_of_the_ledger(hotel_db):
+    db.update_inventory('Rice', 10, 'kg')
+    item = int(db.get_inventory().loc[0, 'id'])
+    db.record_inventory_movement(item, 'receipt', 5)
+    db.record_inventory_movement(item, 'consumption', 3, note='kitchen')
+    db.update_inventory('Rice', 20, 'kg')
+
+    assert db.get_inventory().loc[0, 'quantity'] == 20
+    movements = db.get_inventory_movements(item)
+    assert movements['quantity'].tolist() == [8.0, -3.0, 5.0, 10.0]
+    with db.get_connection() as conn:
+        total = conn.execute("SELECT SUM(quantity) FROM inventory_movements "
+                             "WHERE item_id = ?", (item,)).fetchone()[0]
+    assert total == 20
+
+
+def test_consumption_beyond_stock_is_refused(hotel_db):
+    db.update_inventory('Oil', 2, 'liters')
+    item = int(db.get_inventory().loc[0, 'id'])
+    with pytest.raises(sqlite3.IntegrityError, match='insufficient stock'):
+        db.record_inventory_movement(item, 'consumption', 3)
+    assert db.get_inventory().loc[0, 'quantity'] == 2
+
+
+def test_ledger_is_append_only(hotel_db):
+    db.update_inventory('Oil', 2, 'liters')
+    with db.get_connection() as conn:
+        with pytest.raises(sqlite3.IntegrityError, match='append-only'):
+            conn.execute("UPDATE inventory_movements SET quantity = 100")
+        with pytest.raises(sqlite3.IntegrityError, match='append-only'):
+            conn.execute("DELETE FROM inventory_movements")
+        conn.rollback()
+
+
+def test_deleted_item_keeps_its_history(hotel_db):
+    db.update_inventory('Soap', 4, 'pieces')
+    item = int(db.get_inventory().loc[0, 'id'])
+    assert db.delete_inventory_item(item)
+
+    assert db.get_inventory().empty
+    with pytest.raises(sqlite3.IntegrityError, match='deleted inventory item'):
+        db.record_inventory_movement(item, 'receipt', 1)
+    assert db.get_inventory_movements(item)['note'].tolist() == ['item deleted', 'stock count']
+
+    # Adding it again brings the item back under the same id
+    db.update_inventory('Soap', 3, 'pieces')
+    inventory = db.get_inventory()
+    assert inventory[['id', 'quantity']].values.tolist() == [[item, 3.0]]